@@ -0,0 +1,289 @@
+import io
+import os
+import struct
+import subprocess
+import wave
+from math import gcd
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Whisper 입력 샘플레이트
+SAMPLE_RATE = 16000
+# 스트리밍 업로드 세그먼트 설정
+STREAM_MIN_SEGMENT_SEC = float(os.getenv("STREAM_MIN_SEGMENT_SEC", "2.0"))
+STREAM_MAX_SEGMENT_SEC = float(os.getenv("STREAM_MAX_SEGMENT_SEC", "15.0"))
+STREAM_MIN_SILENCE_SEC = float(os.getenv("STREAM_MIN_SILENCE_SEC", "0.5"))
+# 이 값(dBFS)보다 작은 프레임은 침묵으로 간주
+STREAM_SILENCE_DB = float(os.getenv("STREAM_SILENCE_DB", "-40"))
+# STT 전처리(VAD) 설정
+VAD_FRAME_SEC = 0.03
+VAD_SILENCE_DB = float(os.getenv("VAD_SILENCE_DB", "-40"))
+# 발화 앞뒤로 남겨 두는 여유 구간
+VAD_PAD_SEC = float(os.getenv("VAD_PAD_SEC", "0.2"))
+# 이보다 긴 발화 중간 침묵은 VAD_KEEP_PAUSE_SEC 길이로 줄임
+VAD_MAX_PAUSE_SEC = float(os.getenv("VAD_MAX_PAUSE_SEC", "1.0"))
+VAD_KEEP_PAUSE_SEC = float(os.getenv("VAD_KEEP_PAUSE_SEC", "0.3"))
+
+
+def resample(samples: np.ndarray, orig_sr: int, target_sr: int = SAMPLE_RATE) -> np.ndarray:
+    """정수비 폴리페이즈 필터로 리샘플링합니다."""
+    if orig_sr == target_sr or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+    from scipy.signal import resample_poly
+
+    factor = gcd(orig_sr, target_sr)
+    return resample_poly(samples, target_sr // factor, orig_sr // factor).astype(np.float32)
+
+
+def _pcm_to_float(frames: bytes, sample_width: int) -> np.ndarray:
+    if sample_width == 1:
+        # 8bit PCM은 unsigned
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if sample_width == 2:
+        return np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+    if sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        return ints.astype(np.float32) / 8388608.0
+    if sample_width == 4:
+        return np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648.0
+    raise ValueError(f"지원하지 않는 샘플 크기입니다: {sample_width * 8}bit")
+
+
+def decode_wav(audio_bytes: bytes, target_sr: int = SAMPLE_RATE) -> np.ndarray:
+    """PCM WAV 바이트를 디스크를 거치지 않고 float32 모노 배열로 변환합니다."""
+    with wave.open(io.BytesIO(audio_bytes), 'rb') as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        sample_rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    samples = _pcm_to_float(frames, sample_width)
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return resample(samples, sample_rate, target_sr)
+
+
+def decode_with_ffmpeg(audio_bytes: bytes, target_sr: int = SAMPLE_RATE) -> np.ndarray:
+    """WAV가 아닌 포맷(webm, m4a 등)은 ffmpeg 파이프로 디코딩합니다. 임시 파일은 만들지 않습니다."""
+    cmd = [
+        'ffmpeg', '-nostdin', '-loglevel', 'error',
+        '-i', 'pipe:0',
+        '-f', 's16le', '-ac', '1', '-ar', str(target_sr),
+        'pipe:1',
+    ]
+    result = subprocess.run(cmd, input=audio_bytes, capture_output=True, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg 디코딩 실패: {result.stderr.decode(errors='ignore').strip()}")
+    return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def decode_audio(audio_bytes: bytes, target_sr: int = SAMPLE_RATE) -> np.ndarray:
+    """오디오 바이트를 target_sr의 float32 모노 배열로 디코딩합니다."""
+    if audio_bytes[:4] == b'RIFF' and audio_bytes[8:12] == b'WAVE':
+        try:
+            return decode_wav(audio_bytes, target_sr)
+        except (wave.Error, ValueError):
+            # float WAV 등 wave 모듈이 못 읽는 형식은 ffmpeg로 처리
+            pass
+    return decode_with_ffmpeg(audio_bytes, target_sr)
+
+
+def frame_energy_db(samples: np.ndarray, frame: int) -> np.ndarray:
+    """프레임별 RMS 에너지(dBFS)를 한 번에 계산합니다. 마지막 불완전 프레임은 0으로 채웁니다."""
+    n_frames = -(-len(samples) // frame)
+    padded = np.zeros(n_frames * frame, dtype=np.float32)
+    padded[:len(samples)] = samples
+    power = np.mean(padded.reshape(n_frames, frame) ** 2, axis=1)
+    return 10 * np.log10(power + 1e-12)
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """bool 배열에서 True 구간의 (시작, 끝) 인덱스 배열을 반환합니다."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)], axis=1)
+
+
+def speech_mask(samples: np.ndarray, sample_rate: int = SAMPLE_RATE, silence_db: float = VAD_SILENCE_DB,
+                pad_sec: float = VAD_PAD_SEC, max_pause_sec: float = VAD_MAX_PAUSE_SEC) -> np.ndarray:
+    """에너지 기반 VAD. 발화 프레임을 pad_sec만큼 넓히고, max_pause_sec 이하의 짧은 침묵은 발화로 메웁니다."""
+    frame = max(1, int(sample_rate * VAD_FRAME_SEC))
+    mask = frame_energy_db(samples, frame) > silence_db
+    if not mask.any():
+        return mask
+
+    pad = int(round(pad_sec / VAD_FRAME_SEC))
+    if pad:
+        # mode='same'은 프레임 수가 커널보다 짧으면 길이가 바뀌므로 full로 계산한 뒤 원래 위치만 잘라냄
+        mask = np.convolve(mask, np.ones(2 * pad + 1), mode='full')[pad:pad + len(mask)] > 0
+
+    # 발화 사이의 짧은 침묵 메우기
+    max_pause = int(round(max_pause_sec / VAD_FRAME_SEC))
+    spans = _runs(mask)
+    gaps = np.stack([spans[:-1, 1], spans[1:, 0]], axis=1)
+    for start, end in gaps[(gaps[:, 1] - gaps[:, 0]) <= max_pause]:
+        mask[start:end] = True
+    return mask
+
+
+def preprocess_for_stt(samples: np.ndarray, sample_rate: int = SAMPLE_RATE, silence_db: float = VAD_SILENCE_DB,
+                       pad_sec: float = VAD_PAD_SEC, max_pause_sec: float = VAD_MAX_PAUSE_SEC,
+                       keep_pause_sec: float = VAD_KEEP_PAUSE_SEC) -> Tuple[np.ndarray, Dict[str, float]]:
+    """앞뒤 침묵을 잘라내고 긴 중간 침묵을 줄여 모델에 들어갈 오디오만 남깁니다.
+
+    (남은 샘플, 통계)를 반환하며 전부 침묵이면 빈 배열을 반환합니다.
+    """
+    frame = max(1, int(sample_rate * VAD_FRAME_SEC))
+    audio_sec = len(samples) / sample_rate
+    mask = speech_mask(samples, sample_rate, silence_db, pad_sec, max_pause_sec)
+    spans = _runs(mask) * frame
+    stats = {'audio_sec': round(audio_sec, 3), 'kept_sec': 0.0, 'trimmed_sec': round(audio_sec, 3),
+             'lead_sec': round(audio_sec, 3), 'trail_sec': 0.0, 'pauses_shortened': 0}
+    if len(spans) == 0:
+        return np.zeros(0, dtype=np.float32), stats
+
+    spans[:, 1] = np.minimum(spans[:, 1], len(samples))
+    pause = np.zeros(int(sample_rate * keep_pause_sec), dtype=np.float32)
+    pieces = []
+    for start, end in spans:
+        if pieces:
+            pieces.append(pause)
+        pieces.append(samples[start:end])
+    kept = np.concatenate(pieces).astype(np.float32, copy=False)
+
+    kept_sec = len(kept) / sample_rate
+    stats.update({
+        'kept_sec': round(kept_sec, 3),
+        'trimmed_sec': round(audio_sec - kept_sec, 3),
+        'lead_sec': round(float(spans[0, 0]) / sample_rate, 3),
+        'trail_sec': round(float(len(samples) - spans[-1, 1]) / sample_rate, 3),
+        'pauses_shortened': int(len(spans) - 1),
+    })
+    return kept, stats
+
+
+def parse_wav_header(data: bytes) -> Optional[Tuple[int, int, int, int]]:
+    """스트림 앞부분의 WAV 헤더를 읽어 (sample_rate, channels, sample_width, 헤더 길이)를 반환합니다.
+
+    data 청크 시작 위치까지 아직 받지 못했다면 None을 반환합니다.
+    """
+    if len(data) < 12:
+        # RIFF 헤더 앞부분도 아직 다 받지 못함
+        return None
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError("WAV 헤더가 아닙니다.")
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack('<I', data[offset + 4:offset + 8])[0]
+        if chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("fmt 청크가 없는 WAV입니다.")
+            return fmt + (offset + 8,)
+        if chunk_id == b'fmt ':
+            if offset + 24 > len(data):
+                return None
+            audio_format, channels, sample_rate = struct.unpack('<HHI', data[offset + 8:offset + 16])
+            bits = struct.unpack('<H', data[offset + 22:offset + 24])[0]
+            if audio_format != 1:
+                raise ValueError("스트리밍은 PCM WAV만 지원합니다.")
+            fmt = (sample_rate, channels, bits // 8)
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+class StreamSegmenter():
+    """실시간으로 들어오는 PCM 바이트를 받아 발화 단위 세그먼트로 자릅니다.
+
+    min_segment_sec 이상 쌓인 뒤 min_silence_sec 이상 조용하면 그 지점에서 자르고,
+    침묵이 없더라도 max_segment_sec에 도달하면 강제로 자릅니다.
+    완성된 세그먼트는 SAMPLE_RATE의 float32 모노 배열로 돌려줍니다.
+    """
+    def __init__(self, sample_rate: int = SAMPLE_RATE, channels: int = 1, sample_width: int = 2, wav_header: bool = False,
+                 min_segment_sec: float = STREAM_MIN_SEGMENT_SEC, max_segment_sec: float = STREAM_MAX_SEGMENT_SEC,
+                 min_silence_sec: float = STREAM_MIN_SILENCE_SEC, silence_db: float = STREAM_SILENCE_DB):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self._header_pending = wav_header
+        self.min_segment_sec = min_segment_sec
+        self.max_segment_sec = max_segment_sec
+        self.min_silence_sec = min_silence_sec
+        self.silence_threshold = 10 ** (silence_db / 20)
+        self._raw = b''
+        self._samples: List[np.ndarray] = []
+        self._buffered = 0
+        self._silent_run = 0
+        self.total_samples = 0
+
+    @property
+    def frame_size(self) -> int:
+        # 30ms 단위로 에너지를 계산
+        return max(1, int(self.sample_rate * 0.03))
+
+    def feed(self, chunk: bytes) -> List[np.ndarray]:
+        self._raw += chunk
+        if self._header_pending:
+            header = parse_wav_header(self._raw)
+            if header is None:
+                return []
+            self.sample_rate, self.channels, self.sample_width, header_len = header
+            self._raw = self._raw[header_len:]
+            self._header_pending = False
+
+        # 샘플 경계에 맞지 않는 나머지 바이트는 다음 청크로 넘김
+        block = self.sample_width * self.channels
+        usable = len(self._raw) - len(self._raw) % block
+        if usable == 0:
+            return []
+        samples = _pcm_to_float(self._raw[:usable], self.sample_width)
+        self._raw = self._raw[usable:]
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        self.total_samples += len(samples)
+        return self._append(samples)
+
+    def _append(self, samples: np.ndarray) -> List[np.ndarray]:
+        segments = []
+        frame = self.frame_size
+        min_len = int(self.min_segment_sec * self.sample_rate)
+        max_len = int(self.max_segment_sec * self.sample_rate)
+        min_silence = int(self.min_silence_sec * self.sample_rate)
+
+        for start in range(0, len(samples), frame):
+            piece = samples[start:start + frame]
+            self._samples.append(piece)
+            self._buffered += len(piece)
+            rms = float(np.sqrt(np.mean(piece ** 2))) if len(piece) else 0.0
+            self._silent_run = self._silent_run + len(piece) if rms < self.silence_threshold else 0
+
+            if (self._buffered >= min_len and self._silent_run >= min_silence) or self._buffered >= max_len:
+                segment = self._cut()
+                if segment is not None:
+                    segments.append(segment)
+        return segments
+
+    def _cut(self) -> Optional[np.ndarray]:
+        samples = np.concatenate(self._samples) if self._samples else np.zeros(0, dtype=np.float32)
+        silent = self._silent_run
+        self._samples = []
+        self._buffered = 0
+        self._silent_run = 0
+        # 전부 침묵이면 버림
+        if silent >= len(samples):
+            return None
+        return resample(samples, self.sample_rate)
+
+    def flush(self) -> List[np.ndarray]:
+        """스트림 종료 시 남은 샘플을 마지막 세그먼트로 반환합니다."""
+        if not self._buffered:
+            return []
+        segment = self._cut()
+        return [segment] if segment is not None else []
+
+    @property
+    def duration_sec(self) -> float:
+        return self.total_samples / self.sample_rate if self.sample_rate else 0.0
@@ -0,0 +1,88 @@
+import os
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+# 임베딩 백엔드: openai | sentence-transformers | ollama
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+# 백엔드별 모델 이름 (비우면 백엔드 기본값)
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "")
+DEFAULT_MODEL_NAMES = {
+    'openai': 'text-embedding-ada-002',
+    'sentence-transformers': 'jhgan/ko-sroberta-multitask',
+    'ollama': 'llama3.2',
+}
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "auto")
+EMBEDDING_ENCODE_BATCH_SIZE = int(os.getenv("EMBEDDING_ENCODE_BATCH_SIZE", "64"))
+# 이 개수 이상이면 멀티 프로세스 풀로 인코딩 (EMBEDDING_PROCESSES=0이면 사용 안 함)
+EMBEDDING_PROCESSES = int(os.getenv("EMBEDDING_PROCESSES", "0"))
+EMBEDDING_PROCESS_MIN_TEXTS = int(os.getenv("EMBEDDING_PROCESS_MIN_TEXTS", "5000"))
+
+
+class SentenceTransformerEmbeddings():
+    """로컬 sentence-transformers 모델로 임베딩합니다. (langchain Embeddings와 같은 embed_documents/embed_query 제공)
+
+    길이순으로 정렬해 비슷한 길이끼리 배치를 만들고, 결과는 L2 정규화한 float32 배열로 돌려줍니다.
+    """
+    def __init__(self, model_name: str, device: str = EMBEDDING_DEVICE, batch_size: int = EMBEDDING_ENCODE_BATCH_SIZE,
+                 processes: int = EMBEDDING_PROCESSES, process_min_texts: int = EMBEDDING_PROCESS_MIN_TEXTS):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        # 임베딩 캐시 키에 사용 (utils.embedding_cache.model_name_of)
+        self.model = f"st:{model_name}"
+        self.st_model = SentenceTransformer(model_name, device=None if device == 'auto' else device)
+        self.device = str(self.st_model.device)
+        self.batch_size = batch_size
+        self.processes = processes
+        self.process_min_texts = process_min_texts
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                devices = ['cpu'] * self.processes if self.device == 'cpu' else None
+                self._pool = self.st_model.start_multi_process_pool(target_devices=devices)
+            return self._pool
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.st_model.get_sentence_embedding_dimension()), dtype=np.float32)
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        sorted_texts = [texts[i] for i in order]
+
+        if self.processes > 0 and len(texts) >= self.process_min_texts:
+            vectors = self.st_model.encode_multi_process(sorted_texts, self._get_pool(), batch_size=self.batch_size,
+                                                         normalize_embeddings=True)
+        else:
+            vectors = self.st_model.encode(sorted_texts, batch_size=self.batch_size, convert_to_numpy=True,
+                                           normalize_embeddings=True, show_progress_bar=False)
+
+        # 원래 순서로 되돌림
+        result = np.empty_like(vectors, dtype=np.float32)
+        result[order] = vectors
+        return result
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0].tolist()
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self.st_model.stop_multi_process_pool(self._pool)
+                self._pool = None
+
+
+def make_embedding_model(backend: str = EMBEDDING_BACKEND, model_name: Optional[str] = None):
+    model_name = model_name or EMBEDDING_MODEL_NAME or DEFAULT_MODEL_NAMES.get(backend)
+    if backend == 'sentence-transformers':
+        return SentenceTransformerEmbeddings(model_name)
+    if backend == 'openai':
+        from langchain.embeddings import OpenAIEmbeddings
+        return OpenAIEmbeddings(model=model_name, api_key=os.getenv("OPENAI_API_KEY"))
+    if backend == 'ollama':
+        from langchain.embeddings import OllamaEmbeddings
+        return OllamaEmbeddings(model=model_name)
+    raise ValueError(f"알 수 없는 임베딩 백엔드입니다: {backend}")
@@ -1,24 +1,119 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
 from wordcloud import WordCloud
 from PIL import Image
 import numpy as np
-from collections import Counter
-import os
+
+from utils.cache import LRUCache
+
+WORDCLOUD_FONT_PATH = os.getenv("WORDCLOUD_FONT_PATH", "./fonts/NanumGothic.ttf")
+# png 또는 webp
+WORDCLOUD_FORMAT = os.getenv("WORDCLOUD_FORMAT", "png")
+# 그림에 들어가는 단어 수 (WordCloud max_words), 나머지 꼬리 단어는 캐시 키에도 반영하지 않음
+WORDCLOUD_TOP_N = int(os.getenv("WORDCLOUD_TOP_N", "200"))
+# 캐시 키를 만들 때 상대 빈도(최대 빈도 대비)를 반올림할 자릿수
+WORDCLOUD_FREQ_PRECISION = int(os.getenv("WORDCLOUD_FREQ_PRECISION", "2"))
+WORDCLOUD_CACHE_MAX_BYTES = int(os.getenv("WORDCLOUD_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# 프로세스별 WordCloud 인스턴스 캐시 (크기, 마스크, 폰트별로 하나씩 재사용)
+_instances: Dict[Tuple, Tuple[WordCloud, threading.Lock]] = {}
+_instances_lock = threading.Lock()
+
+
+def _get_instance(width: int, height: int, mask_image_path: Optional[str], font_path: str):
+    key = (width, height, mask_image_path, font_path)
+    with _instances_lock:
+        if key not in _instances:
+            mask_image = np.array(Image.open(mask_image_path)) if mask_image_path else None
+            wordcloud = WordCloud(
+                font_path=font_path,
+                width=width,
+                height=height,
+                background_color='white',
+                mask=mask_image,
+                max_words=WORDCLOUD_TOP_N,
+                )
+            _instances[key] = (wordcloud, threading.Lock())
+        return _instances[key]
+
+
+def top_frequencies(tokens, top_n: int = WORDCLOUD_TOP_N) -> List[Tuple[str, int]]:
+    """그림에 실제로 쓰이는 상위 top_n개 (단어, 빈도)를 반환합니다."""
+    return Counter(tokens).most_common(top_n)
+
+
+def render_wordcloud(frequencies: List[Tuple[str, int]], width: int = 800, height: int = 400,
+                     mask_image_path: Optional[str] = None, image_format: str = WORDCLOUD_FORMAT,
+                     font_path: str = WORDCLOUD_FONT_PATH) -> bytes:
+    """빈도표로 워드클라우드를 그려 이미지 bytes로 반환합니다. (파일을 만들지 않음, 프로세스 풀에서도 실행 가능)"""
+    wordcloud, lock = _get_instance(width, height, mask_image_path, font_path)
+    buffer = io.BytesIO()
+    # generate_from_frequencies가 인스턴스에 배치 결과를 저장하므로 같은 인스턴스는 한 번에 하나씩 사용
+    with lock:
+        wordcloud.generate_from_frequencies(dict(frequencies))
+        wordcloud.to_image().save(buffer, format=image_format.upper())
+    return buffer.getvalue()
+
+
+class WordcloudCache():
+    """완성된 워드클라우드 이미지를 (상위 빈도표, 크기, 마스크, 형식) 해시로 캐시합니다.
+
+    빈도는 최대 빈도 대비 비율을 반올림해 키에 넣으므로, 빈도표가 같거나 꼬리만 다르면 같은 이미지를 재사용합니다.
+    """
+    def __init__(self, max_bytes: int = WORDCLOUD_CACHE_MAX_BYTES, top_n: int = WORDCLOUD_TOP_N,
+                 precision: int = WORDCLOUD_FREQ_PRECISION):
+        self.memory = LRUCache(max_bytes)
+        self.top_n = top_n
+        self.precision = precision
+
+    def make_key(self, frequencies: List[Tuple[str, int]], width: int, height: int,
+                 mask_image_path: Optional[str], image_format: str) -> str:
+        max_freq = frequencies[0][1] if frequencies else 1
+        table = sorted((word, round(freq / max_freq, self.precision)) for word, freq in frequencies)
+        raw = json.dumps([table, width, height, mask_image_path, image_format], ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def render(self, tokens, width: int = 800, height: int = 400, mask_image_path: Optional[str] = None,
+               image_format: str = WORDCLOUD_FORMAT, run=None) -> bytes:
+        """토큰으로 워드클라우드 이미지 bytes를 반환합니다. 캐시에 없을 때만 run(render_wordcloud, ...)으로 그립니다.
+
+        run에 프로세스 풀 실행 함수(JobManager.run_in_process 등)를 넘기면 배치 계산을 다른 프로세스에서 합니다.
+        """
+        frequencies = top_frequencies(tokens, self.top_n)
+        key = self.make_key(frequencies, width, height, mask_image_path, image_format)
+        image = self.memory.get(key)
+        if image is None:
+            run = run or (lambda fn, *args: fn(*args))
+            image = run(render_wordcloud, frequencies, width, height, mask_image_path, image_format)
+            self.memory.set(key, image)
+        return image
+
+    def stats(self) -> Dict[str, float]:
+        stats = self.memory.stats()
+        stats['instances'] = len(_instances)
+        return stats
+
+
+wordcloud_cache = WordcloudCache()
+
 
 def make_wordcloud(tokens, mask_image_path=None, width=800, height=400, output_image_name='wordcloud.png'):
+    """워드클라우드를 ./data/output_image_name 파일로 저장합니다. (서버는 wordcloud_cache.render로 메모리에서 바로 사용)"""
     if not os.path.isdir("./data"):
         os.mkdir("./data")
     output_image_path = f"./data/{output_image_name}"
-    mask_image = np.array(Image.open(mask_image_path)) if mask_image_path else None
-    token_counts = Counter(tokens)
-    wordcloud = WordCloud(
-        font_path='./fonts/NanumGothic.ttf', 
-        width=width, 
-        height=height, 
-        background_color='white', 
-        mask=mask_image
-        ).generate_from_frequencies(token_counts)
-    wordcloud.to_file(output_image_path)
-    
+    image_format = os.path.splitext(output_image_name)[1].lstrip('.') or WORDCLOUD_FORMAT
+    image = wordcloud_cache.render(tokens, width=width, height=height, mask_image_path=mask_image_path,
+                                   image_format=image_format)
+    with open(output_image_path, 'wb') as f:
+        f.write(image)
+
     print(f"Wordcloud image saved to {output_image_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+import os
+from typing import Dict, List
+
+import numpy as np
+
+# 막대그래프에 보여줄 단어 수(R)와 relevance를 계산할 λ 간격
+LDA_VIS_TERMS = int(os.getenv("LDA_VIS_TERMS", "30"))
+LDA_VIS_LAMBDA_STEP = float(os.getenv("LDA_VIS_LAMBDA_STEP", "0.01"))
+
+
+def _row_norm(dists: np.ndarray) -> np.ndarray:
+    return dists / dists.sum(axis=1, keepdims=True)
+
+
+def _entropy(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    # scipy.stats.entropy(p, q)와 같은 KL divergence (p가 0인 항은 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(p > 0, p * np.log(p / q), 0.0)
+    return terms.sum(axis=-1)
+
+
+def js_pcoa(distributions: np.ndarray) -> np.ndarray:
+    """토픽 분포 간 Jensen-Shannon 거리로 PCoA(고전적 MDS)를 해 (K, 2) 좌표를 반환합니다."""
+    p = distributions[:, None, :]
+    q = distributions[None, :, :]
+    m = 0.5 * (p + q)
+    dists = 0.5 * (_entropy(p, m) + _entropy(q, m))
+    n = len(dists)
+    h = np.eye(n) - np.ones((n, n)) / n
+    b = -h @ (dists ** 2) @ h / 2
+    eigvals, eigvecs = np.linalg.eigh(b)
+    order = np.argsort(eigvals)[::-1][:2]
+    eigvals, eigvecs = eigvals[order], eigvecs[:, order]
+    eigvals[np.isclose(eigvals, 0) | (eigvals < 0)] = 0
+    coords = np.sqrt(eigvals) * eigvecs
+    if coords.shape[1] < 2:
+        # 토픽이 하나뿐이면 축이 하나만 나옴
+        coords = np.pad(coords, ((0, 0), (0, 2 - coords.shape[1])))
+    return coords
+
+
+def _top_terms(log_ttd: np.ndarray, log_lift: np.ndarray, R: int, lambda_seq: np.ndarray) -> List[np.ndarray]:
+    """각 토픽에 대해 모든 λ에서 relevance 상위 R개에 든 단어를 처음 나온 순서대로 반환합니다."""
+    # relevance: (λ 개수, K, W)
+    relevance = lambda_seq[:, None, None] * log_ttd + (1 - lambda_seq[:, None, None]) * log_lift
+    top = np.argpartition(-relevance, R - 1, axis=-1)[..., :R] if R < relevance.shape[-1] else \
+        np.broadcast_to(np.arange(relevance.shape[-1]), relevance.shape)
+    top_relevance = np.take_along_axis(relevance, top, axis=-1)
+    # relevance 내림차순, 같으면 단어 번호 오름차순 (pandas nlargest와 같은 순서)
+    ranked = np.take_along_axis(top, np.lexsort((top, -top_relevance), axis=-1), axis=-1)
+
+    result = []
+    for topic in range(relevance.shape[1]):
+        terms = ranked[:, topic, :].ravel()
+        _, first = np.unique(terms, return_index=True)
+        result.append(terms[np.sort(first)])
+    return result
+
+
+def prepare_lda_vis(lda_model, feat_vec, vocab, R: int = LDA_VIS_TERMS, lambda_step: float = LDA_VIS_LAMBDA_STEP,
+                    sort_topics: bool = True) -> Dict:
+    """pyLDAvis.lda_model.prepare와 같은 계산을 numpy로만 해 LDAvis JSON(mdsDat/tinfo/token.table...)을 만듭니다.
+
+    pandas DataFrame을 만들지 않고, 문서-토픽 분포는 단어가 있는 문서에 대해서만 계산합니다.
+    (빈 문서는 문서 길이가 0이라 토픽 빈도에 영향이 없음)
+    """
+    vocab = np.asarray(vocab)
+    doc_lengths = np.asarray(feat_vec.sum(axis=1)).ravel()
+    rows = np.flatnonzero(doc_lengths)
+    doc_topic_dists = _row_norm(lda_model.transform(feat_vec[rows]))
+    topic_freq = doc_lengths[rows] @ doc_topic_dists
+    topic_proportion = topic_freq / topic_freq.sum()
+    topic_order = np.argsort(-topic_proportion, kind='stable') if sort_topics else np.arange(len(topic_freq))
+    topic_freq = topic_freq[topic_order]
+    topic_proportion = topic_proportion[topic_order]
+    topic_term_dists = _row_norm(lda_model.components_)[topic_order]
+    K, W = topic_term_dists.shape
+    R = min(R, W)
+
+    # 토픽-단어별 토큰 수 (빨간 막대), 단어 빈도도 여기서 다시 계산 (LDAvis와 동일)
+    term_topic_freq = topic_term_dists * topic_freq[:, None]
+    term_frequency = term_topic_freq.sum(axis=0)
+    term_proportion = term_frequency / term_frequency.sum()
+
+    # 토픽을 선택하지 않았을 때 보여줄 단어: saliency 순
+    topic_given_term = topic_term_dists / topic_term_dists.sum(axis=0)
+    distinctiveness = (topic_given_term * np.log(topic_given_term / topic_proportion[:, None])).sum(axis=0)
+    saliency = term_proportion * distinctiveness
+    default_terms = np.argsort(-saliency, kind='stable')[:R]
+
+    log_ttd = np.log(topic_term_dists)
+    log_lift = np.log(topic_term_dists / term_proportion)
+    lambda_seq = np.arange(0, 1 + lambda_step, lambda_step)
+    topic_terms = _top_terms(log_ttd, log_lift, R, lambda_seq)
+
+    tinfo = {
+        'Term': vocab[default_terms].tolist(),
+        'Freq': np.floor(term_frequency[default_terms]).tolist(),
+        'Total': np.floor(term_frequency[default_terms]).tolist(),
+        'Category': ['Default'] * len(default_terms),
+        'logprob': np.arange(R, 0, -1, dtype=float).tolist(),
+        'loglift': np.arange(R, 0, -1, dtype=float).tolist(),
+    }
+    for topic, terms in enumerate(topic_terms):
+        tinfo['Term'] += vocab[terms].tolist()
+        tinfo['Freq'] += term_topic_freq[topic, terms].tolist()
+        tinfo['Total'] += term_frequency[terms].tolist()
+        tinfo['Category'] += [f'Topic{topic + 1}'] * len(terms)
+        tinfo['logprob'] += log_ttd[topic, terms].round(4).tolist()
+        tinfo['loglift'] += log_lift[topic, terms].round(4).tolist()
+
+    # 단어를 선택했을 때 원 크기: 표시될 수 있는 단어의 토픽별 분포 (0.5 미만은 보내지 않음)
+    shown_terms = np.unique(np.concatenate([default_terms, *topic_terms]))
+    freq = term_topic_freq[:, shown_terms]
+    topic_idx, term_pos = np.nonzero(freq >= 0.5)
+    term_idx = shown_terms[term_pos]
+    order = np.lexsort((topic_idx, vocab[term_idx]))
+    topic_idx, term_idx = topic_idx[order], term_idx[order]
+    token_freq = np.round(term_topic_freq[topic_idx, term_idx]) / term_frequency[term_idx]
+
+    coords = js_pcoa(topic_term_dists)
+    return {
+        "mdsDat": {
+            "x": coords[:, 0].tolist(),
+            "y": coords[:, 1].tolist(),
+            "topics": list(range(1, K + 1)),
+            "cluster": [1] * K,
+            "Freq": (topic_proportion * 100).tolist(),
+        },
+        "tinfo": tinfo,
+        "token.table": {
+            "Topic": (topic_idx + 1).tolist(),
+            "Freq": token_freq.tolist(),
+            "Term": vocab[term_idx].tolist(),
+        },
+        "R": R,
+        "lambda.step": lambda_step,
+        "plot.opts": {'xlab': 'PC1', 'ylab': 'PC2'},
+        "topic.order": (topic_order + 1).tolist(),
+    }
@@ -15,8 +15,9 @@ class LLMModel():
         return self.model.invoke(text + ' 이 내용에서, 의미가 없는 문자열을 제거한 뒤, 온전히 그 내용만 돌려줘').content
     
     
-    def exec(self, text):
-        llm_prompt_result = self.user_prompt_template.format(text=text)
+    def exec(self, text, user_prompt_template=None):
+        # user_prompt_template을 주면 이번 호출에만 다른 사용자 프롬프트 사용 (요약 병합 등)
+        llm_prompt_result = (user_prompt_template or self.user_prompt_template).format(text=text)
         messages = [SystemMessage(content=self.prompt) ,
                     HumanMessage(content=llm_prompt_result)]
 
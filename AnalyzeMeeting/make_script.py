@@ -1,70 +1,118 @@
-from typing import Dict, List
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
 
 import pandas as pd
 
-from AnalyzeMeeting.text_organize import remove_stopwords, tokenize_text
+from AnalyzeMeeting.text_organize import tokenize_answers
+
+ANSWER_COLUMNS = ['question_id', 'user_id', 'answer', 'tokens']
 
 
 class MeetingScript():
+    """좌담회 질문/답변 저장소.
+
+    답변은 컬럼별 append-only 리스트에 쌓고 question_id -> 행 번호 인덱스를 유지하므로
+    추가는 O(1), 질문별 조회는 O(해당 질문의 답변 수)입니다.
+    DataFrame은 get_all_data 등에서 필요할 때만 만듭니다.
+    """
     def __init__(self, corp_id: int, meeting_id: int):
         self.corp_id = corp_id
         self.meeting_id = meeting_id
-        self.questions = pd.DataFrame(columns=['question_id', 'question_text'])
-        self.data = pd.DataFrame(columns=['question_id', 'user_id', 'answer', 'tokens'])
+        # question_id -> question_text (추가된 순서 유지)
+        self.questions: Dict[str, str] = {}
+        self.columns: Dict[str, list] = {column: [] for column in ANSWER_COLUMNS}
+        self.question_rows: Dict[str, List[int]] = defaultdict(list)
+        # 답변이 추가될 때마다 listener(meeting_script, question_id, tokens)를 호출
+        self.listeners: List[Callable] = []
+        # 질문/답변이 추가될 때마다 1씩 증가 (분석 결과 캐시 키에 사용)
+        self.version = 0
+        # 답변 추가(저장소 기록 + 컬럼 추가 + version 증가)를 한 번에 하나씩 처리하기 위한 회의별 잠금
+        # (/submit-voice는 작업 스레드에서, /submit-text는 이벤트 루프에서 기록)
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.columns['answer'])
+
+    @property
+    def data(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, columns=ANSWER_COLUMNS)
+
+    def add_listener(self, listener: Callable):
+        if listener not in self.listeners:
+            self.listeners.append(listener)
 
     def add_question(self, question_id: str, question_text: str):
         # 질문 중복 확인 후 추가
-        if not self.questions[self.questions['question_id'] == question_id].empty:
-            print(f"Question '{question_id}' already exists.")
-        else:
-            new_question = pd.DataFrame([{
-                'question_id': question_id,
-                'question_text': question_text,
-            }])
-            self.questions = pd.concat([self.questions, new_question], ignore_index=True)
-
-    def add_answer(self, question_id: str, answer: str, user_id: int):
-        tokenized_answer = remove_stopwords(tokenize_text(answer))
-        
-        new_answer = pd.DataFrame([{
-            'question_id': question_id,
-            'user_id': user_id,
-            'answer': answer,
-            'tokens': tokenized_answer,
-        }])
-        self.data = pd.concat([self.data, new_answer], ignore_index=True)
+        with self.lock:
+            if question_id in self.questions:
+                print(f"Question '{question_id}' already exists.")
+            else:
+                self.questions[question_id] = question_text
+                self.version += 1
+
+    def add_answer(self, question_id: str, answer: str, user_id: int, tokens: Optional[List[str]] = None):
+        # tokens가 주어지면(저장된 데이터 복원 등) 토큰화를 생략
+        tokenized_answer = tokenize_answers([answer])[0] if tokens is None else tokens
+
+        with self.lock:
+            self.question_rows[question_id].append(len(self.columns['answer']))
+            self.columns['question_id'].append(question_id)
+            self.columns['user_id'].append(user_id)
+            self.columns['answer'].append(answer)
+            self.columns['tokens'].append(tokenized_answer)
+            self.version += 1
+            for listener in self.listeners:
+                listener(self, question_id, tokenized_answer)
 
     def get_question_text(self, question_id: str) -> str:
         # 특정 question_id에 대한 question_text 반환
-        question_row = self.questions[self.questions['question_id'] == question_id]['question_text']
-        return question_row.iloc[0] if not question_row.empty else ""
+        return self.questions.get(question_id, "")
+
+    def _select(self, question_id: str, column: str) -> pd.DataFrame:
+        values = self.columns[column]
+        rows = [row for row in self.question_rows.get(question_id, []) if values[row] is not None]
+        return pd.DataFrame({
+            'user_id': [self.columns['user_id'][row] for row in rows],
+            column: [values[row] for row in rows],
+        }, index=rows)
 
     def get_answers(self, question_id: str) -> pd.DataFrame:
         # 특정 question_id에 대한 모든 답변을 포함하는 DataFrame 반환
-        return self.data[(self.data['question_id'] == question_id) & self.data['answer'].notna()][['user_id', 'answer']]
+        return self._select(question_id, 'answer')
 
     def get_tokens(self, question_id: str) -> pd.DataFrame:
         # 특정 question_id에 대한 모든 토큰화된 답변 반환
-        return self.data[(self.data['question_id'] == question_id) & self.data['tokens'].notna()][['user_id', 'tokens']]
+        return self._select(question_id, 'tokens')
+
+    def get_answer_list(self, question_id: str) -> List[str]:
+        # DataFrame을 만들지 않고 답변 문자열만 반환
+        answers = self.columns['answer']
+        return [answers[row] for row in self.question_rows.get(question_id, []) if answers[row] is not None]
+
+    def get_all_tokens(self) -> List[str]:
+        # 회의 전체 답변의 토큰을 하나의 리스트로 반환
+        return [token for tokens in self.columns['tokens'] if tokens for token in tokens]
 
     def get_all_data(self) -> pd.DataFrame:
         # 질문과 답변을 병합하여 반환 시 corp_id와 meeting_id 추가
-        all_data = pd.merge(self.data, self.questions, on="question_id", how="left")
+        questions = pd.DataFrame({
+            'question_id': list(self.questions.keys()),
+            'question_text': list(self.questions.values()),
+        })
+        all_data = pd.merge(self.data, questions, on="question_id", how="left")
         all_data['corp_id'] = self.corp_id
         all_data['meeting_id'] = self.meeting_id
         return all_data
-    
+
     def to_script_format(self) -> List[Dict[str, List[str]]]:
         # 전체 데이터를 질문과 답변 구조로 변환
         script = []
-        questions = self.questions['question_id'].unique()
-        
-        for question_id in questions:
-            question_text = self.get_question_text(question_id)
-            answers = self.get_answers(question_id)['answer'].tolist()
+
+        for question_id, question_text in self.questions.items():
             script.append({
                 "question": question_text,
-                "answer": answers
+                "answer": self.get_answer_list(question_id)
             })
-        
-        return script
\ No newline at end of file
+
+        return script
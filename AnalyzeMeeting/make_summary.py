@@ -1,24 +1,14 @@
+import hashlib
 import os
 
-import torch
-
-# from dotenv import load_dotenv
-from langchain.chat_models import ChatOllama, ChatOpenAI
-from langchain.embeddings import OllamaEmbeddings, OpenAIEmbeddings
-from langchain.prompts import PromptTemplate
-from sentence_transformers import SentenceTransformer
-
-from AnalyzeMeeting.llm_model import LLMModel
-
-device = 'cuda' if torch.cuda.is_available() else 'cpu'
-llama_embedding_model = OllamaEmbeddings(model='llama3.2')
-openai_embedding_model = OpenAIEmbeddings()
+# 요약에 사용할 LLM (langchain과 클라이언트는 make_summary_model을 호출할 때 불러옴)
+SUMMARY_MODEL_NAME = os.getenv("SUMMARY_MODEL_NAME", "gpt-4o-mini")
 
 summary_prompt = '''
                         당신은 도움이 되는 텍스트분석전문가입니다.
                         답변에는 요약한 내용만을 제시합니다.
                     '''
-summary_user_prompt_template = PromptTemplate.from_template('''
+summary_user_prompt = '''
                                                                 다음 텍스트를 요약하되, 주요 포인트에 중점을 두고 아래와 같은 형식으로 요약하세요:
                                                                 요약은 간단하게 나타내고 주요 포인트에 집중해주세요
                                                                 용량 과 단위도 나타내세요
@@ -32,6 +22,35 @@ summary_user_prompt_template = PromptTemplate.from_template('''
                                                                 요약할 내용이 없다면, 요약을 생략해도 됩니다.
                                                                 다음은 요약할 텍스트입니다:
                                                                 {text}                                         
-                                                                ''')
+                                                                '''
+
+summary_merge_prompt = '''
+                                                                다음은 좌담회의 질문별 요약입니다. 이를 하나의 요약으로 합치되, 아래와 같은 형식을 지키세요:
+                                                                중복되는 내용은 합치고, 주요 포인트에 집중해주세요
+                                                                용량 과 단위도 나타내세요
+
+                                                                1. 요약:
+                                                                2. 주요 포인트:
+                                                                    - 포인트 1
+                                                                    - 포인트 2
+                                                                    - 포인트 3
+
+                                                                다음은 합칠 요약입니다:
+                                                                {text}
+                                                                '''
+
+
+def make_summary_model(model_name: str = SUMMARY_MODEL_NAME):
+    """질문별로 나눠 요약한 뒤 합치는 MapReduceSummarizer를 만듭니다."""
+    from langchain.chat_models import ChatOpenAI
+    from langchain.prompts import PromptTemplate
+
+    from AnalyzeMeeting.llm_model import LLMModel
+    from AnalyzeMeeting.summarizer import MapReduceSummarizer
 
-summary_model = LLMModel(ChatOpenAI(model='gpt-4o-mini'), None, device, summary_prompt, summary_user_prompt_template)
\ No newline at end of file
+    summary_user_prompt_template = PromptTemplate.from_template(summary_user_prompt)
+    summary_merge_prompt_template = PromptTemplate.from_template(summary_merge_prompt)
+    llm_model = LLMModel(ChatOpenAI(model=model_name), None, None, summary_prompt, summary_user_prompt_template)
+    # 프롬프트나 모델이 바뀌면 질문별 요약 캐시를 새로 쓰도록 키에 포함
+    namespace = hashlib.sha1(f"{model_name}\x00{summary_prompt}\x00{summary_user_prompt}\x00{summary_merge_prompt}".encode('utf-8')).hexdigest()
+    return MapReduceSummarizer(llm_model, summary_merge_prompt_template, namespace=namespace)
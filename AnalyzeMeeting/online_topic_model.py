@@ -0,0 +1,250 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.special import psi
+from sklearn.decomposition import LatentDirichletAllocation
+
+from AnalyzeMeeting.lda_vis import prepare_lda_vis
+from AnalyzeMeeting.topic_model import fit_best_lda
+
+# 답변이 이 수에 처음 도달하면 백그라운드에서 처음부터 학습 (그 전에는 요청이 올 때 학습)
+ONLINE_TOPIC_MIN_DOCS = int(os.getenv("ONLINE_TOPIC_MIN_DOCS", "10"))
+# 어휘가 이 크기에 도달하면 새 단어는 무시 (refit 때 다시 반영)
+ONLINE_TOPIC_MAX_VOCAB = int(os.getenv("ONLINE_TOPIC_MAX_VOCAB", "20000"))
+# 메모리에 유지하는 회의 모델 수 상한(LRU)과 이 시간(초) 동안 쓰지 않은 모델을 내리는 기준
+ONLINE_TOPIC_MAX_MEETINGS = int(os.getenv("ONLINE_TOPIC_MAX_MEETINGS", "100"))
+ONLINE_TOPIC_IDLE_TTL = float(os.getenv("ONLINE_TOPIC_IDLE_TTL", "3600"))
+
+EMPTY_VOCABULARY = 'empty vocabulary; perhaps the documents only contain stop words'
+
+
+def grow_vocabulary(lda: LatentDirichletAllocation, n_features: int, rng: np.random.Generator):
+    """학습된 LDA의 토픽-단어 행렬에 새 단어 열을 추가합니다. 새 열은 sklearn 초기화와 같은 분포로 채웁니다."""
+    extra = n_features - lda.components_.shape[1]
+    if extra <= 0:
+        return
+    new_columns = rng.gamma(100.0, 0.01, (lda.n_components, extra))
+    lda.components_ = np.hstack([lda.components_, new_columns])
+    lda.exp_dirichlet_component_ = np.exp(psi(lda.components_) - psi(lda.components_.sum(axis=1))[:, None])
+    lda.n_features_in_ = n_features
+
+
+class OnlineTopicModel():
+    """회의 하나의 온라인 LDA 상태입니다. 답변 하나를 문서 하나로 보고, 새 답변만 partial_fit 합니다.
+
+    처음 학습과 refit은 TopicModel과 같은 후보 선택(fit_best_lda)으로 토픽 수를 고르며, 답변 수와 관계없이
+    같은 문서/어휘 정의를 쓰므로 답변이 늘어도 결과의 의미가 바뀌지 않습니다.
+    어휘는 처음 보는 단어가 나올 때마다 열을 늘리며, 시각화 JSON은 모델이 바뀔 때만 다시 계산합니다.
+    """
+    def __init__(self, candidates: Optional[List[int]] = None, min_docs: int = ONLINE_TOPIC_MIN_DOCS,
+                 max_vocab: int = ONLINE_TOPIC_MAX_VOCAB):
+        self.candidates = candidates
+        # 학습할 때 후보 중에서 고른 토픽 수
+        self.n_components: Optional[int] = None
+        self.min_docs = min_docs
+        self.max_vocab = max_vocab
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        # 문서별 (단어 번호 배열, 빈도 배열)
+        self.docs: List[Tuple[np.ndarray, np.ndarray]] = []
+        # 지금까지 반영한 MeetingScript 행 수
+        self.source_rows = 0
+        self.lda: Optional[LatentDirichletAllocation] = None
+        self.version = 0
+        self.updates = 0
+        self.refits = 0
+        self._json: Optional[Dict] = None
+        self._json_version = -1
+        self._rng = np.random.default_rng(42)
+        self.last_used = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def fitted(self) -> bool:
+        return self.lda is not None
+
+    def _add_doc(self, tokens: List[str]) -> bool:
+        counts = Counter()
+        for token in tokens:
+            column = self.vocabulary.get(token)
+            if column is None:
+                if len(self.terms) >= self.max_vocab:
+                    continue
+                column = self.vocabulary[token] = len(self.terms)
+                self.terms.append(token)
+            counts[column] += 1
+        if not counts:
+            return False
+        self.docs.append((np.fromiter(counts.keys(), dtype=np.int64), np.fromiter(counts.values(), dtype=np.float64)))
+        return True
+
+    def _matrix(self, start: int = 0) -> csr_matrix:
+        docs = self.docs[start:]
+        indptr = np.cumsum([0] + [len(indices) for indices, _ in docs])
+        indices = np.concatenate([indices for indices, _ in docs]) if docs else np.zeros(0, dtype=np.int64)
+        data = np.concatenate([counts for _, counts in docs]) if docs else np.zeros(0)
+        return csr_matrix((data, indices, indptr), shape=(len(docs), len(self.terms)))
+
+    def _refit(self):
+        self.lda, self.n_components, _ = fit_best_lda(self._matrix(), self.candidates)
+        self.refits += 1
+
+    def sync(self, meeting_script):
+        """MeetingScript에서 아직 반영하지 않은 답변을 반영합니다. 모델이 없으면 문서가 충분히 모였을 때 처음부터 학습합니다."""
+        with self._lock:
+            with meeting_script.lock:
+                token_rows = meeting_script.columns['tokens'][self.source_rows:len(meeting_script)]
+            if not token_rows:
+                return
+            start = len(self.docs)
+            added = sum(self._add_doc(tokens) for tokens in token_rows if tokens)
+            self.source_rows += len(token_rows)
+            if not added:
+                return
+            if self.lda is None:
+                if len(self.docs) >= self.min_docs:
+                    self._refit()
+            else:
+                grow_vocabulary(self.lda, len(self.terms), self._rng)
+                # 전체 문서 수 기준으로 새 문서의 가중치를 정함
+                self.lda.set_params(total_samples=len(self.docs))
+                self.lda.partial_fit(self._matrix(start))
+                self.updates += 1
+            self.version += 1
+
+    def refit(self):
+        """지금까지 반영한 답변 전체로 토픽 수를 다시 고르고 처음부터 학습합니다."""
+        with self._lock:
+            if not self.docs:
+                raise ValueError(EMPTY_VOCABULARY)
+            self._refit()
+            self.version += 1
+
+    def topic_json(self) -> Dict:
+        with self._lock:
+            if self.lda is None:
+                raise ValueError(EMPTY_VOCABULARY)
+            if self._json_version != self.version:
+                self._json = prepare_lda_vis(self.lda, self._matrix(), self.terms)
+                self._json_version = self.version
+            return self._json
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'docs': len(self.docs),
+                'vocabulary': len(self.terms),
+                'fitted': self.lda is not None,
+                'n_components': self.n_components or 0,
+                'updates': self.updates,
+                'refits': self.refits,
+            }
+
+
+class OnlineTopicRegistry():
+    """회의별 OnlineTopicModel을 관리합니다.
+
+    MeetingRegistry의 listener로 등록되어 답변이 추가되면 회의를 큐에 넣고,
+    백그라운드 스레드가 그동안 쌓인 답변을 한 번에 모델에 반영합니다.
+    모델은 최근 사용 순으로 max_meetings개까지 유지하고, idle_ttl 동안 쓰지 않은 모델은 내립니다.
+    (내린 회의는 다음 요청 때 MeetingScript에서 다시 학습)
+    """
+    def __init__(self, meetings, max_meetings: int = ONLINE_TOPIC_MAX_MEETINGS, idle_ttl: float = ONLINE_TOPIC_IDLE_TTL):
+        self.meetings = meetings
+        self.max_meetings = max_meetings
+        self.idle_ttl = idle_ttl
+        self.models: "OrderedDict[Tuple[int, int], OnlineTopicModel]" = OrderedDict()
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[int, int]]]" = queue.Queue()
+        self._pending = set()
+        self._worker: Optional[threading.Thread] = None
+        meetings.add_listener(self.on_answer)
+
+    def on_answer(self, meeting_script, question_id, tokens):
+        key = (meeting_script.corp_id, meeting_script.meeting_id)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._queue.put(key)
+
+    def _get_model(self, key: Tuple[int, int]) -> OnlineTopicModel:
+        with self._lock:
+            if key not in self.models:
+                self.models[key] = OnlineTopicModel()
+            self.models.move_to_end(key)
+            model = self.models[key]
+            model.last_used = time.time()
+            while len(self.models) > max(1, self.max_meetings):
+                self.models.popitem(last=False)
+                self.evictions += 1
+            return model
+
+    def evict_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [key for key, model in self.models.items() if now - model.last_used > self.idle_ttl]
+            for key in expired:
+                del self.models[key]
+            self.evictions += len(expired)
+
+    def _sync(self, corp_id, meeting_id) -> OnlineTopicModel:
+        meeting_script = self.meetings.get(corp_id, meeting_id)
+        model = self._get_model((corp_id, meeting_id))
+        model.sync(meeting_script)
+        return model
+
+    def _worker_loop(self):
+        while True:
+            try:
+                # 답변이 없을 때도 주기적으로 오래된 모델을 내림
+                key = self._queue.get(timeout=min(self.idle_ttl, 60))
+            except queue.Empty:
+                self.evict_expired()
+                continue
+            if key is None:
+                break
+            with self._lock:
+                self._pending.discard(key)
+            try:
+                self._sync(*key)
+            except Exception as e:
+                print(f"토픽 모델 업데이트 중 오류가 발생했습니다: {e}")
+
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._worker_loop, name='online-topic', daemon=True)
+            self._worker.start()
+
+    def topic_json(self, corp_id, meeting_id, refit: bool = False) -> Dict:
+        """회의의 최신 토픽 시각화 JSON을 반환합니다. 반영되지 않은 답변이 있으면 먼저 반영합니다.
+
+        답변이 min_docs보다 적어 아직 학습 전이면 지금까지의 답변으로 바로 학습하고, 이후 답변은 partial_fit으로 반영합니다.
+        """
+        model = self._sync(corp_id, meeting_id)
+        if refit or not model.fitted:
+            model.refit()
+        return model.topic_json()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            models = list(self.models.items())
+        return {
+            'meetings': len(models),
+            'evictions': self.evictions,
+            'pending': self._queue.qsize(),
+            'models': {f'{corp_id}/{meeting_id}': model.stats() for (corp_id, meeting_id), model in models},
+        }
+
+    def shutdown(self):
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
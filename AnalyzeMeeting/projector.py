@@ -0,0 +1,106 @@
+import glob
+import os
+import socket
+import struct
+import time
+from typing import List
+
+import numpy as np
+
+# 임베딩 텐서 저장 형식: bytes(float32 바이너리) | tsv
+PROJECTOR_TENSOR_FORMAT = os.getenv("PROJECTOR_TENSOR_FORMAT", "bytes")
+# 큰 행렬은 이 행 수만큼씩 나눠서 기록
+PROJECTOR_CHUNK_ROWS = int(os.getenv("PROJECTOR_CHUNK_ROWS", "4096"))
+
+
+def _make_crc32c_table():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC32C_TABLE = _make_crc32c_table()
+
+
+def _masked_crc32c(data: bytes) -> int:
+    crc = 0xFFFFFFFF
+    for byte in data:
+        crc = _CRC32C_TABLE[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    crc ^= 0xFFFFFFFF
+    return (((crc >> 15) | (crc << 17)) + 0xA282EAD8) & 0xFFFFFFFF
+
+
+def write_event_marker(log_dir: str):
+    """file_version만 담은 최소 이벤트 파일(TFRecord)을 기록합니다.
+
+    TensorBoard는 이벤트 파일이 있는 폴더만 run으로 인식하므로, 상위 logdir 하나로
+    여러 run의 projector를 띄우려면 각 폴더에 이 파일이 있어야 합니다.
+    """
+    if glob.glob(os.path.join(log_dir, 'events.out.tfevents.*')):
+        return
+    version = b'brain.Event:2'
+    # Event proto: wall_time(1, double), file_version(3, string)
+    event = b'\x09' + struct.pack('<d', time.time()) + b'\x1a' + bytes([len(version)]) + version
+    length = struct.pack('<Q', len(event))
+    record = length + struct.pack('<I', _masked_crc32c(length)) + event + struct.pack('<I', _masked_crc32c(event))
+    path = os.path.join(log_dir, f'events.out.tfevents.{int(time.time())}.{socket.gethostname()}')
+    with open(path, 'wb') as f:
+        f.write(record)
+
+
+def _clean_label(label) -> str:
+    # metadata.tsv는 한 줄에 한 항목이므로 탭/줄바꿈 제거
+    return ' '.join(str(label).split()) or ' '
+
+
+def write_metadata(path: str, labels: List[str]):
+    with open(path, 'w', encoding='utf-8') as f:
+        for label in labels:
+            f.write(f"{_clean_label(label)}\n")
+
+
+def write_tensor(path: str, vectors: np.ndarray, tensor_format: str = PROJECTOR_TENSOR_FORMAT,
+                 chunk_rows: int = PROJECTOR_CHUNK_ROWS):
+    """(N, dim) 행렬을 chunk_rows 행씩 float32 바이너리 또는 TSV로 기록합니다."""
+    with open(path, 'wb') as f:
+        for start in range(0, len(vectors), chunk_rows):
+            chunk = np.asarray(vectors[start:start + chunk_rows], dtype='<f4')
+            if tensor_format == 'bytes':
+                f.write(chunk.tobytes())
+            else:
+                np.savetxt(f, chunk, delimiter='\t', fmt='%.6g', encoding='utf-8')
+
+
+def write_projector_config(log_dir: str, tensor_name: str, tensor_file: str, shape, metadata_file: str = 'metadata.tsv'):
+    # TensorBoard projector 플러그인이 읽는 projector_config.pbtxt (protobuf text format)
+    lines = [
+        'embeddings {',
+        f'  tensor_name: "{tensor_name}"',
+        f'  tensor_path: "{tensor_file}"',
+        *[f'  tensor_shape: {int(size)}' for size in shape],
+        f'  metadata_path: "{metadata_file}"',
+        '}',
+    ]
+    with open(os.path.join(log_dir, 'projector_config.pbtxt'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def export_projector(log_dir: str, vectors: np.ndarray, labels: List[str], tensor_name: str = 'token_embeddings',
+                     tensor_format: str = PROJECTOR_TENSOR_FORMAT, chunk_rows: int = PROJECTOR_CHUNK_ROWS) -> str:
+    """TensorFlow 없이 TensorBoard projector가 읽을 수 있는 파일들을 log_dir에 기록합니다."""
+    if tensor_format not in ('bytes', 'tsv'):
+        raise ValueError(f"지원하지 않는 텐서 형식입니다: {tensor_format}")
+    if len(vectors) != len(labels):
+        raise ValueError(f"벡터 수({len(vectors)})와 메타데이터 수({len(labels)})가 다릅니다.")
+    os.makedirs(log_dir, exist_ok=True)
+
+    tensor_file = f'tensors.{tensor_format}'
+    write_metadata(os.path.join(log_dir, 'metadata.tsv'), labels)
+    write_tensor(os.path.join(log_dir, tensor_file), vectors, tensor_format, chunk_rows)
+    write_projector_config(log_dir, tensor_name, tensor_file, np.shape(vectors))
+    write_event_marker(log_dir)
+    return log_dir
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# ONNX 변환 결과 저장 경로
+SENTIMENT_ONNX_DIR = os.getenv("SENTIMENT_ONNX_DIR", "./models/onnx")
+SENTIMENT_ONNX_THREADS = int(os.getenv("SENTIMENT_ONNX_THREADS", "0"))
+
+# ONNX 변환 후 PyTorch와 점수를 비교할 문장
+PARITY_SENTENCES = [
+    "저는 분홍색 패키지가 더 예쁜 것 같아요. 화사한 느낌이 좋아요.",
+    "분홍색 패키지는 너무 흔한 느낌이 들어서 별로예요.",
+    "초록색 패키지가 더 안정감을 주는 느낌이에요.",
+    "느낌",
+    "부담스러워요",
+]
+PARITY_ATOL = {'onnx': 1e-3, 'onnx-int8': 5e-2}
+
+
+class OnnxParityError(ValueError):
+    """변환한 ONNX 모델의 점수가 PyTorch와 허용 오차 이상 다를 때 발생합니다."""
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def resolve_revision(model_name: str, revision: str) -> str:
+    """브랜치 이름(main 등)을 실제 커밋 해시로 바꿉니다. 알 수 없으면 그대로 반환"""
+    from transformers import AutoConfig
+
+    config = AutoConfig.from_pretrained(model_name, revision=revision)
+    return getattr(config, '_commit_hash', None) or revision
+
+
+class TorchSentimentBackend():
+    """transformers PyTorch 모델로 추론하는 기본 백엔드"""
+    name = 'torch'
+
+    def __init__(self, model_name: str, revision: str, device: Optional[str] = None):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        self.torch = torch
+        self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=revision)
+        self.model.to(self.device)
+        self.model.eval()
+
+    def predict_proba(self, encoded: Dict[str, np.ndarray]) -> np.ndarray:
+        inputs = {key: self.torch.from_numpy(value).to(self.device) for key, value in encoded.items()}
+        with self.torch.inference_mode():
+            logits = self.model(**inputs).logits
+        return logits.softmax(dim=-1).float().cpu().numpy()
+
+
+class OnnxSentimentBackend():
+    """변환된 ONNX 모델을 onnxruntime(CPU)으로 추론하는 백엔드 (name: onnx | onnx-int8)"""
+    def __init__(self, model_path: str, name: str = 'onnx', num_threads: int = SENTIMENT_ONNX_THREADS):
+        import onnxruntime as ort
+
+        self.name = name
+        self.device = 'cpu'
+        self.model_path = model_path
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(self.model_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def predict_proba(self, encoded: Dict[str, np.ndarray]) -> np.ndarray:
+        feeds = {key: value.astype(np.int64) for key, value in encoded.items() if key in self.input_names}
+        logits = self.session.run(['logits'], feeds)[0]
+        return softmax(logits)
+
+
+@contextmanager
+def _atomic_output(path: str):
+    """같은 디렉터리의 고유한 임시 파일 경로를 넘겨주고, 성공하면 path로 교체하고 실패하면 지웁니다.
+
+    여러 워커 프로세스가 동시에 변환해도 서로의 임시 파일을 덮어쓰지 않습니다.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _export_onnx(model, tokenizer, path: str):
+    import torch
+
+    sample = tokenizer(PARITY_SENTENCES[:2], padding='longest', return_tensors='pt')
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch'}
+    with _atomic_output(path) as tmp_path, torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (dict(sample),),
+            tmp_path,
+            input_names=input_names,
+            output_names=['logits'],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            do_constant_folding=True,
+        )
+
+
+def _quantize_onnx(src_path: str, dst_path: str):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    with _atomic_output(dst_path) as tmp_path:
+        quantize_dynamic(src_path, tmp_path, weight_type=QuantType.QInt8)
+
+
+def check_parity(reference, candidate, tokenizer, sentences: List[str] = PARITY_SENTENCES, atol: float = 1e-3) -> Dict:
+    """두 백엔드의 확률 출력을 비교합니다."""
+    encoded = dict(tokenizer(sentences, padding='longest', truncation=True, return_tensors='np'))
+    expected = reference.predict_proba(encoded)
+    actual = candidate.predict_proba(encoded)
+    max_abs_diff = float(np.abs(expected - actual).max())
+    return {
+        "backend": candidate.name,
+        "max_abs_diff": max_abs_diff,
+        "label_agreement": float((expected.argmax(axis=-1) == actual.argmax(axis=-1)).mean()),
+        "atol": atol,
+        "passed": max_abs_diff <= atol,
+    }
+
+
+def _checked(model_path: str, parity: Dict) -> str:
+    if not parity['passed']:
+        raise OnnxParityError(f"ONNX 감정 모델 점수가 PyTorch와 다릅니다: {parity}")
+    return model_path
+
+
+def ensure_onnx_model(model_name: str, revision: str, tokenizer, quantize: bool = False, export_dir: str = SENTIMENT_ONNX_DIR) -> str:
+    """ONNX 모델 경로를 반환합니다. 디스크에 없을 때만 변환(및 양자화)하고 PyTorch와 점수를 비교합니다.
+
+    비교 결과는 parity.<백엔드>.json에 남기며, 허용 오차를 넘은 모델이면 OnnxParityError를 던집니다.
+    """
+    model_dir = os.path.join(export_dir, f"{model_name.replace('/', '--')}-{revision[:12]}")
+    fp32_path = os.path.join(model_dir, 'model.onnx')
+    int8_path = os.path.join(model_dir, 'model.int8.onnx')
+    name = 'onnx-int8' if quantize else 'onnx'
+    target_path = int8_path if quantize else fp32_path
+    parity_path = os.path.join(model_dir, f"parity.{name}.json")
+    if os.path.exists(target_path) and os.path.exists(parity_path):
+        with open(parity_path, encoding='utf-8') as f:
+            return _checked(target_path, json.load(f))
+
+    os.makedirs(model_dir, exist_ok=True)
+    reference = TorchSentimentBackend(model_name, revision, device='cpu')
+    if not os.path.exists(fp32_path):
+        _export_onnx(reference.model, tokenizer, fp32_path)
+    if quantize and not os.path.exists(int8_path):
+        _quantize_onnx(fp32_path, int8_path)
+
+    # 새로 만든(또는 아직 비교하지 않은) 모델은 PyTorch 결과와 비교해 기록
+    candidate = OnnxSentimentBackend(target_path, name=name)
+    parity = check_parity(reference, candidate, tokenizer, atol=PARITY_ATOL[name])
+    with _atomic_output(parity_path) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(parity, f, ensure_ascii=False, indent=2)
+    return _checked(target_path, parity)
+
+
+def make_sentiment_backend(backend: str, model_name: str, revision: str, tokenizer, device: Optional[str] = None):
+    if backend == 'torch':
+        return TorchSentimentBackend(model_name, revision, device=device)
+    if backend in ('onnx', 'onnx-int8'):
+        try:
+            model_path = ensure_onnx_model(model_name, revision, tokenizer, quantize=(backend == 'onnx-int8'))
+        except OnnxParityError as e:
+            # 점수가 다른 모델로 캐시를 채우지 않도록 PyTorch 백엔드 사용 (캐시 키도 torch로 바뀜)
+            logging.warning(f"{e} PyTorch 백엔드를 사용합니다.")
+            return TorchSentimentBackend(model_name, revision, device=device)
+        return OnnxSentimentBackend(model_path, name=backend)
+    raise ValueError(f"지원하지 않는 감정 분석 백엔드입니다: {backend}")
@@ -1,24 +1,111 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, TextClassificationPipeline
+import os
+import struct
 from collections import Counter, defaultdict
-from AnalyzeMeeting.text_organize import tokenize_text, remove_stopwords
+from typing import Dict, List, Optional
+
+from AnalyzeMeeting.sentiment_backend import make_sentiment_backend, resolve_revision
+from AnalyzeMeeting.text_organize import tokenize_answers
+from utils.cache import TieredCache
+
+SENTIMENT_MODEL_NAME = "jaehyeong/koelectra-base-v3-generalized-sentiment-analysis"
+SENTIMENT_MODEL_REVISION = os.getenv("SENTIMENT_MODEL_REVISION", "main")
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+# 추론 백엔드: torch | onnx | onnx-int8
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+# 토큰 감정 점수 캐시 (빈 문자열이면 디스크 계층 사용 안 함)
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "./data/sentiment_cache.db")
+SENTIMENT_CACHE_MAX_ITEMS = int(os.getenv("SENTIMENT_CACHE_MAX_ITEMS", "200000"))
+
+
+class SentimentScoreCache(TieredCache):
+    """토큰 -> 감정 점수 캐시. 메모리 LRU 뒤에 SQLite 파일을 두고, 키에 모델 이름/리비전을 포함합니다."""
+    def __init__(self, model_key: str, path: Optional[str] = SENTIMENT_CACHE_PATH, max_items: int = SENTIMENT_CACHE_MAX_ITEMS):
+        super().__init__(max_items * 256, path, table='token_sentiment', max_items=max_items,
+                         encode=lambda score: struct.pack('<d', score),
+                         decode=lambda value: struct.unpack('<d', value)[0])
+        self.model_key = model_key
+        self.model_calls = 0
+
+    def _key(self, token: str) -> str:
+        return f"{self.model_key}\x00{token}"
+
+    def get_many(self, tokens: List[str]) -> Dict[str, float]:
+        found = super().get_many(self._key(token) for token in tokens)
+        return {token: found[self._key(token)] for token in tokens if self._key(token) in found}
+
+    def set_many(self, scores: Dict[str, float]):
+        self.model_calls += len(scores)
+        super().set_many({self._key(token): score for token, score in scores.items()})
+
+    def stats(self) -> Dict[str, float]:
+        stats = super().stats()
+        stats['model_calls'] = self.model_calls
+        stats['model'] = self.model_key
+        return stats
+
 
 class SentimentAnalyzer:
-    def __init__(self):
-        # 모델 초기화
-        self.tokenizer = AutoTokenizer.from_pretrained("jaehyeong/koelectra-base-v3-generalized-sentiment-analysis")
-        self.model = AutoModelForSequenceClassification.from_pretrained("jaehyeong/koelectra-base-v3-generalized-sentiment-analysis")
-        self.sentiment_classifier = TextClassificationPipeline(tokenizer=self.tokenizer, model=self.model, device=0)
+    def __init__(self, model_name=SENTIMENT_MODEL_NAME, batch_size=SENTIMENT_BATCH_SIZE, device=None,
+                 revision=SENTIMENT_MODEL_REVISION, cache_path=SENTIMENT_CACHE_PATH, backend=SENTIMENT_BACKEND):
+        # 모델 초기화 (torch 백엔드는 GPU가 없으면 CPU 사용)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        # 브랜치 이름 대신 실제 커밋 해시를 캐시 키로 사용
+        self.revision = resolve_revision(model_name, revision)
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, revision=self.revision)
+        self.backend = make_sentiment_backend(backend, model_name, self.revision, self.tokenizer, device=device)
+        self.device = self.backend.device
+        # 양자화 모델은 점수가 조금 다르므로 백엔드별로 캐시를 분리
+        self.score_cache = SentimentScoreCache(f"{model_name}@{self.revision}/{self.backend.name}", path=cache_path)
+
+    def predict_scores(self, texts: List[str]) -> List[float]:
+        """문장 리스트의 감정 점수(최고 확률 레이블의 점수)를 입력 순서대로 반환합니다.
+
+        중복 문장은 한 번만 추론하고, 길이순으로 정렬해 batch_size 단위로 묶어
+        배치 안에서 가장 긴 문장에 맞춰 패딩합니다.
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        order = sorted(range(len(unique_texts)), key=lambda i: len(unique_texts[i]))
+        scores = [0.0] * len(unique_texts)
+
+        for start in range(0, len(order), self.batch_size):
+            batch_idx = order[start:start + self.batch_size]
+            encoded = self.tokenizer(
+                [unique_texts[i] for i in batch_idx],
+                padding='longest',
+                truncation=True,
+                return_tensors='np',
+            )
+            batch_scores = self.backend.predict_proba(dict(encoded)).max(axis=-1).tolist()
+            for i, score in zip(batch_idx, batch_scores):
+                scores[i] = score
+
+        score_by_text = dict(zip(unique_texts, scores))
+        return [score_by_text[text] for text in texts]
+
+    def score_tokens(self, tokens: List[str]) -> Dict[str, float]:
+        """토큰별 감정 점수. 캐시에 없는 토큰만 모델로 추론합니다."""
+        scores = self.score_cache.get_many(tokens)
+        unseen = [token for token in tokens if token not in scores]
+        if unseen:
+            new_scores = dict(zip(unseen, self.predict_scores(unseen)))
+            self.score_cache.set_many(new_scores)
+            scores.update(new_scores)
+        return scores
 
     def analyze_sentence_sentiment(self, responses, most_k=5):
         result = defaultdict(dict)
         all_tokens = []
-        for response in responses:
-            sentence = response['answer']
-            pred = self.sentiment_classifier(sentence)
-            result[sentence]['sentiment_score'] = pred[0]['score']
+        sentences = [response['answer'] for response in responses]
+        # 모든 답변을 한 번에 토큰화 / 추론
+        tokenized_sentences = tokenize_answers(sentences)
+        sentence_scores = self.predict_scores(sentences)
+        for sentence, tokens, score in zip(sentences, tokenized_sentences, sentence_scores):
+            result[sentence]['sentiment_score'] = score
             if 'tokens' not in result[sentence]:
                 result[sentence]['tokens'] = []
-            tokens = remove_stopwords(tokenize_text(sentence))
             result[sentence]['tokens'].extend(tokens)
             all_tokens.extend(tokens)
         
@@ -28,13 +115,13 @@ class SentimentAnalyzer:
 
     def analyze_token_sentiment(self, tokens):
         token_counter = Counter(tokens)
+        token_scores = self.score_tokens(list(token_counter.keys()))
         result = {}
-        for key in token_counter.keys():
-            if key not in result:
-                result[key] = {}
-            pred = self.sentiment_classifier(key)
-            result[key]['freq'] = token_counter[key]
-            result[key]['sentiment_score'] = pred[0]['score']
+        for key, freq in token_counter.items():
+            result[key] = {
+                'freq': freq,
+                'sentiment_score': token_scores[key],
+            }
         return result
 
 
@@ -1,35 +1,140 @@
 import os
-import uuid
-import whisper
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from AnalyzeMeeting.audio import decode_audio, preprocess_for_stt
+
+# STT 백엔드: whisper(openai-whisper) | faster-whisper(CTranslate2)
+STT_BACKEND = os.getenv("STT_BACKEND", "whisper")
+STT_MODEL_NAME = os.getenv("STT_MODEL_NAME", "large-v3")
+# 짧은 답변용 작은 모델 (비우면 라우팅하지 않음). 처음 사용할 때 로드
+STT_SHORT_MODEL_NAME = os.getenv("STT_SHORT_MODEL_NAME", "small")
+# 전처리 후 남은 발화가 이 길이(초) 이하이면 작은 모델 사용
+STT_SHORT_CLIP_SEC = float(os.getenv("STT_SHORT_CLIP_SEC", "3.0"))
+# auto이면 GPU가 있을 때 cuda, 없으면 cpu
+STT_DEVICE = os.getenv("STT_DEVICE", "auto")
+# faster-whisper compute_type (비우면 cpu는 int8, cuda는 float16)
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "")
+STT_CPU_THREADS = int(os.getenv("STT_CPU_THREADS", "0"))
+STT_LANGUAGE = "ko"
+
+
+def _detect_device() -> str:
+    try:
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+    except ImportError:
+        return 'cpu'
+
 
 class STTWhisper:
-    def __init__(self, model_name="large-v3"):
-        """Whisper 모델을 로드합니다."""
-        self.model = whisper.load_model(model_name)
-        self.model.to("cuda")
-        
-    def prepare_audio(self, audio_file: bytes) -> str:
-        """오디오 데이터를 임시 파일로 저장하고 경로를 반환합니다."""
-        file_uuid = str(uuid.uuid4())
-        file_path = os.path.join('./tmp', f"{file_uuid}.wav")
-        if not os.path.exists('./tmp'):
-            os.mkdir('./tmp')
-        with open(file_path, "wb") as f:
-            f.write(audio_file)
-        return file_path
-    
-    def transcribe(self, audio_file: bytes) -> str:
-        """Whisper 모델을 사용하여 오디오 파일을 텍스트로 변환합니다."""
-        file_path = self.prepare_audio(audio_file)
-        result = self.model.transcribe(file_path, language='ko')
-        os.remove(file_path)  # 임시 파일 삭제
+    def __init__(self, model_name: str = STT_MODEL_NAME, backend: str = STT_BACKEND, device: str = STT_DEVICE,
+                 compute_type: str = STT_COMPUTE_TYPE, cpu_threads: int = STT_CPU_THREADS,
+                 short_model_name: Optional[str] = STT_SHORT_MODEL_NAME, short_clip_sec: float = STT_SHORT_CLIP_SEC):
+        """Whisper 모델을 로드합니다. GPU가 없으면 CPU에서 실행합니다."""
+        if backend not in ('whisper', 'faster-whisper'):
+            raise ValueError(f"알 수 없는 STT 백엔드입니다: {backend}")
+        self.model_name = model_name
+        self.short_model_name = short_model_name or None
+        self.short_clip_sec = short_clip_sec
+        self.backend = backend
+        self.device = _detect_device() if device == 'auto' else device
+        self.cpu_threads = cpu_threads
+        if backend == 'whisper':
+            # openai-whisper는 CPU에서 fp16을 지원하지 않음
+            self.compute_type = 'float16' if self.device == 'cuda' else 'float32'
+        else:
+            self.compute_type = compute_type or ('float16' if self.device == 'cuda' else 'int8')
+
+        self.models = {}
+        # 모델 이름별 로드 잠금 (작은 모델을 처음 로드하는 동안에도 이미 로드된 모델은 계속 사용)
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.model = self._get_model(model_name)
+
+    def _load_model(self, model_name: str):
+        if self.backend == 'faster-whisper':
+            from faster_whisper import WhisperModel
+            model = WhisperModel(model_name, device=self.device, compute_type=self.compute_type,
+                                 cpu_threads=self.cpu_threads)
+        else:
+            import whisper
+            model = whisper.load_model(model_name, device=self.device)
+        print(f"STT 모델 로드: {self.backend}/{model_name} ({self.device}, {self.compute_type})")
+        return model
+
+    def _get_model(self, model_name: str):
+        model = self.models.get(model_name)
+        if model is not None:
+            return model
+        with self._lock:
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+        with load_lock:
+            if model_name not in self.models:
+                self.models[model_name] = self._load_model(model_name)
+            return self.models[model_name]
+
+    def route(self, speech_sec: float) -> str:
+        """발화 길이에 따라 사용할 모델 이름을 고릅니다."""
+        if self.short_model_name and speech_sec <= self.short_clip_sec:
+            return self.short_model_name
+        return self.model_name
+
+    def transcribe_array(self, samples: np.ndarray, model_name: Optional[str] = None) -> str:
+        """16kHz float32 모노 배열을 (전처리 없이) 텍스트로 변환합니다."""
+        model = self._get_model(model_name or self.model_name)
+        if self.backend == 'faster-whisper':
+            segments, _ = model.transcribe(samples, language=STT_LANGUAGE, beam_size=5)
+            return ''.join(segment.text for segment in segments)
+        result = model.transcribe(samples, language=STT_LANGUAGE, fp16=self.device == 'cuda')
         return result['text']
 
+    def transcribe_samples(self, samples: np.ndarray) -> Tuple[str, Dict[str, Union[float, str]]]:
+        """침묵을 잘라낸 뒤 길이에 맞는 모델로 변환합니다. 전부 침묵이면 모델을 호출하지 않습니다."""
+        start = time.perf_counter()
+        speech, timings = preprocess_for_stt(samples)
+        preprocessed = time.perf_counter()
+        timings['preprocess_sec'] = round(preprocessed - start, 4)
+
+        if len(speech) == 0:
+            timings.update({'model': '', 'skipped': 1, 'transcribe_sec': 0.0, 'rtf': 0.0})
+            return '', timings
+
+        model_name = self.route(timings['kept_sec'])
+        text = self.transcribe_array(speech, model_name)
+        transcribe_sec = time.perf_counter() - preprocessed
+        timings.update({
+            'model': model_name,
+            'skipped': 0,
+            'transcribe_sec': round(transcribe_sec, 4),
+            # real-time factor(원본 길이 기준): 1보다 작으면 실시간보다 빠름
+            'rtf': round(transcribe_sec / timings['audio_sec'], 4) if timings['audio_sec'] else 0.0,
+        })
+        return text, timings
+
+    def transcribe_with_timings(self, audio_file: bytes) -> Tuple[str, Dict[str, Union[float, str]]]:
+        """오디오 바이트를 메모리에서 디코딩해 변환하고, 단계별 소요 시간과 잘라낸 길이를 함께 반환합니다."""
+        start = time.perf_counter()
+        samples = decode_audio(audio_file)
+        decode_sec = time.perf_counter() - start
+        text, timings = self.transcribe_samples(samples)
+        timings['decode_sec'] = round(decode_sec, 4)
+        return text, timings
+
+    def transcribe(self, audio_file: bytes) -> str:
+        """Whisper 모델을 사용하여 오디오 데이터를 텍스트로 변환합니다."""
+        text, _ = self.transcribe_with_timings(audio_file)
+        return text
 
 
 if __name__ == "__main__":
-    # voice = "UklGRqR2AwBXQVZFZm10IBAAAAABAAEAwF0AAIC7AAACABAAZGF0YYB2AwAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAEAAAAAAAAAAAAAAAAAAQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA"
-    # voice_data = base64.b64decode(voice)
-    # transcription = stt_whisper(voice_data)
-    # print(f'transcription: {transcription}')
-    pass
\ No newline at end of file
+    import sys
+
+    stt_whisper = STTWhisper()
+    with open(sys.argv[1], 'rb') as f:
+        transcription, timings = stt_whisper.transcribe_with_timings(f.read())
+    print(f'transcription: {transcription}')
+    print(f'timings: {timings}')
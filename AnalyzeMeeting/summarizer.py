@@ -0,0 +1,144 @@
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from utils.cache import TieredCache
+
+# LLM 호출 한 번에 넣을 입력 토큰 수 상한 (프롬프트 제외)
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "3000"))
+# 토큰 수 추정에 쓰는 토큰당 글자 수 (한국어 기준 대략값)
+SUMMARY_CHARS_PER_TOKEN = float(os.getenv("SUMMARY_CHARS_PER_TOKEN", "1.5"))
+# 한 번에 합치는 부분 요약 수
+SUMMARY_MERGE_FANIN = int(os.getenv("SUMMARY_MERGE_FANIN", "8"))
+# 동시에 보내는 LLM 요청 수
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "8"))
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / SUMMARY_CHARS_PER_TOKEN)
+
+
+def format_question(question: str, answers: List[str]) -> str:
+    return '\n'.join([f"질문: {question}", "답변:"] + [f"- {answer}" for answer in answers])
+
+
+def chunk_answers(question: str, answers: List[str], budget: int) -> List[List[str]]:
+    """질문 하나의 답변을 budget 토큰 이하의 묶음으로 나눕니다. 한 답변이 budget보다 길면 잘라서 넣습니다."""
+    budget = max(1, budget - estimate_tokens(format_question(question, [])))
+    # 답변마다 붙는 줄바꿈과 "- " 세 글자도 budget에 포함
+    max_chars = max(1, int(budget * SUMMARY_CHARS_PER_TOKEN) - 3)
+    chunks, chunk, used = [], [], 0
+    for answer in answers:
+        answer = answer[:max_chars]
+        cost = estimate_tokens(f"\n- {answer}")
+        if chunk and used + cost > budget:
+            chunks.append(chunk)
+            chunk, used = [], 0
+        chunk.append(answer)
+        used += cost
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class SummaryCache(TieredCache):
+    """(프롬프트 버전, 질문, 답변 집합) 해시를 키로 하는 질문별 요약 캐시입니다.
+
+    답변이 바뀐 질문만 키가 달라지므로, 회의에 답변이 추가되어도 나머지 질문은 다시 요약하지 않습니다.
+    """
+    def __init__(self, max_bytes: int = SUMMARY_CACHE_MAX_BYTES, path: Optional[str] = SUMMARY_CACHE_PATH):
+        super().__init__(max_bytes, path, table='summaries', encode=str,
+                         decode=lambda value: value.decode('utf-8') if isinstance(value, bytes) else value)
+
+    @staticmethod
+    def make_key(namespace: str, question: str, answers: List[str]) -> str:
+        raw = json.dumps([namespace, question, sorted(answers)], ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+summary_cache = SummaryCache()
+
+
+class MapReduceSummarizer():
+    """회의를 질문별로 나눠 요약(map)한 뒤 부분 요약을 계층적으로 합치는(reduce) 요약기입니다.
+
+    model은 exec(text, user_prompt_template=None)을 가진 객체(LLMModel)입니다.
+    질문별 요약은 동시에 요청하므로 지연 시간은 회의 전체가 아니라 가장 긴 질문과 합치는 단계 수에 비례합니다.
+    """
+    def __init__(self, model, merge_prompt_template, namespace: str = '', token_budget: int = SUMMARY_TOKEN_BUDGET,
+                 merge_fanin: int = SUMMARY_MERGE_FANIN, workers: int = SUMMARY_WORKERS,
+                 cache: SummaryCache = summary_cache):
+        self.model = model
+        self.merge_prompt_template = merge_prompt_template
+        # 모델이나 프롬프트가 바뀌면 캐시 키도 바뀌도록 함께 넣음
+        self.namespace = namespace
+        self.token_budget = token_budget
+        self.merge_fanin = max(2, merge_fanin)
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='summary')
+        self.cache = cache
+        self.llm_calls = 0
+
+    def _call(self, text: str, merge: bool = False) -> str:
+        self.llm_calls += 1
+        return self.model.exec(text, self.merge_prompt_template if merge else None)
+
+    def _merge(self, summaries: List[str]) -> str:
+        """부분 요약을 merge_fanin개 또는 token_budget 이하씩 묶어 하나가 될 때까지 합칩니다. 같은 단계의 묶음은 동시에 요청합니다."""
+        while len(summaries) > 1:
+            groups, group, used = [], [], 0
+            for summary in summaries:
+                cost = estimate_tokens(summary)
+                if group and (len(group) >= self.merge_fanin or used + cost > self.token_budget):
+                    groups.append(group)
+                    group, used = [], 0
+                group.append(summary)
+                used += cost
+            groups.append(group)
+            if len(groups) == len(summaries):
+                # 요약 하나하나가 budget을 넘으면 두 개씩이라도 합침
+                groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+            summaries = list(self.executor.map(
+                lambda group: group[0] if len(group) == 1 else self._call('\n\n'.join(group), merge=True), groups))
+        return summaries[0]
+
+    def summarize_question(self, question: str, answers: List[str]) -> str:
+        key = self.cache.make_key(self.namespace, question, answers)
+        summary = self.cache.get(key)
+        if summary is None:
+            chunks = chunk_answers(question, answers, self.token_budget)
+            summaries = list(self.executor.map(lambda chunk: self._call(format_question(question, chunk)), chunks))
+            summary = self._merge(summaries)
+            self.cache.set(key, summary)
+        return summary
+
+    def summarize(self, script: List[Dict], progress: Optional[Callable[[float], None]] = None) -> str:
+        """to_script_format() 형식의 [{"question", "answer"}] 목록을 요약합니다. progress(0~1)로 진행률을 알립니다."""
+        items = [item for item in script if item['answer']]
+        if not items:
+            return ''
+        # 질문마다 별도 스레드에서 요약 (질문 내부의 묶음 요청은 공용 풀에서 실행)
+        with ThreadPoolExecutor(max_workers=min(len(items), self.workers * 2), thread_name_prefix='summary-question') as question_pool:
+            futures = [question_pool.submit(self.summarize_question, item['question'], item['answer']) for item in items]
+            summaries = []
+            for done, future in enumerate(futures, 1):
+                summaries.append(future.result())
+                if progress is not None:
+                    progress(0.8 * done / len(futures))
+        summary = self._merge(summaries)
+        if progress is not None:
+            progress(1.0)
+        return summary
+
+    def stats(self) -> Dict[str, float]:
+        stats = self.cache.stats()
+        stats['llm_calls'] = self.llm_calls
+        return stats
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
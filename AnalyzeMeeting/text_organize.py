@@ -1,38 +1,211 @@
+import hashlib
+import json
+import os
+import queue
 import re
-from typing import Union, List
+import threading
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Union
+
 from konlpy.tag import Okt
 
+from utils.cache import TieredCache
+
+# Okt 풀 / 프로세스 풀 설정
+TOKENIZER_POOL_SIZE = int(os.getenv("TOKENIZER_POOL_SIZE", "2"))
+TOKENIZER_PROCESSES = int(os.getenv("TOKENIZER_PROCESSES", "0"))
+TOKENIZER_PROCESS_MIN_BATCH = int(os.getenv("TOKENIZER_PROCESS_MIN_BATCH", "200"))
+# 토큰화 캐시 설정 (TOKEN_CACHE_PATH를 지정하면 디스크 계층 사용)
+TOKEN_CACHE_MAX_BYTES = int(os.getenv("TOKEN_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TOKEN_CACHE_PATH = os.getenv("TOKEN_CACHE_PATH")
+
+HANGUL_PATTERN = re.compile(r'[^ㄱ-ㅣ가-힣\s]')
+TARGET_POS = ('Noun', 'Adjective')
+
+
+class OktPool():
+    """JVM 기반 Okt 인스턴스를 프로세스 안에서 재사용하기 위한 풀입니다.
+
+    Okt 생성은 JVM 객체 초기화를 동반하므로 요청마다 만들지 않고,
+    최대 size개까지만 만들어 빌려주고 돌려받습니다.
+    """
+    def __init__(self, size: int = TOKENIZER_POOL_SIZE):
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self):
+        okt = self._get()
+        try:
+            yield okt
+        finally:
+            self._idle.put(okt)
+
+    def _get(self) -> Okt:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                okt = Okt()
+                self._created += 1
+                return okt
+        # 모든 인스턴스가 사용 중이면 반납될 때까지 대기
+        return self._idle.get()
+
+
+okt_pool = OktPool()
+_process_executor: Optional[ProcessPoolExecutor] = None
+_process_executor_lock = threading.Lock()
+
+
+def _get_process_executor(processes: int) -> ProcessPoolExecutor:
+    global _process_executor
+    with _process_executor_lock:
+        if _process_executor is None:
+            # JVM이 떠 있는 프로세스를 fork하면 안전하지 않으므로 spawn 사용
+            _process_executor = ProcessPoolExecutor(max_workers=processes, mp_context=get_context('spawn'))
+        return _process_executor
+
+
+def shutdown_tokenizer():
+    """프로세스 풀을 사용했다면 종료합니다. (lifespan 종료 시 호출)"""
+    global _process_executor
+    with _process_executor_lock:
+        if _process_executor is not None:
+            _process_executor.shutdown(cancel_futures=True)
+            _process_executor = None
+
+
+def _pos_tokens(okt: Okt, text: str, token_len: int) -> List[str]:
+    text = HANGUL_PATTERN.sub('', text)
+    okt_data = okt.pos(text)
+    return [word for word, pos in okt_data if (pos in TARGET_POS) and (len(word) >= token_len)]
+
+
+def _tokenize_batch(texts: List[str], token_len: int) -> List[List[str]]:
+    # 배치 전체를 하나의 Okt 인스턴스로 처리 (워커 프로세스에서는 프로세스별 풀 사용)
+    with okt_pool.acquire() as okt:
+        return [_pos_tokens(okt, text, token_len) for text in texts]
+
+
+def _tokenize_in_processes(texts: List[str], token_len: int, processes: int) -> List[List[str]]:
+    executor = _get_process_executor(processes)
+    chunk_size = -(-len(texts) // (processes * 4))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    return [tokens for chunk in executor.map(_tokenize_batch, chunks, repeat(token_len)) for tokens in chunk]
+
+
+def tokenize_many(texts: List[str], token_len: int = 2, processes: Optional[int] = None) -> List[List[str]]:
+    """ 여러 문장을 한 번에 토큰화하여 문장별 토큰 리스트를 반환합니다.
+
+    중복 문장은 한 번만 분석하고, processes가 2 이상이며 배치가 충분히 크면
+    프로세스 풀에 나눠서 모든 코어로 토큰화합니다.
+
+    Args:
+        texts (List[str]): 토큰화할 문장 리스트
+        token_len (int, optional): 최소 토큰 길이. Defaults to 2.
+        processes (int, optional): 프로세스 풀 크기. Defaults to TOKENIZER_PROCESSES.
+
+    Returns:
+        List[List[str]]: 입력 순서와 같은 문장별 토큰 리스트
+    """
+    if processes is None:
+        processes = TOKENIZER_PROCESSES
+    unique_texts = list(dict.fromkeys(texts))
+    if processes > 1 and len(unique_texts) >= TOKENIZER_PROCESS_MIN_BATCH:
+        tokenized = _tokenize_in_processes(unique_texts, token_len, processes)
+    else:
+        tokenized = _tokenize_batch(unique_texts, token_len)
+    tokens_by_text = dict(zip(unique_texts, tokenized))
+    return [list(tokens_by_text[text]) for text in texts]
+
 
 def tokenize_text(text: Union[str, List[str]], token_len: int = 2) -> list:
-    """ 한국어 문장을 konlpy okt로 토큰화하여 공백으로 합쳐진 문자열을 반환합니다.
+    """ 한국어 문장을 konlpy okt로 토큰화하여 토큰 리스트를 반환합니다.
 
     Args:
         text (_type_):  str | list
         token_len (int, optional):  int, Defaults to 2.
 
     Returns:
-        _type_: str
+        _type_: list (리스트 입력이면 모든 문장의 토큰을 이어붙인 리스트)
     """
-    okt = Okt()
-
     # 입력이 리스트일 경우
     if isinstance(text, list):
-        tokens = [token for sentence in text for token in tokenize_text(sentence, token_len=token_len)]
-        return tokens
+        return [token for tokens in tokenize_many(text, token_len=token_len) for token in tokens]
 
     # 입력이 문자열일 경우
-    text = re.sub(r'[^ㄱ-ㅣ가-힣\s]', '', text)
-    okt_data = okt.pos(text)
-    word_list = [word for word, pos in okt_data if (pos in ['Noun', 'Adjective']) and (len(word) >= token_len)]
-    return word_list
+    return tokenize_many([text], token_len=token_len)[0]
 
-def remove_stopwords(tokens:List[str]) -> list:
-    stopwords = [
+STOPWORDS = frozenset([
     "이", "그", "저", "을", "를", "은", "는", "이다", "있다", "없다", "에", "에서", 
     "와", "과", "로", "으로", "의", "도", "에게", "한테", "그리고", "그러나", 
     "그래서", "하지만", "또한", "즉", "나", "너", "우리", "당신", "저희", "그", 
     "그녀", "이것", "그것", "저것", "어떤", "이러한", "그런", "아주", "매우", 
     "보다", "보다도", "그냥", "무조건", "하지만", "그러나"
-    ]
-    meaningful_words = [w for w in tokens if not w in stopwords]
-    return meaningful_words
\ No newline at end of file
+    ])
+# 불용어 목록이 바뀌면 캐시 키도 자동으로 바뀌도록 목록 해시를 버전으로 사용
+STOPWORDS_VERSION = hashlib.sha1('\n'.join(sorted(STOPWORDS)).encode('utf-8')).hexdigest()[:8]
+
+
+def remove_stopwords(tokens:List[str]) -> list:
+    meaningful_words = [w for w in tokens if not w in STOPWORDS]
+    return meaningful_words
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 계산용 정규화 (유니코드 NFC, 연속 공백 정리)"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+class TokenCache(TieredCache):
+    """(정규화된 문장, token_len, 불용어 버전) 해시를 키로 하는 토큰화 결과 캐시입니다.
+
+    메모리 LRU(바이트 한도)를 우선 조회하고, path가 있으면 SQLite 디스크 계층을 함께 사용합니다.
+    """
+    def __init__(self, max_bytes: int = TOKEN_CACHE_MAX_BYTES, path: Optional[str] = TOKEN_CACHE_PATH):
+        super().__init__(max_bytes, path, table='tokens', decode=lambda value: tuple(json.loads(value)))
+
+    @staticmethod
+    def make_key(text: str, token_len: int) -> str:
+        raw = f"{STOPWORDS_VERSION}\x00{token_len}\x00{normalize_text(text)}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+token_cache = TokenCache()
+
+
+def tokenize_answers(texts: List[str], token_len: int = 2) -> List[List[str]]:
+    """ 답변들을 토큰화하고 불용어를 제거한 문장별 토큰 리스트를 반환합니다.
+
+    결과는 token_cache에 저장되므로, 이미 분석한 답변은 형태소 분석을 다시 하지 않습니다.
+
+    Args:
+        texts (List[str]): 답변 문장 리스트
+        token_len (int, optional): 최소 토큰 길이. Defaults to 2.
+
+    Returns:
+        List[List[str]]: 입력 순서와 같은 문장별 토큰 리스트
+    """
+    keys = [token_cache.make_key(text, token_len) for text in texts]
+    cached = token_cache.get_many(list(dict.fromkeys(keys)))
+
+    misses = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in misses:
+            misses[key] = text
+    if misses:
+        tokenized = tokenize_many(list(misses.values()), token_len=token_len)
+        new_items = {key: tuple(remove_stopwords(tokens)) for key, tokens in zip(misses.keys(), tokenized)}
+        token_cache.set_many(new_items)
+        cached.update(new_items)
+
+    return [list(cached[key]) for key in keys]
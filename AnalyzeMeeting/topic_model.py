@@ -1,22 +1,115 @@
 import json
+import os
 
-import pyLDAvis
-import pyLDAvis.lda_model
+import numpy as np
+from joblib import Parallel, delayed
 from sklearn.decomposition import LatentDirichletAllocation
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.model_selection import GridSearchCV
+
+from AnalyzeMeeting.lda_vis import prepare_lda_vis
+
+# 후보 토픽 수 (쉼표로 구분)
+TOPIC_CANDIDATES = [int(n) for n in os.getenv("TOPIC_CANDIDATES", "3,4,5").split(',')]
+# 후보 모델 선택 기준: perplexity(검증 데이터) | coherence(UMass)
+TOPIC_SELECTION = os.getenv("TOPIC_SELECTION", "perplexity")
+# 후보들을 동시에 학습할 프로세스 수 (-1이면 코어 수만큼)
+TOPIC_N_JOBS = int(os.getenv("TOPIC_N_JOBS", "-1"))
+TOPIC_HOLDOUT_RATIO = float(os.getenv("TOPIC_HOLDOUT_RATIO", "0.2"))
+# 검증 데이터가 이보다 적으면 학습 데이터로 perplexity 계산
+TOPIC_MIN_HOLDOUT_DOCS = int(os.getenv("TOPIC_MIN_HOLDOUT_DOCS", "20"))
+# 조기 종료: evaluate_every 반복마다 perplexity 변화가 perp_tol 미만이면 멈춤 (0이면 max_iter까지 학습)
+# perplexity 확인에 E-step이 한 번 더 들어가므로, 토큰 단위 문서처럼 빨리 수렴하는 데이터에서는 끄는 편이 빠름
+TOPIC_MAX_ITER = int(os.getenv("TOPIC_MAX_ITER", "10"))
+TOPIC_EVALUATE_EVERY = int(os.getenv("TOPIC_EVALUATE_EVERY", "0"))
+TOPIC_PERP_TOL = float(os.getenv("TOPIC_PERP_TOL", "1.0"))
+TOPIC_COHERENCE_TOP_N = 10
+
+
+def make_lda(n_components, max_iter=TOPIC_MAX_ITER):
+    return LatentDirichletAllocation(n_components=n_components, max_iter=max_iter, learning_method='batch',
+                                     evaluate_every=TOPIC_EVALUATE_EVERY, perp_tol=TOPIC_PERP_TOL, random_state=42)
+
+
+def _fit_candidate(n_components, train_vec):
+    # joblib 작업 프로세스에서 호출되므로 모듈 수준 함수로 둠
+    return make_lda(n_components).fit(train_vec)
+
+
+def split_holdout(feat_vec, ratio=TOPIC_HOLDOUT_RATIO, min_docs=TOPIC_MIN_HOLDOUT_DOCS, seed=42):
+    """단어가 하나 이상 남은 문서만 골라 학습/검증 데이터로 나눕니다. 검증 데이터가 너무 적으면 None을 반환합니다.
+
+    토큰 하나가 문서 하나라 max_df/max_features로 걸러진 빈 문서가 많은데, 빈 문서는 토픽-단어 분포
+    학습에 아무 영향이 없으므로 빼고 학습합니다.
+    """
+    rows = np.flatnonzero(feat_vec.getnnz(axis=1))
+    n_holdout = int(len(rows) * ratio)
+    if n_holdout < min_docs:
+        return feat_vec[rows], None
+    rows = np.random.default_rng(seed).permutation(rows)
+    return feat_vec[np.sort(rows[n_holdout:])], feat_vec[np.sort(rows[:n_holdout])]
+
+
+def umass_coherence(components, doc_freq, co_doc_freq, top_n=TOPIC_COHERENCE_TOP_N):
+    """토픽별 상위 단어 쌍의 UMass coherence 평균. 문서 빈도 행렬은 후보들이 함께 사용합니다."""
+    scores = []
+    for topic in components:
+        top = np.argsort(topic)[::-1][:top_n]
+        pair_scores = [
+            np.log((co_doc_freq[top[i], top[j]] + 1) / doc_freq[top[j]])
+            for i in range(1, len(top)) for j in range(i)
+        ]
+        scores.append(np.mean(pair_scores) if pair_scores else 0.0)
+    return float(np.mean(scores))
+
+
+def score_candidates(feat_vec, candidates, selection=TOPIC_SELECTION, n_jobs=TOPIC_N_JOBS):
+    """후보 토픽 수마다 LDA를 병렬로 학습해 (후보별 점수, 후보별 모델, 전체 데이터로 학습했는지)를 반환합니다."""
+    train_vec, holdout_vec = split_holdout(feat_vec)
+    n_jobs = min(len(candidates), os.cpu_count() or 1) if n_jobs < 0 else max(1, n_jobs)
+    models = dict(zip(candidates, Parallel(n_jobs=n_jobs)(delayed(_fit_candidate)(n, train_vec) for n in candidates)))
+    if selection == 'coherence':
+        binary = (feat_vec > 0).astype(np.float64)
+        doc_freq = np.maximum(np.asarray(binary.sum(axis=0)).ravel(), 1)
+        co_doc_freq = (binary.T @ binary).toarray()
+        scores = {n: umass_coherence(model.components_, doc_freq, co_doc_freq) for n, model in models.items()}
+    else:
+        eval_vec = train_vec if holdout_vec is None else holdout_vec
+        scores = {n: float(model.perplexity(eval_vec)) for n, model in models.items()}
+    return scores, models, holdout_vec is None
+
+
+def select_n_components(scores, selection=TOPIC_SELECTION):
+    # perplexity는 낮을수록, coherence는 높을수록 좋음
+    if selection == 'coherence':
+        return max(scores, key=scores.get)
+    return min(scores, key=scores.get)
+
+
+def fit_best_lda(feat_vec, candidates=None, selection=TOPIC_SELECTION, n_jobs=TOPIC_N_JOBS):
+    """후보 중 검증 perplexity(또는 coherence)가 가장 좋은 토픽 수의 LDA를 (모델, 토픽 수, 후보별 점수)로 반환합니다.
+
+    검증 데이터를 떼어 낸 경우에만 고른 토픽 수로 전체 데이터에 다시 학습합니다.
+    """
+    scores, models, trained_on_all = score_candidates(feat_vec, list(candidates or TOPIC_CANDIDATES), selection, n_jobs)
+    best_n_components = select_n_components(scores, selection)
+    if trained_on_all:
+        return models[best_n_components], best_n_components, scores
+    return make_lda(best_n_components).fit(feat_vec[feat_vec.getnnz(axis=1) > 0]), best_n_components, scores
 
 
 class TopicModel():
-    def __init__(self, token_list):
+    """후보 토픽 수마다 LDA를 병렬로 학습하고, 검증 perplexity(또는 coherence)로 하나를 고릅니다.
+
+    CountVectorizer 결과는 한 번만 만들어 모든 후보가 같이 쓰며, TOPIC_EVALUATE_EVERY를 켜면
+    각 학습은 perplexity가 더 줄지 않을 때 일찍 멈춥니다. 검증 데이터를 떼어 낸 경우에만 고른 토픽 수로 전체 데이터에 다시 학습합니다.
+    """
+    def __init__(self, token_list, candidates=None, selection=TOPIC_SELECTION, n_jobs=TOPIC_N_JOBS):
         self.count_vec = CountVectorizer(max_df=10, max_features=1000, min_df=1, ngram_range=(1,2))
         self.feat_vec = self.count_vec.fit_transform(token_list)
-        self.lda = LatentDirichletAllocation(random_state=42)
-        self.param_grid = {'n_components': [3, 4, 5]}
-        self.search = GridSearchCV(self.lda, self.param_grid, cv=3)
-        self.search.fit(self.feat_vec)
-        self.best_model = self.search.best_estimator_
         self.feature_names = self.count_vec.get_feature_names_out()
+        self.candidates = list(candidates or TOPIC_CANDIDATES)
+        self.selection = selection
+        self.best_model, self.best_n_components, self.scores = fit_best_lda(self.feat_vec, self.candidates, selection, n_jobs)
 
     def show_topics(self, num_top_words):
         for topic_idx, topic in enumerate(self.best_model.components_):
@@ -29,6 +122,9 @@ class TopicModel():
             print(result_text)
     
     def make_html(self):
+        import pyLDAvis
+        import pyLDAvis.lda_model
+
         try:
             # Prepare the visualization data
             vis = pyLDAvis.lda_model.prepare(self.best_model, self.feat_vec, self.count_vec)
@@ -38,41 +134,10 @@ class TopicModel():
         except Exception as e:
             print(f"An error occurred while creating the visualization: {str(e)}")
     
-    def prepared_html_data(self, vis_data):
-        # 변환된 JSON 데이터 생성
-        html_data = {
-            "mdsDat": {
-                "x": vis_data.topic_coordinates['x'].tolist(),
-                "y": vis_data.topic_coordinates['y'].tolist(),
-                "topics": vis_data.topic_coordinates['topics'].tolist(),
-                "cluster": vis_data.topic_coordinates['cluster'].tolist(),
-                "Freq": vis_data.topic_coordinates['Freq'].tolist(),
-            },
-            "tinfo": {
-                "Term": vis_data.topic_info['Term'].tolist(),
-                "Freq": vis_data.topic_info['Freq'].tolist(),
-                "Total": vis_data.topic_info['Total'].tolist(),
-                "Category": vis_data.topic_info['Category'].tolist(),
-                "logprob": vis_data.topic_info['logprob'].tolist(),
-                "loglift": vis_data.topic_info['loglift'].tolist(),
-            },
-            "token.table": {
-                "Topic": vis_data.token_table['Topic'].tolist(),
-                "Freq": vis_data.token_table['Freq'].tolist(),
-                "Term": vis_data.token_table['Term'].tolist(),
-            },
-            "R": vis_data.R,
-            "lambda.step": vis_data.lambda_step,
-            "plot.opts": vis_data.plot_opts,
-            "topic.order": vis_data.topic_order
-        }
-        
-        return html_data
-
     def make_lda_json(self):
-        vis_data = pyLDAvis.lda_model.prepare(self.best_model, self.feat_vec, self.count_vec)
-        json_data = self.prepared_html_data(vis_data)
-        return json_data
+        # pyLDAvis.prepare 대신 numpy로 같은 형식의 LDAvis JSON 생성
+        return prepare_lda_vis(self.best_model, self.feat_vec, self.feature_names)
+
 
 if __name__ == '__main__':
     token_list = ['분홍색', '테마', '시즌', '정말', '부드러운', '이미지', '같아요', '고객', '좋아할', '같네요', '개인', '초록색', '브랜드', '정체', '있다고', '생각', '분홍색', '흔한', '느낌', '같아요', '차라리', '이번', '초록색', '어떨까', '초록색', '자연', '이미지', '강해서', '요즘', '트렌드', '같아요', '분홍색', '상큼', '여성', '이미지', '젊은', '인기', '많을', '초록색', '테마', '시원하고', '깨끗한', '이미지', '있을', '같아요', '분홍색', '정말', '제품', '꽃잎', '성분', '생각', '브랜드', '이미지', '관성', '유지', '초록색', '적합할', '같습니다', '분홍색', '화장품', '패키지', '같아요', '초록색', '환경', '메시지', '강화할', '있어서', '좋을', '같아요', '분홍색', '화사한', '느낌', '부담', '사용', '있을', '같아요', '초록색', '브랜드', '생각', '자연', '관련', '브랜드', '라면', '분홍색', '따뜻하고', '부드러운', '이미지', '주기', '때문', '소비자', '긍정', '반응', '있을', '같아요', '초록색', '자연스러운', '이미지', '강화하는', '좋을', '같아요', '친환경', '느낌', '강해요', '분홍색', '꽃잎', '영감', '만큼', '제품', '컬러', '생각', '초록색', '시각', '강렬한', '인상', '있어서', '좋을', '같아요', '분홍색', '고급스러운', '느낌', '있다고', '생각', '초록색', '브랜드', '자연', '이미지', '더욱', '있을', '같습니다', '분홍색', '소비자', '편안한', '느낌', '있어서', '좋다고', '생각', '초록색', '세련된', '이미지', '있을', '같아요']
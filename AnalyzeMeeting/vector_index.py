@@ -0,0 +1,313 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from AnalyzeMeeting.embedding_vector_model import EmbeddingVectorAnalyzer
+from utils.embedding_cache import embed_texts
+
+# 검색 방식: exact | ivf | auto (auto는 IVF_MIN_SIZE 이상일 때 IVF 사용)
+VECTOR_INDEX_MODE = os.getenv("VECTOR_INDEX_MODE", "auto")
+VECTOR_INDEX_IVF_MIN_SIZE = int(os.getenv("VECTOR_INDEX_IVF_MIN_SIZE", "50000"))
+# IVF 검색 시 살펴볼 클러스터 수
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "16"))
+# 한 번에 곱할 행 수 (메모리 사용량 제한)
+VECTOR_INDEX_BLOCK_ROWS = 4096
+# 유사 쌍 검색에서 한 번에 계산할 점수 타일 크기 (TILE x TILE float32)
+VECTOR_INDEX_PAIR_TILE = int(os.getenv("VECTOR_INDEX_PAIR_TILE", "1024"))
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(q, n) 점수 행렬에서 행별 상위 k개의 (점수, 열 번호)를 내림차순으로 반환합니다."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.zeros((len(scores), 0), dtype=np.float32), np.zeros((len(scores), 0), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1)
+    return np.take_along_axis(part_scores, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+def pairs_above(vectors: np.ndarray, threshold: float, tile: int = VECTOR_INDEX_PAIR_TILE) -> Tuple[np.ndarray, np.ndarray]:
+    """정규화된 벡터에서 코사인 유사도가 threshold 이상인 (i < j) 쌍을 반환합니다.
+
+    점수 행렬의 위쪽 삼각형만 tile x tile 조각으로 계산하고 threshold 이상인 값만 남기므로
+    메모리 사용량은 벡터 수와 관계없이 타일 하나 크기입니다.
+    """
+    lefts, rights = [], []
+    for row in range(0, len(vectors), tile):
+        row_block = vectors[row:row + tile]
+        for col in range(row, len(vectors), tile):
+            i, j = np.nonzero(row_block @ vectors[col:col + tile].T >= threshold)
+            i += row
+            j += col
+            if col == row:
+                keep = j > i
+                i, j = i[keep], j[keep]
+            lefts.append(i)
+            rights.append(j)
+    if not lefts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(lefts), np.concatenate(rights)
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, sample_size: int = 100000, seed: int = 42) -> np.ndarray:
+    """정규화된 벡터를 코사인 유사도 기준으로 군집화해 (정규화된) 중심 벡터를 반환합니다."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        one_hot = csr_matrix((np.ones(len(vectors), dtype=np.float32), (assignment, np.arange(len(vectors)))),
+                             shape=(n_clusters, len(vectors)))
+        sums = np.asarray(one_hot @ vectors)
+        empty = np.flatnonzero(np.bincount(assignment, minlength=n_clusters) == 0)
+        # 비어 있는 클러스터는 임의의 점으로 다시 시작
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = normalize(sums)
+    return centroids
+
+
+class VectorIndex():
+    """정규화된 임베딩 행렬에 대한 코사인 유사도 top-k 검색 인덱스입니다.
+
+    기본은 행렬 곱 한 번으로 하는 정확한 검색이고, 벡터가 많으면(IVF 모드) 군집 중심으로
+    후보를 먼저 좁힌 뒤 후보만 정확히 계산합니다. 각 벡터에는 답변 정보(items)가 붙습니다.
+    """
+    def __init__(self, mode: str = VECTOR_INDEX_MODE, ivf_min_size: int = VECTOR_INDEX_IVF_MIN_SIZE,
+                 nprobe: int = VECTOR_INDEX_NPROBE):
+        if mode not in ('exact', 'ivf', 'auto'):
+            raise ValueError(f"알 수 없는 검색 방식입니다: {mode}")
+        self.mode = mode
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self._vectors: Optional[np.ndarray] = None
+        self.size = 0
+        self.items: List[Dict] = []
+        # 원본(회의)별로 인덱스에 넣은 답변 행 수 (증분 추가용)
+        self.source_rows: Dict[Tuple, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._ivf_size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        if self._vectors is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._vectors[:self.size]
+
+    @property
+    def use_ivf(self) -> bool:
+        return self.mode == 'ivf' or (self.mode == 'auto' and self.size >= self.ivf_min_size)
+
+    def add(self, vectors: np.ndarray, items: List[Dict]):
+        if len(vectors) != len(items):
+            raise ValueError(f"벡터 수({len(vectors)})와 항목 수({len(items)})가 다릅니다.")
+        if len(vectors) == 0:
+            return
+        vectors = normalize(vectors)
+        with self._lock:
+            needed = self.size + len(vectors)
+            if self._vectors is None:
+                self._vectors = np.empty((max(needed, 1024), vectors.shape[1]), dtype=np.float32)
+            elif needed > len(self._vectors):
+                # 용량을 두 배씩 늘려 추가 비용을 상각
+                grown = np.empty((max(needed, 2 * len(self._vectors)), self._vectors.shape[1]), dtype=np.float32)
+                grown[:self.size] = self._vectors[:self.size]
+                self._vectors = grown
+            self._vectors[self.size:needed] = vectors
+            self.size = needed
+            self.items.extend(items)
+
+    def _ensure_ivf(self):
+        # 마지막 학습 이후 벡터 수가 두 배가 되면 다시 학습
+        if self._centroids is not None and self.size < 2 * self._ivf_size:
+            if self._ivf_size < self.size:
+                self._assign(self._ivf_size)
+            return
+        n_clusters = max(1, int(np.sqrt(self.size)))
+        self._centroids = spherical_kmeans(self.vectors, n_clusters)
+        self._lists = [np.zeros(0, dtype=np.int64) for _ in range(n_clusters)]
+        self._ivf_size = 0
+        self._assign(0)
+
+    def _assign(self, start: int):
+        vectors = self.vectors
+        assignment = np.concatenate([
+            np.argmax(vectors[i:i + VECTOR_INDEX_BLOCK_ROWS] @ self._centroids.T, axis=1)
+            for i in range(start, self.size, VECTOR_INDEX_BLOCK_ROWS)
+        ])
+        rows = np.arange(start, self.size)
+        order = np.argsort(assignment, kind='stable')
+        bounds = np.searchsorted(assignment[order], np.arange(len(self._centroids) + 1))
+        for cluster in range(len(self._centroids)):
+            new_rows = rows[order[bounds[cluster]:bounds[cluster + 1]]]
+            if len(new_rows):
+                self._lists[cluster] = np.concatenate([self._lists[cluster], new_rows])
+        self._ivf_size = self.size
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """질의 벡터별 상위 k개의 (코사인 유사도, 행 번호)를 반환합니다."""
+        queries = normalize(np.atleast_2d(queries))
+        with self._lock:
+            vectors = self.vectors
+            if self.size == 0:
+                return _top_k(np.zeros((len(queries), 0), dtype=np.float32), k)
+            if not self.use_ivf:
+                return _top_k(queries @ vectors.T, k)
+
+            self._ensure_ivf()
+            nprobe = min(nprobe or self.nprobe, len(self._centroids))
+            _, probes = _top_k(queries @ self._centroids.T, nprobe)
+            all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+            all_rows = np.full((len(queries), k), -1, dtype=np.int64)
+            for q, clusters in enumerate(probes):
+                candidates = np.concatenate([self._lists[c] for c in clusters])
+                scores, idx = _top_k((vectors[candidates] @ queries[q])[None, :], k)
+                all_scores[q, :idx.shape[1]] = scores[0]
+                all_rows[q, :idx.shape[1]] = candidates[idx[0]]
+            return all_scores, all_rows
+
+    def _similar_pairs(self, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        vectors = self.vectors
+        if not self.use_ivf:
+            return pairs_above(vectors, threshold)
+        # 같은 클러스터 안에서만 비교
+        self._ensure_ivf()
+        lefts, rights = [], []
+        for rows in self._lists:
+            if len(rows) > 1:
+                i, j = pairs_above(vectors[rows], threshold)
+                lefts.append(rows[i])
+                rights.append(rows[j])
+        if not lefts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(lefts), np.concatenate(rights)
+
+    def near_duplicates(self, threshold: float = 0.9) -> List[np.ndarray]:
+        """코사인 유사도가 threshold 이상인 답변끼리 연결해 2개 이상으로 이루어진 묶음(행 번호 배열)을 반환합니다."""
+        with self._lock:
+            if self.size < 2:
+                return []
+            lefts, rights = self._similar_pairs(threshold)
+            graph = csr_matrix((np.ones(len(lefts), dtype=np.int8), (lefts, rights)), shape=(self.size, self.size))
+            _, labels = connected_components(graph, directed=False)
+        order = np.argsort(labels, kind='stable')
+        groups = np.split(order, np.flatnonzero(np.diff(labels[order])) + 1)
+        return sorted((group for group in groups if len(group) > 1), key=len, reverse=True)
+
+    def centroid_distances(self, group_key: str = 'question_id') -> Dict:
+        """그룹(기본: 질문)별 중심 벡터와, 중심까지의 평균 거리(응답 분산), 중심 간 코사인 거리를 계산합니다."""
+        with self._lock:
+            vectors = self.vectors
+            labels = [item[group_key] for item in self.items]
+        if not labels:
+            return {'groups': [], 'sizes': [], 'spread': [], 'distance': []}
+        groups, inverse = np.unique(np.asarray(labels, dtype=object), return_inverse=True)
+        one_hot = csr_matrix((np.ones(len(inverse), dtype=np.float32), (inverse, np.arange(len(inverse)))),
+                             shape=(len(groups), len(inverse)))
+        centroids = normalize(np.asarray(one_hot @ vectors))
+        sizes = np.bincount(inverse, minlength=len(groups))
+        member_distance = 1.0 - np.einsum('ij,ij->i', vectors, centroids[inverse])
+        spread = np.bincount(inverse, weights=member_distance, minlength=len(groups)) / sizes
+        distance = 1.0 - centroids @ centroids.T
+        return {
+            'groups': groups.tolist(),
+            'sizes': sizes.tolist(),
+            'spread': np.round(spread, 6).tolist(),
+            'distance': np.round(np.clip(distance, 0.0, 2.0), 6).tolist(),
+        }
+
+
+class VectorIndexRegistry():
+    """회의별 / 기업별 VectorIndex를 만들고, 회의에 새 답변이 쌓이면 그 부분만 임베딩해 추가합니다."""
+    def __init__(self, meetings, get_embedding_model):
+        self.meetings = meetings
+        # 임베딩 모델은 필요할 때 가져옴 (모델 레지스트리에서 지연 로드)
+        self.get_embedding_model = get_embedding_model
+        self.indexes: Dict[Tuple, VectorIndex] = {}
+        self._lock = threading.Lock()
+
+    def _get_index(self, key: Tuple) -> VectorIndex:
+        with self._lock:
+            if key not in self.indexes:
+                self.indexes[key] = VectorIndex()
+            return self.indexes[key]
+
+    def _sync(self, index: VectorIndex, corp_id, meeting_id):
+        meeting_script = self.meetings.get(corp_id, meeting_id)
+        source = (corp_id, meeting_id)
+        while True:
+            with index._lock:
+                start = index.source_rows.get(source, 0)
+            with meeting_script.lock:
+                end = len(meeting_script)
+                columns = meeting_script.columns
+                items = [{
+                    'corp_id': corp_id,
+                    'meeting_id': meeting_id,
+                    'question_id': columns['question_id'][row],
+                    'user_id': columns['user_id'][row],
+                    'answer': columns['answer'][row],
+                } for row in range(start, end) if columns['answer'][row]]
+            if start >= end:
+                return
+            # 임베딩(모델 / 원격 호출)은 인덱스 잠금 밖에서 계산해, 그동안에도 같은 인덱스의 검색이 막히지 않게 함
+            vectors = None
+            if items:
+                analyzer = EmbeddingVectorAnalyzer(corp_id=corp_id, meeting_id=meeting_id, embedding_model=self.get_embedding_model())
+                analyzer.make_sentence_embeddings(items)
+                vectors = analyzer.embedding_vectors_array
+            with index._lock:
+                # 그사이 다른 요청이 같은 구간을 먼저 추가했으면 남은 답변만 다시 계산 (임베딩은 캐시에서 읽음)
+                if index.source_rows.get(source, 0) != start:
+                    continue
+                if items:
+                    index.add(vectors, items)
+                index.source_rows[source] = end
+            return
+
+    def meeting_index(self, corp_id, meeting_id) -> VectorIndex:
+        index = self._get_index(('meeting', corp_id, meeting_id))
+        self._sync(index, corp_id, meeting_id)
+        return index
+
+    def corp_index(self, corp_id) -> VectorIndex:
+        meeting_ids = self.meetings.list_meetings(corp_id)
+        if not meeting_ids:
+            raise KeyError(corp_id)
+        index = self._get_index(('corp', corp_id))
+        for meeting_id in meeting_ids:
+            self._sync(index, corp_id, meeting_id)
+        return index
+
+    def get(self, corp_id, meeting_id=None) -> VectorIndex:
+        return self.corp_index(corp_id) if meeting_id is None else self.meeting_index(corp_id, meeting_id)
+
+    def similar(self, query: str, corp_id, meeting_id=None, top_k: int = 10) -> List[Dict]:
+        index = self.get(corp_id, meeting_id)
+        query_vector = embed_texts(self.get_embedding_model(), [query])
+        scores, rows = index.search(query_vector, top_k)
+        return [dict(index.items[row], score=round(float(score), 6))
+                for score, row in zip(scores[0], rows[0]) if row >= 0]
+
+    def near_duplicates(self, corp_id, meeting_id=None, threshold: float = 0.9) -> List[List[Dict]]:
+        index = self.get(corp_id, meeting_id)
+        return [[index.items[row] for row in group] for group in index.near_duplicates(threshold)]
+
+    def question_centroids(self, corp_id, meeting_id) -> Dict:
+        return self.meeting_index(corp_id, meeting_id).centroid_distances('question_id')
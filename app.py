@@ -1,25 +1,38 @@
+import asyncio
 import base64
+import functools
 import logging
 import os
+import time
 from contextlib import asynccontextmanager
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 from uuid import uuid1
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from langchain.embeddings import OpenAIEmbeddings
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
 
+from AnalyzeMeeting.audio import StreamSegmenter
+from AnalyzeMeeting.embedding_backend import make_embedding_model
 from AnalyzeMeeting.embedding_vector_model import EmbeddingVectorAnalyzer
-from AnalyzeMeeting.gen_wordcloud import make_wordcloud
-from AnalyzeMeeting.make_script import MeetingScript
-from AnalyzeMeeting.make_summary import summary_model
+from AnalyzeMeeting.gen_wordcloud import WORDCLOUD_FORMAT, wordcloud_cache
+from AnalyzeMeeting.make_summary import make_summary_model
+from AnalyzeMeeting.online_topic_model import OnlineTopicRegistry
 from AnalyzeMeeting.sentiment_model import SentimentAnalyzer
 from AnalyzeMeeting.stt import STTWhisper
-from AnalyzeMeeting.text_organize import remove_stopwords, tokenize_text
+from AnalyzeMeeting.summarizer import summary_cache
+from AnalyzeMeeting.text_organize import shutdown_tokenizer, token_cache, tokenize_answers
 from AnalyzeMeeting.topic_model import TopicModel
-from utils.handle_server_data import aggregate_meeting_tokens, aggregate_question_tokens
-from utils.upload_s3 import post_wordcloud
+from AnalyzeMeeting.vector_index import VectorIndexRegistry
+from utils.embedding_cache import embedding_cache_stats
+from utils.jobs import CANCELLED, FAILED, JobCancelled, JobManager, JobQueueFull
+from utils.meeting_store import MeetingRegistry, MeetingStore
+from utils.model_registry import MODEL_WARMUP, ModelRegistry
+from utils.pipeline import CPU, IO, Stage, StageExecutor
+from utils.result_cache import ResultCache
+from utils.tensorboard_server import TensorBoardServer
+from utils.upload_s3 import OutboundClient
 
 # 환경변수 로드
 load_dotenv()
@@ -35,12 +48,48 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global sentiment_analyzer, meetings, stt_whisper, embedding_model
-    sentiment_analyzer = SentimentAnalyzer()
-    meetings = {}
-    stt_whisper = STTWhisper()
-    embedding_model = OpenAIEmbeddings(api_key=OPENAI_API_KEY)
+    global models, meetings, jobs, tensorboard_server, vector_indexes, topic_models, result_cache, stage_executor, outbound
+    # 모델은 처음 사용할 때 로드하고, MODEL_IDLE_TIMEOUT 동안 쓰지 않으면 내림
+    models = ModelRegistry()
+    models.register('sentiment', SentimentAnalyzer)
+    models.register('stt', STTWhisper)
+    # EMBEDDING_BACKEND 설정에 따라 로컬(sentence-transformers) 또는 원격 임베딩 사용
+    models.register('embedding', make_embedding_model, unloader=lambda model: model.close() if hasattr(model, 'close') else None)
+    models.register('summary', make_summary_model, unloader=lambda model: model.close())
+    models.start_reaper()
+    # 회의 데이터는 처음 접근할 때 저장소에서 불러옴 (서버 시작 시 미리 읽지 않음)
+    meeting_store = MeetingStore()
+    meeting_store.start_compaction()
+    meetings = MeetingRegistry(meeting_store)
+    # 모든 임베딩 분석 결과를 하나의 TensorBoard 프로세스로 서빙 (첫 등록 시 실행)
+    tensorboard_server = TensorBoardServer()
+    tensorboard_server.start_reaper()
+    # 회의/기업 단위 답변 임베딩 검색 인덱스 (처음 조회할 때 생성)
+    vector_indexes = VectorIndexRegistry(meetings, lambda: models.get('embedding'))
+    # 회의별 온라인 토픽 모델 (답변이 추가될 때마다 백그라운드에서 갱신)
+    topic_models = OnlineTopicRegistry(meetings)
+    topic_models.start()
+    # 회의 버전 + 요청 파라미터 기준 분석 결과 캐시
+    result_cache = ResultCache()
+    # 무거운 분석은 이벤트 루프 밖의 작업 풀에서 실행
+    jobs = JobManager()
+    jobs.bind_loop(asyncio.get_running_loop())
+    # 리포트 서버 / S3로 나가는 요청은 연결 풀을 공유하는 하나의 클라이언트로 보냄
+    outbound = OutboundClient()
+    # /analyze-all의 단계들을 종류별(io/cpu/process) 풀에서 동시에 실행
+    stage_executor = StageExecutor(process_executor=jobs.get_process_executor)
+    # MODEL_WARMUP에 지정한 모델만 요청 전에 미리 로드
+    await asyncio.to_thread(models.warmup, MODEL_WARMUP.split(','))
     yield
+    jobs.shutdown()
+    stage_executor.shutdown()
+    await outbound.aclose()
+    topic_models.shutdown()
+    tensorboard_server.shutdown()
+    models.shutdown()
+    result_cache.close()
+    shutdown_tokenizer()
+    meeting_store.close()
     
     
 # FastAPI와 템플릿 설정
@@ -51,6 +100,52 @@ app = FastAPI(
     lifespan=lifespan
     )
 
+'''분석 결과 캐시'''
+# refit 같은 "다시 계산" 옵션은 캐시 키에서 제외
+RESULT_CACHE_EXCLUDE = {'refit'}
+
+def result_key(endpoint: str, response: BaseModel) -> Optional[str]:
+    """요청의 결과 캐시 키. corpId/meetingId가 있으면 그 회의의 현재 버전을 포함하며, 회의가 없으면 None"""
+    params = response.model_dump(exclude=RESULT_CACHE_EXCLUDE)
+    corp_id, meeting_id = params.get('corpId'), params.get('meetingId')
+    version = None
+    if corp_id is not None and meeting_id is not None:
+        try:
+            version = meetings.get(corp_id, meeting_id).version
+        except KeyError:
+            return None
+    return result_cache.make_key(endpoint, corp_id, meeting_id, params.get('questionId'), version, params)
+
+def cached_result(endpoint: str, should_cache=None):
+    """작업 함수의 결과를 회의 버전별로 캐시하고, 같은 요청이 동시에 오면 한 번만 계산합니다."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(ctx, response):
+            key = result_key(endpoint, response)
+            if key is None:
+                return fn(ctx, response)
+            return result_cache.get_or_compute(key, lambda: fn(ctx, response), refresh=getattr(response, 'refit', False),
+                                               should_cache=should_cache)
+        return wrapper
+    return decorator
+
+async def run_cached(kind: str, fn, response: BaseModel):
+    # 캐시된 결과가 있으면 작업 풀을 거치지 않고 바로 반환
+    if not getattr(response, 'refit', False):
+        key = result_key(kind, response)
+        result = result_cache.get(key) if key is not None else None
+        if result is not None:
+            return result
+    return await jobs.run(kind, fn, response)
+
+@app.exception_handler(JobQueueFull)
+async def job_queue_full_handler(request: Request, exc: JobQueueFull):
+    return JSONResponse(status_code=429, content={"detail": str(exc)})
+
+@app.exception_handler(JobCancelled)
+async def job_cancelled_handler(request: Request, exc: JobCancelled):
+    return JSONResponse(status_code=410, content={"detail": "취소된 작업입니다."})
+
 # 텍스트 답변 처리 엔드포인트
 class SubmitTextIn(BaseModel):
     surveyQuestion: str
@@ -71,14 +166,9 @@ async def submit_text_response(response: SubmitTextIn):
     
     corp_id, meeting_id, question_id, user_id, text_response, survey_question = response.corpId, response.meetingId, response.questionId, response.userId, response.textResponse, response.surveyQuestion
     
-    if corp_id not in meetings:
-        meetings[corp_id] = {meeting_id:MeetingScript(corp_id, meeting_id)}
-    if meeting_id not in meetings[corp_id]:
-        meetings[corp_id][meeting_id] = MeetingScript(corp_id, meeting_id)
-        
-    meeting_script = meetings[corp_id][meeting_id]
-    meeting_script.add_question(question_id, survey_question)
-    meeting_script.add_answer(question_id, text_response, user_id)
+    # 형태소 분석 / SQLite 기록 / 회의 불러오기가 이벤트 루프를 막지 않도록 스레드에서 실행
+    await asyncio.to_thread(meetings.add_question, corp_id, meeting_id, question_id, survey_question)
+    await asyncio.to_thread(meetings.add_answer, corp_id, meeting_id, question_id, text_response, user_id)
     
     return {"result": "텍스트 응답이 성공적으로 처리되었습니다."}
 
@@ -94,35 +184,132 @@ class SubmitVoiceIn(BaseModel):
 class SubmitVoiceOut(BaseModel):
     result: str
     text_data: str
+    stt_timings: Dict[str, Union[float, str]] = {}
     
-@app.post("/submit-voice", response_model=SubmitVoiceOut, tags=['Submit meeting data'])
-async def submit_voice_response(response: SubmitVoiceIn):
+def run_submit_voice(ctx, response: SubmitVoiceIn):
     try:
-        logging.info(f"/submit-voice: {response}")
-        print(f'endpoint: /submit-voice, response: {response}')
-        
         corp_id, meeting_id, question_id, user_id, voice_response, survey_question = response.corpId, response.meetingId, response.questionId, response.userId, response.voiceResponse, response.surveyQuestion
         voice_data = base64.b64decode(voice_response)
-        text_response = stt_whisper.transcribe(voice_data)
-        if corp_id not in meetings:
-            meetings[corp_id] = {meeting_id: MeetingScript(corp_id, meeting_id)}
-        if meeting_id not in meetings[corp_id]:
-            meetings[corp_id][meeting_id] = MeetingScript(corp_id, meeting_id)
-
-        meeting_script = meetings[corp_id][meeting_id]
-        meeting_script.add_question(question_id, survey_question)
-        meeting_script.add_answer(question_id, text_response, user_id)
+        ctx.set_progress(0.1, 'STT 변환 중')
+        with models.use('stt') as stt_whisper:
+            text_response, stt_timings = stt_whisper.transcribe_with_timings(voice_data)
+        logging.info(f"/submit-voice stt timings: {stt_timings}")
+        meetings.add_question(corp_id, meeting_id, question_id, survey_question)
+        # 발화가 없는 녹음은 답변으로 저장하지 않음
+        if not stt_timings['skipped']:
+            meetings.add_answer(corp_id, meeting_id, question_id, text_response, user_id)
         
         logging.info(f"/submit-voice result: {text_response}")
         return {
             "result": "음성 응답이 성공적으로 처리되었습니다.",
-            "text_data": text_response
+            "text_data": text_response,
+            "stt_timings": stt_timings
                 }
         
+    except JobCancelled:
+        raise
     except Exception as e:
         logging.error("Error: %s", e)
         raise HTTPException(status_code=400, detail=f'Error: {e}')
 
+@app.post("/submit-voice", response_model=SubmitVoiceOut, tags=['Submit meeting data'])
+async def submit_voice_response(response: SubmitVoiceIn):
+    # base64 음성 데이터는 로그에 남기지 않음
+    log_data = response.model_dump(exclude={'voiceResponse'})
+    logging.info(f"/submit-voice: {log_data}, voiceResponse: {len(response.voiceResponse)} chars")
+    print(f'endpoint: /submit-voice, response: {log_data}')
+    return await jobs.run('submit-voice', run_submit_voice, response)
+
+# 스트리밍 음성 답변 (WebSocket)
+# 1. 첫 메시지: JSON 메타데이터 (corpId, meetingId, questionId, userId, surveyQuestion, format, sampleRate, channels)
+#    format은 "pcm16"(헤더 없는 16bit little-endian PCM) 또는 "wav"(첫 청크에 WAV 헤더 포함)
+# 2. 이후: 오디오 바이너리 청크
+# 3. 마지막: 텍스트 메시지 "end"
+# 세그먼트가 완성될 때마다 변환 결과를 {"type": "partial"}로 보내고, 종료 시 {"type": "final"}을 보냄
+class SubmitVoiceStreamIn(BaseModel):
+    surveyQuestion: str
+    userId: int
+    meetingId: int
+    corpId: int
+    questionId: int
+    format: str = 'pcm16'
+    sampleRate: int = 16000
+    channels: int = 1
+
+def run_transcribe_segment(ctx, samples):
+    with models.use('stt') as stt_whisper:
+        return stt_whisper.transcribe_samples(samples)
+
+@app.websocket("/submit-voice/stream")
+async def submit_voice_stream(websocket: WebSocket):
+    await websocket.accept()
+    try:
+        meta = SubmitVoiceStreamIn.model_validate(await websocket.receive_json())
+    except (ValidationError, ValueError) as e:
+        await websocket.close(code=1003, reason=f'invalid metadata: {e}')
+        return
+    logging.info(f"/submit-voice/stream: {meta}")
+    print(f'endpoint: /submit-voice/stream, meta: {meta}')
+
+    segmenter = StreamSegmenter(sample_rate=meta.sampleRate, channels=meta.channels, wav_header=meta.format == 'wav')
+    texts: List[str] = []
+    trimmed_sec = []
+    pending: List[asyncio.Task] = []
+
+    async def transcribe_segment(index: int, samples, previous):
+        # 세그먼트는 도착 순서대로 변환 (이전 세그먼트가 끝나야 다음 세그먼트 시작)
+        if previous is not None:
+            await previous
+        text, timings = await jobs.run('stt-segment', run_transcribe_segment, samples)
+        texts.append(text.strip())
+        trimmed_sec.append(timings['trimmed_sec'])
+        await websocket.send_json({"type": "partial", "index": index, "text": text})
+
+    def schedule(segments):
+        for samples in segments:
+            previous = pending[-1] if pending else None
+            pending.append(asyncio.create_task(transcribe_segment(len(pending), samples, previous)))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                raise WebSocketDisconnect(message.get('code', 1000))
+            if message.get('bytes'):
+                schedule(segmenter.feed(message['bytes']))
+            elif message.get('text') == 'end':
+                break
+
+        # 말이 끝난 시점부터 최종 텍스트까지의 시간 측정
+        end_of_speech = time.perf_counter()
+        schedule(segmenter.flush())
+        if pending:
+            await pending[-1]
+        text_response = ' '.join(text for text in texts if text)
+        await asyncio.to_thread(meetings.add_question, meta.corpId, meta.meetingId, meta.questionId, meta.surveyQuestion)
+        if text_response:
+            await asyncio.to_thread(meetings.add_answer, meta.corpId, meta.meetingId, meta.questionId, text_response, meta.userId)
+
+        stt_timings = {
+            'audio_sec': round(segmenter.duration_sec, 3),
+            'segments': len(pending),
+            'trimmed_sec': round(sum(trimmed_sec), 3),
+            'end_to_text_sec': round(time.perf_counter() - end_of_speech, 4),
+        }
+        logging.info(f"/submit-voice/stream result: {text_response}, timings: {stt_timings}")
+        await websocket.send_json({"type": "final", "result": "음성 응답이 성공적으로 처리되었습니다.", "text_data": text_response, "stt_timings": stt_timings})
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logging.info("/submit-voice/stream: client disconnected")
+        for task in pending:
+            task.cancel()
+    except Exception as e:
+        logging.error("Error: %s", e)
+        for task in pending:
+            task.cancel()
+        await websocket.close(code=1011, reason=f'Error: {e}'[:120])
+
 
 '''최종 분석 처리 엔드포인트'''
 class MeetingScriptIn(BaseModel):
@@ -135,7 +322,7 @@ class MeetingScriptOut(BaseModel):
 @app.post("/meeting-script", tags=['Analyze all questions'])
 async def meeting_script(response: MeetingScriptIn):
     corp_id, meeting_id = response.corpId, response.meetingId
-    meeting_script = meetings[corp_id][meeting_id] 
+    meeting_script = await asyncio.to_thread(meetings.get, corp_id, meeting_id)
     script = meeting_script.to_script_format()
     return {"result": "스크립트가 성공적으로 생성되었습니다.", "script": script}
 
@@ -147,80 +334,144 @@ class MeetingSummaryOut(BaseModel):
     result: str
     summary: str
     
-@app.post("/meeting-summary", tags=['Analyze all questions'])
-async def meeting_summary(response: MeetingSummaryIn):
+@cached_result('meeting-summary')
+def run_meeting_summary(ctx, response: MeetingSummaryIn):
     corp_id, meeting_id = response.corpId, response.meetingId
-    meeting_script = meetings[corp_id][meeting_id]
+    meeting_script = meetings.get(corp_id, meeting_id)
     script = meeting_script.to_script_format()
-    summary = summary_model.exec(script)
-    print(summary)
+    ctx.set_progress(0.1, 'LLM 요약 중')
+    # 질문별로 나눠 동시에 요약한 뒤 합침 (답변이 바뀌지 않은 질문은 캐시된 요약 사용)
+    with models.use('summary') as summary_model:
+        summary = summary_model.summarize(script, progress=lambda progress: ctx.set_progress(0.1 + 0.9 * progress))
+    logging.debug(f"/meeting-summary result: {summary}")
     return {"result":"요약이 성공적으로 완료되었습니다.", "summary":summary}
+
+@app.post("/meeting-summary", tags=['Analyze all questions'])
+async def meeting_summary(response: MeetingSummaryIn):
+    return await run_cached('meeting-summary', run_meeting_summary, response)
         
 class AnalyzeAllIn(BaseModel):
     corpId: int
     meetingId: int
+    # True면 토픽 모델을 처음부터 다시 학습
+    refit: bool = False
 
 class AnalyzeAllOut(BaseModel):
     result: str
-    topic_result: Dict
-    wordcloud_filename: str
-    sentiment_result: Dict[str, Dict]
-    
-@app.post("/analyze-all", response_model=AnalyzeAllOut, tags=['Analyze all questions'])
-async def analyze_all(response: AnalyzeAllIn):
+    # 실패한 단계의 결과는 None이고, 이유는 errors에 단계 이름별로 담김
+    topic_result: Optional[Dict] = None
+    wordcloud_filename: Optional[str] = None
+    sentiment_result: Optional[Dict[str, Dict]] = None
+    tensorboard_url: Optional[str] = None
+    errors: Dict[str, str] = {}
+    # 단계별 status / wall_sec / cpu_sec, total은 전체 소요 시간
+    timings: Dict[str, Dict] = {}
+
+def analyze_all_stages(ctx, corp_id, meeting_id, all_tokens, file_name, refit):
+    def topic():
+        # 답변이 들어올 때마다 갱신해 둔 회의별 토픽 모델 사용
+        return topic_models.topic_json(corp_id, meeting_id, refit=refit)
+
+    def embedding():
+        with models.use('embedding') as embedding_model:
+            embedding_vector_analyzer = EmbeddingVectorAnalyzer(corp_id=corp_id, meeting_id=meeting_id, embedding_model=embedding_model)
+            embedding_vector_analyzer.make_token_embeddings(all_tokens)
+        return embedding_vector_analyzer.run_tensorboard(tensorboard_server)
+
+    def wordcloud():
+        # 배치 계산은 GIL을 잡는 순수 파이썬 연산이므로 캐시에 없을 때만 프로세스 풀에서 그림
+        return wordcloud_cache.render(all_tokens, width=800, height=400, run=ctx.run_in_process)
+
+    def upload(wordcloud):
+        return ctx.run_async(outbound.post_wordcloud(wordcloud, file_name, meeting_id))
+
+    def sentiment():
+        with models.use('sentiment') as sentiment_analyzer:
+            sentiment_result = sentiment_analyzer.analyze_token_sentiment(all_tokens)
+            logging.info(f"/analyze-all sentiment cache: {sentiment_analyzer.score_cache.stats()}")
+        return sentiment_result
+
+    return [
+        Stage('topic', topic, kind=CPU),
+        Stage('embedding', embedding, kind=IO),
+        # 프로세스 풀의 결과를 기다리기만 하므로 io 풀에서 실행
+        Stage('wordcloud', wordcloud, kind=IO),
+        Stage('upload', upload, deps=['wordcloud'], kind=IO),
+        Stage('sentiment', sentiment, kind=CPU),
+    ]
+
+@cached_result('analyze-all', should_cache=lambda result: not result['errors'])
+def run_analyze_all(ctx, response: AnalyzeAllIn):
+    corp_id, meeting_id = response.corpId, response.meetingId
     try:
-        # logging
-        print(f'endpoint: /analyze-all, response: {response}')
-        logging.info(f"endpoint: /analyze-all: {response}")
-        
-        corp_id, meeting_id = response.corpId, response.meetingId
-        all_tokens = aggregate_meeting_tokens(corp_id, meeting_id, tokens)
-        topic_model = TopicModel(all_tokens)
-        json_result = topic_model.make_lda_json()
-        embedding_vector_analyzer = EmbeddingVectorAnalyzer(corp_id=corp_id, meeting_id=meeting_id, embedding_model=embedding_model)
-        embedding_vector_analyzer.make_token_embeddings(all_tokens)
-        port = embedding_vector_analyzer.find_available_port()
-        embedding_vector_analyzer.run_tensorboard('127.0.0.1', port)
-        
-        file_name = f"wordcloud_{str(uuid1())}.png"
-        output_image_path = f"./data/{file_name}"
-        make_wordcloud(tokens=all_tokens, mask_image_path=None, width=800, height=400, output_image_name=file_name)
-        
-        await post_wordcloud(output_image_path, file_name, meeting_id)
-        
-        sentiment_result = sentiment_analyzer.analyze_token_sentiment(all_tokens)
-        
-        return {"result":"모든 분석이 성공적으로 완료되었습니다.", "topic_result":json_result, "wordcloud_filename":file_name, "sentiment_result":sentiment_result, "tensorboard_url":f"http://127.0.0.1:{port}/#projector"}
-    
+        all_tokens = meetings.get(corp_id, meeting_id).get_all_tokens()
     except KeyError:
-        if corp_id not in tokens:
-            raise HTTPException(status_code=404, detail="corpId에 해당하는 데이터가 존재하지 않습니다.")
-        elif meeting_id not in tokens[corp_id]:
-            raise HTTPException(status_code=404, detail='meetingId에 해당하는 데이터가 존재하지 않습니다.')
-    except Exception as e:
-        if str(e) =='empty vocabulary; perhaps the documents only contain stop words':
+        raise_meeting_not_found(corp_id)
+
+    # 서로 의존하지 않는 단계는 동시에 실행하고, 실패한 단계가 있어도 나머지 결과는 반환
+    file_name = f"wordcloud_{str(uuid1())}.{WORDCLOUD_FORMAT}"
+    stages = analyze_all_stages(ctx, corp_id, meeting_id, all_tokens, file_name, response.refit)
+    stage_result = stage_executor.run(stages, ctx=ctx)
+    results, errors = stage_result.results, stage_result.errors
+    for stage, error in errors.items():
+        logging.error(f"/analyze-all {stage} 단계 실패: {error}")
+    if not results:
+        if any('empty vocabulary' in error for error in errors.values()):
             raise HTTPException(status_code=404, detail="분석할 데이터가 존재하지 않습니다.")
-        raise HTTPException(status_code=400, detail=f"error: {e}")
+        raise HTTPException(status_code=400, detail=f"error: {errors}")
+
+    return {
+        "result": "일부 분석이 실패했습니다." if errors else "모든 분석이 성공적으로 완료되었습니다.",
+        "topic_result": results.get('topic'),
+        "wordcloud_filename": file_name if 'wordcloud' in results else None,
+        "sentiment_result": results.get('sentiment'),
+        "tensorboard_url": results.get('embedding'),
+        "errors": errors,
+        "timings": dict(stage_result.timings, total={'wall_sec': round(stage_result.wall_sec, 4)}),
+    }
+
+@app.post("/analyze-all", response_model=AnalyzeAllOut, tags=['Analyze all questions'])
+async def analyze_all(response: AnalyzeAllIn):
+    # logging
+    print(f'endpoint: /analyze-all, response: {response}')
+    logging.info(f"endpoint: /analyze-all: {response}")
+    return await run_cached('analyze-all', run_analyze_all, response)
 
 
 '''질문 별 분석 엔드포인트''' 
 # 토픽 분석 
 class AnalyzeTopicIn(BaseModel):
-    responses: List
+    responses: List = []
+    # corpId와 meetingId를 주면 responses 대신 회의별 온라인 토픽 모델 사용
+    corpId: Optional[int] = None
+    meetingId: Optional[int] = None
+    refit: bool = False
 
 class AnalyzeTopicOut(BaseModel):
     result: str
     topic_result: Dict
+
+@cached_result('analyze-topic')
+def run_analyze_topic(ctx, response: AnalyzeTopicIn):
+    try:
+        if response.corpId is not None and response.meetingId is not None:
+            json_result = topic_models.topic_json(response.corpId, response.meetingId, refit=response.refit)
+        else:
+            answers = [item['answer'] for item in response.responses]
+            question_tokens = [token for answer_tokens in tokenize_answers(answers) for token in answer_tokens]
+            json_result = TopicModel(question_tokens).make_lda_json()
+    except KeyError:
+        raise_meeting_not_found(response.corpId)
+    except ValueError as e:
+        if str(e) == 'empty vocabulary; perhaps the documents only contain stop words':
+            raise HTTPException(status_code=404, detail="분석할 데이터가 존재하지 않습니다.")
+        raise HTTPException(status_code=400, detail=f"error: {e}")
+    return {"result":"토픽 분석이 성공적으로 완료되었습니다.", "topic_result":json_result}
     
 @app.post("/analyze-topic", response_model=AnalyzeTopicOut, tags=['Analyze each question'])
 async def analyze_topic(response: AnalyzeTopicIn):
     logging.info(f"endpoint: /analyze-topic : {response}")
-    responses = response.responses
-    question_tokens = aggregate_question_tokens(responses)
-    topic_model = TopicModel(question_tokens)
-    json_result = topic_model.make_lda_json()
-    
-    return {"result":"토픽 분석이 성공적으로 완료되었습니다.", "topic_result":json_result}
+    return await run_cached('analyze-topic', run_analyze_topic, response)
 
 
 # 임베딩 분석, 각 답변에 대해 거리 확인
@@ -234,16 +485,95 @@ class AnalyzeEmbeddingOut(BaseModel):
     result: str
     tensorboard_url: str
     
+def run_analyze_embedding(ctx, response: AnalyzeEmbeddingIn):
+    responses, corp_id, meeting_id, question_id = response.responses, response.corpId, response.meetingId, response.questionId
+    # 모델 로드, 임베딩, projector 파일 쓰기 모두 이벤트 루프 밖에서 실행
+    with models.use('embedding') as embedding_model:
+        embedding_vector_analyzer = EmbeddingVectorAnalyzer(corp_id=corp_id, meeting_id=meeting_id, question_id=question_id, embedding_model=embedding_model)
+        embedding_vector_analyzer.make_sentence_embeddings(responses)
+    tensorboard_url = embedding_vector_analyzer.run_tensorboard(tensorboard_server)
+
+    return {"result":"임베딩 분석이 성공적으로 완료되었습니다.", "tensorboard_url":tensorboard_url}
+
 @app.post("/analyze-embedding", response_model=AnalyzeEmbeddingOut, tags=['Analyze each question'])
 async def analyze_embedding(response: AnalyzeEmbeddingIn):
     logging.info(f"endpoint: /analyze-embedding : {response}")
-    responses, corp_id, meeting_id, question_id = response.responses, response.corpId, response.meetingId, response.questionId
-    embedding_vector_analyzer = EmbeddingVectorAnalyzer(corp_id=corp_id, meeting_id=meeting_id, question_id=question_id, embedding_model=embedding_model)
-    embedding_vector_analyzer.make_sentence_embeddings(responses)
-    port = embedding_vector_analyzer.find_available_port()
-    embedding_vector_analyzer.run_tensorboard('127.0.0.1', port)
-    
-    return {"result":"임베딩 분석이 성공적으로 완료되었습니다.", "tensorboard_url":f"http://127.0.0.1:{port}/#projector"}
+    return await jobs.run('analyze-embedding', run_analyze_embedding, response)
+
+# 유사 답변 검색 (meetingId가 없으면 기업 전체에서 검색)
+class SimilarAnswersIn(BaseModel):
+    corpId: int
+    meetingId: Optional[int] = None
+    query: str
+    topK: int = 10
+
+class SimilarAnswersOut(BaseModel):
+    result: str
+    answers: List[Dict]
+
+def raise_meeting_not_found(corp_id):
+    if not meetings.has_corp(corp_id):
+        raise HTTPException(status_code=404, detail="corpId에 해당하는 데이터가 존재하지 않습니다.")
+    raise HTTPException(status_code=404, detail='meetingId에 해당하는 데이터가 존재하지 않습니다.')
+
+def run_similar_answers(ctx, response: SimilarAnswersIn):
+    try:
+        answers = vector_indexes.similar(response.query, response.corpId, response.meetingId, top_k=response.topK)
+    except KeyError:
+        raise_meeting_not_found(response.corpId)
+    return {"result": "유사 답변 검색이 완료되었습니다.", "answers": answers}
+
+@app.post("/similar-answers", response_model=SimilarAnswersOut, tags=['Vector search'])
+async def similar_answers(response: SimilarAnswersIn):
+    logging.info(f"endpoint: /similar-answers : {response}")
+    return await jobs.run('similar-answers', run_similar_answers, response)
+
+# 거의 같은 답변 묶음
+class NearDuplicatesIn(BaseModel):
+    corpId: int
+    meetingId: Optional[int] = None
+    threshold: float = 0.9
+
+class NearDuplicatesOut(BaseModel):
+    result: str
+    clusters: List[List[Dict]]
+
+def run_near_duplicates(ctx, response: NearDuplicatesIn):
+    try:
+        clusters = vector_indexes.near_duplicates(response.corpId, response.meetingId, threshold=response.threshold)
+    except KeyError:
+        raise_meeting_not_found(response.corpId)
+    return {"result": "중복 답변 탐색이 완료되었습니다.", "clusters": clusters}
+
+@app.post("/near-duplicates", response_model=NearDuplicatesOut, tags=['Vector search'])
+async def near_duplicates(response: NearDuplicatesIn):
+    logging.info(f"endpoint: /near-duplicates : {response}")
+    return await jobs.run('near-duplicates', run_near_duplicates, response)
+
+# 질문별 답변 중심 간 거리
+class QuestionCentroidsIn(BaseModel):
+    corpId: int
+    meetingId: int
+
+class QuestionCentroidsOut(BaseModel):
+    result: str
+    question_ids: List
+    sizes: List[int]
+    spread: List[float]
+    distance: List[List[float]]
+
+def run_question_centroids(ctx, response: QuestionCentroidsIn):
+    try:
+        centroids = vector_indexes.question_centroids(response.corpId, response.meetingId)
+    except KeyError:
+        raise_meeting_not_found(response.corpId)
+    return {"result": "질문별 중심 거리 계산이 완료되었습니다.", "question_ids": centroids['groups'], "sizes": centroids['sizes'],
+            "spread": centroids['spread'], "distance": centroids['distance']}
+
+@app.post("/question-centroids", response_model=QuestionCentroidsOut, tags=['Vector search'])
+async def question_centroids(response: QuestionCentroidsIn):
+    logging.info(f"endpoint: /question-centroids : {response}")
+    return await jobs.run('question-centroids', run_question_centroids, response)
 
 # 워드 클라우드
 class GenerateWordcloudIn(BaseModel):
@@ -253,23 +583,26 @@ class GenerateWordcloudOut(BaseModel):
     result: str
     wordcloud_filename: str
 
-@app.post("/generate-wordcloud", response_model=GenerateWordcloudOut, tags=['Analyze each question'])
-async def generate_wordcloud(response: GenerateWordcloudIn):
-    # logging
-    logging.info(f"endpoint: /generate-wordcloud : {response}")
-    print(f'endpoint: /generate-wordcloud, response: {response}')
-    
+@cached_result('generate-wordcloud')
+def run_generate_wordcloud(ctx, response: GenerateWordcloudIn):
     responses = response.responses
     meeting_id = responses[0]['meetingId']
     
-    tokens = remove_stopwords(tokenize_text(aggregate_question_tokens(responses)))
-    file_name = f"wordcloud_{str(uuid1())}.png"
-    output_image_path = f"./data/{file_name}"
-    make_wordcloud(tokens=tokens, mask_image_path=None, width=800, height=400, output_image_name=file_name)
-    await post_wordcloud(output_image_path, file_name, meeting_id)
+    answers = [item['answer'] for item in responses]
+    tokens = [token for answer_tokens in tokenize_answers(answers) for token in answer_tokens]
+    file_name = f"wordcloud_{str(uuid1())}.{WORDCLOUD_FORMAT}"
+    image = wordcloud_cache.render(tokens, width=800, height=400, run=ctx.run_in_process)
+    ctx.run_async(outbound.post_wordcloud(image, file_name, meeting_id))
     
     return {"result":"워드 클라우드가 성공적으로 생성되었습니다.", "wordcloud_filename":file_name}
 
+@app.post("/generate-wordcloud", response_model=GenerateWordcloudOut, tags=['Analyze each question'])
+async def generate_wordcloud(response: GenerateWordcloudIn):
+    # logging
+    logging.info(f"endpoint: /generate-wordcloud : {response}")
+    print(f'endpoint: /generate-wordcloud, response: {response}')
+    return await run_cached('generate-wordcloud', run_generate_wordcloud, response)
+
 # 감정분석
 class AnalyzeSentimentIn(BaseModel):
     responses: list
@@ -281,11 +614,84 @@ class AnalyzeSentimentOut(BaseModel):
     token_count: Dict[str, int]
     most_common_token: List[Tuple[str, int]]
     
+@cached_result('analyze-sentiment')
+def run_analyze_sentiment(ctx, response: AnalyzeSentimentIn):
+    with models.use('sentiment') as sentiment_analyzer:
+        sent_result, token_count, most_common_token = sentiment_analyzer.analyze_sentence_sentiment(response.responses, most_k=response.mostCommonK)
+    return {"result":"감정 분석이 성공적으로 완료되었습니다.", "sentiment_result":sent_result, "token_count":token_count, "most_common_token":most_common_token}
+
 @app.post("/analyze-sentiment", response_model=AnalyzeSentimentOut, tags=['Analyze each question'])
 async def analyze_sentiment(response: AnalyzeSentimentIn):
     logging.info(f"endpoint: /analyze-sentiment : {response}")
-    sent_result, token_count, most_common_token = sentiment_analyzer.analyze_sentence_sentiment(response.responses, most_k=response.mostCommonK)
-    return {"result":"감정 분석이 성공적으로 완료되었습니다.", "sentiment_result":sent_result, "token_count":token_count, "most_common_token":most_common_token}
+    return await run_cached('analyze-sentiment', run_analyze_sentiment, response)
+
+'''비동기 작업 엔드포인트'''
+# 제출 즉시 job_id를 돌려주고, 상태/결과는 따로 조회
+JOB_KINDS = {
+    'submit-voice': (SubmitVoiceIn, run_submit_voice),
+    'meeting-summary': (MeetingSummaryIn, run_meeting_summary),
+    'analyze-all': (AnalyzeAllIn, run_analyze_all),
+    'analyze-embedding': (AnalyzeEmbeddingIn, run_analyze_embedding),
+    'analyze-topic': (AnalyzeTopicIn, run_analyze_topic),
+    'analyze-sentiment': (AnalyzeSentimentIn, run_analyze_sentiment),
+    'generate-wordcloud': (GenerateWordcloudIn, run_generate_wordcloud),
+}
+
+def get_job_or_404(job_id: str):
+    try:
+        return jobs.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="job_id에 해당하는 작업이 없거나 보관 기간이 지났습니다.")
+
+@app.post("/jobs/{kind}", status_code=202, tags=['Jobs'])
+async def submit_job(kind: str, body: Dict):
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=404, detail=f"지원하지 않는 작업 종류입니다: {kind}")
+    input_model, worker = JOB_KINDS[kind]
+    try:
+        request = input_model.model_validate(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    logging.info(f"/jobs/{kind}: {request}")
+    job = jobs.submit(kind, worker, request)
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}", tags=['Jobs'])
+async def get_job(job_id: str):
+    return get_job_or_404(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/result", tags=['Jobs'])
+async def get_job_result(job_id: str):
+    job = get_job_or_404(job_id)
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"아직 완료되지 않은 작업입니다. (status: {job.status})")
+    if job.status == CANCELLED:
+        raise HTTPException(status_code=410, detail="취소된 작업입니다.")
+    if job.status == FAILED:
+        raise HTTPException(status_code=job.status_code or 500, detail=job.error)
+    return {"job": job.to_dict(), "result": job.result}
+
+@app.delete("/jobs/{job_id}", tags=['Jobs'])
+async def cancel_job(job_id: str):
+    get_job_or_404(job_id)
+    return jobs.cancel(job_id).to_dict()
+
+# 캐시 현황
+@app.get("/cache-stats", tags=['Monitoring'])
+async def cache_stats():
+    return {
+        "token_cache": token_cache.stats(),
+        "sentiment_cache": models.get('sentiment').score_cache.stats() if models.is_loaded('sentiment') else None,
+        "embedding_cache": embedding_cache_stats(),
+        "jobs": jobs.stats(),
+        "tensorboard": tensorboard_server.stats(),
+        "models": models.stats(),
+        "topic_models": topic_models.stats(),
+        "result_cache": result_cache.stats(),
+        "wordcloud_cache": wordcloud_cache.stats(),
+        "outbound": outbound.stats(),
+        "summary_cache": summary_cache.stats(),
+    }
 
 # #시연용 분셕 사이트
 # from fastapi.templating import Jinja2Templates
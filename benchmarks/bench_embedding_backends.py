@@ -0,0 +1,77 @@
+"""임베딩 백엔드별 처리량(vectors/sec) 벤치마크.
+
+원격 API는 요청당 왕복 지연(--rtt)과 요청당 최대 개수(--remote-chunk)를 흉내 내는 스텁으로 대신하고,
+로컬 sentence-transformers 모델은 실제로 인코딩합니다. 임베딩 캐시는 사용하지 않습니다.
+
+    python benchmarks/bench_embedding_backends.py --texts 1000 10000 --rtt 0.3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AnalyzeMeeting.embedding_backend import DEFAULT_MODEL_NAMES, SentenceTransformerEmbeddings  # noqa: E402
+
+WORDS = ['분홍색', '초록색', '패키지', '느낌', '화사한', '자연스러운', '브랜드', '이미지', '부담스러워요', '좋아요',
+         '고급스러운', '흔한', '트렌드', '편안한', '친환경', '별로예요', '예쁜', '소비자', '인상적', '같아요']
+
+
+class StubRemoteEmbeddings():
+    """OpenAIEmbeddings처럼 chunk 단위로 요청을 보내는 원격 백엔드 스텁. 요청마다 rtt초를 기다립니다."""
+    def __init__(self, rtt: float, chunk: int, dim: int = 1536):
+        self.model = 'stub-remote'
+        self.rtt = rtt
+        self.chunk = chunk
+        self.dim = dim
+        self.rng = np.random.default_rng(0)
+
+    def embed_documents(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.chunk):
+            batch = texts[start:start + self.chunk]
+            time.sleep(self.rtt)
+            vectors.append(self.rng.standard_normal((len(batch), self.dim), dtype=np.float32))
+        return np.concatenate(vectors)
+
+
+def make_texts(n, seed=42):
+    rng = random.Random(seed)
+    return [' '.join(rng.choices(WORDS, k=rng.randint(1, 12))) + f' {i}' for i in range(n)]
+
+
+def measure(model, texts):
+    start = time.perf_counter()
+    vectors = model.embed_documents(texts)
+    elapsed = time.perf_counter() - start
+    return len(vectors) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--texts', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--rtt', type=float, default=0.3, help='원격 요청 1회 왕복 시간(초)')
+    parser.add_argument('--remote-chunk', type=int, default=1000)
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAMES['sentence-transformers'])
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--processes', type=int, default=0, help='0보다 크면 멀티 프로세스 풀 사용')
+    args = parser.parse_args()
+
+    remote = StubRemoteEmbeddings(args.rtt, args.remote_chunk)
+    local = SentenceTransformerEmbeddings(args.model, device='cpu', batch_size=args.batch_size,
+                                          processes=args.processes, process_min_texts=0)
+    local.embed_documents(make_texts(args.batch_size))  # warmup
+
+    print(f"{'texts':>8}{'remote vec/s':>16}{'local vec/s':>16}")
+    for n in args.texts:
+        texts = make_texts(n)
+        print(f"{n:>8}{measure(remote, texts):>16.1f}{measure(local, texts):>16.1f}")
+    local.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""LDAvis JSON 생성 시간 벤치마크.
+
+pyLDAvis.lda_model.prepare + 리스트 변환(이전 방식)과 numpy 구현(prepare_lda_vis)을 같은 모델로 비교하고,
+두 결과의 단어 목록과 값이 같은지 확인합니다. (PCoA 좌표는 축 부호가 다를 수 있어 절댓값으로 비교)
+
+    python benchmarks/bench_lda_vis.py --tokens 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AnalyzeMeeting.lda_vis import prepare_lda_vis  # noqa: E402
+from AnalyzeMeeting.topic_model import TopicModel  # noqa: E402
+from benchmarks.bench_topic_model import make_tokens  # noqa: E402
+
+
+def same_payload(old, new):
+    for section in ('mdsDat', 'tinfo', 'token.table'):
+        for key, values in new[section].items():
+            expected = list(old[section][key])
+            if len(expected) != len(values):
+                return False
+            if isinstance(values[0], str):
+                if expected != values:
+                    return False
+            elif key in ('x', 'y'):
+                if not np.allclose(np.abs(expected), np.abs(values), atol=1e-6):
+                    return False
+            elif not np.allclose(np.asarray(expected, dtype=float), np.asarray(values, dtype=float)):
+                return False
+    return [int(topic) for topic in old['topic.order']] == new['topic.order']
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tokens', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    import pyLDAvis.lda_model
+
+    print(f"{'tokens':>8}{'pyLDAvis s':>12}{'numpy s':>10}{'speedup':>10}{'same':>6}")
+    for n in args.tokens:
+        model = TopicModel(make_tokens(n))
+        start = time.perf_counter()
+        old = pyLDAvis.lda_model.prepare(model.best_model, model.feat_vec, model.count_vec).to_dict()
+        old_sec = time.perf_counter() - start
+        start = time.perf_counter()
+        new = prepare_lda_vis(model.best_model, model.feat_vec, model.feature_names)
+        new_sec = time.perf_counter() - start
+        print(f"{n:>8}{old_sec:>12.3f}{new_sec:>10.3f}{old_sec / new_sec:>9.1f}x{str(same_payload(old, new)):>6}")
+
+
+if __name__ == '__main__':
+    main()
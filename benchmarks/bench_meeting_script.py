@@ -0,0 +1,80 @@
+"""MeetingScript.add_answer / to_script_format 처리량 벤치마크.
+
+기존 pd.concat 방식과 컬럼 저장소 방식을 같은 데이터로 비교합니다.
+토큰은 미리 넣어 형태소 분석 비용은 제외합니다.
+
+    python benchmarks/bench_meeting_script.py --answers 10000 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AnalyzeMeeting.make_script import MeetingScript  # noqa: E402
+
+
+class LegacyMeetingScript():
+    """비교용: 답변마다 pd.concat 하던 이전 구현"""
+    def __init__(self, corp_id, meeting_id):
+        self.corp_id = corp_id
+        self.meeting_id = meeting_id
+        self.questions = pd.DataFrame(columns=['question_id', 'question_text'])
+        self.data = pd.DataFrame(columns=['question_id', 'user_id', 'answer', 'tokens'])
+
+    def add_question(self, question_id, question_text):
+        if self.questions[self.questions['question_id'] == question_id].empty:
+            new_question = pd.DataFrame([{'question_id': question_id, 'question_text': question_text}])
+            self.questions = pd.concat([self.questions, new_question], ignore_index=True)
+
+    def add_answer(self, question_id, answer, user_id, tokens=None):
+        new_answer = pd.DataFrame([{'question_id': question_id, 'user_id': user_id, 'answer': answer, 'tokens': tokens}])
+        self.data = pd.concat([self.data, new_answer], ignore_index=True)
+
+    def to_script_format(self):
+        script = []
+        for question_id in self.questions['question_id'].unique():
+            question_row = self.questions[self.questions['question_id'] == question_id]['question_text']
+            answers = self.data[(self.data['question_id'] == question_id) & self.data['answer'].notna()]['answer'].tolist()
+            script.append({"question": question_row.iloc[0], "answer": answers})
+        return script
+
+
+def run(script_cls, n_answers, n_questions):
+    script = script_cls(1, 1)
+    tokens = ['분홍색', '패키지', '느낌']
+    start = time.perf_counter()
+    for question_id in range(n_questions):
+        script.add_question(question_id, f'질문 {question_id}')
+    for i in range(n_answers):
+        script.add_answer(i % n_questions, f'답변 {i}', i, tokens=tokens)
+    append_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    script.to_script_format()
+    script_sec = time.perf_counter() - start
+    return append_sec, script_sec
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--answers', type=int, nargs='+', default=[10000, 20000])
+    parser.add_argument('--questions', type=int, default=20)
+    parser.add_argument('--skip-legacy', action='store_true', help='기존 구현 측정 생략 (큰 입력에서 수 분 소요)')
+    args = parser.parse_args()
+
+    print(f"{'impl':<10}{'answers':>10}{'append s':>12}{'answers/s':>14}{'script s':>12}")
+    for n_answers in args.answers:
+        impls = [('columnar', MeetingScript)]
+        if not args.skip_legacy:
+            impls.append(('concat', LegacyMeetingScript))
+        for name, script_cls in impls:
+            append_sec, script_sec = run(script_cls, n_answers, args.questions)
+            print(f"{name:<10}{n_answers:>10}{append_sec:>12.3f}{n_answers / append_sec:>14.0f}{script_sec:>12.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""감정 분석 추론 백엔드별 처리량(sentences/sec) 벤치마크.
+
+torch / onnx / onnx-int8 백엔드를 같은 문장으로 측정하고, torch 대비 점수 차이를 함께 출력합니다.
+점수 캐시는 끄고 predict_scores만 측정합니다.
+
+    python benchmarks/bench_sentiment_backends.py --sentences 512 --batch-size 32
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AnalyzeMeeting.sentiment_model import SentimentAnalyzer  # noqa: E402
+
+WORDS = ['분홍색', '초록색', '패키지', '느낌', '화사한', '자연스러운', '브랜드', '이미지', '부담스러워요', '좋아요',
+         '고급스러운', '흔한', '트렌드', '편안한', '친환경', '별로예요', '예쁜', '소비자', '인상적', '같아요']
+
+
+def make_sentences(n, seed=42):
+    rng = random.Random(seed)
+    return [' '.join(rng.choices(WORDS, k=rng.randint(3, 30))) + f' {i}' for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sentences', type=int, default=512)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--backends', nargs='+', default=['torch', 'onnx', 'onnx-int8'])
+    args = parser.parse_args()
+
+    sentences = make_sentences(args.sentences)
+    reference = None
+    print(f"{'backend':<12}{'sentences/s':>14}{'max |diff|':>14}")
+    for backend in args.backends:
+        analyzer = SentimentAnalyzer(backend=backend, batch_size=args.batch_size, cache_path=None, device='cpu')
+        analyzer.predict_scores(sentences[:args.batch_size])  # warmup
+        start = time.perf_counter()
+        scores = np.array(analyzer.predict_scores(sentences))
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = scores
+        diff = float(np.abs(scores - reference).max())
+        print(f"{backend:<12}{len(sentences) / elapsed:>14.1f}{diff:>14.5f}")
+
+
+if __name__ == '__main__':
+    main()
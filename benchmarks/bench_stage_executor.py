@@ -0,0 +1,52 @@
+"""/analyze-all 단계 실행 방식 벤치마크.
+
+topic / embedding / wordcloud / upload / sentiment 단계를 대기 시간으로 흉내 내어
+순차 실행(이전 방식)과 StageExecutor 동시 실행의 전체 소요 시간을 비교합니다.
+upload는 wordcloud에 의존하므로 동시 실행 시 임계 경로는 max(topic, embedding, wordcloud + upload, sentiment)입니다.
+
+    python benchmarks/bench_stage_executor.py --topic 0.4 --embedding 0.6 --wordcloud 0.3 --upload 0.2 --sentiment 0.5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pipeline import CPU, IO, Stage, StageExecutor  # noqa: E402
+
+
+def fake_stage(seconds, **deps):
+    time.sleep(seconds)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    for name, default in (('topic', 0.4), ('embedding', 0.6), ('wordcloud', 0.3), ('upload', 0.2), ('sentiment', 0.5)):
+        parser.add_argument(f'--{name}', type=float, default=default)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    stages = [
+        Stage('topic', fake_stage, args=(args.topic,), kind=CPU),
+        Stage('embedding', fake_stage, args=(args.embedding,), kind=IO),
+        Stage('wordcloud', fake_stage, args=(args.wordcloud,), kind=CPU),
+        Stage('upload', fake_stage, args=(args.upload,), deps=['wordcloud'], kind=IO),
+        Stage('sentiment', fake_stage, args=(args.sentiment,), kind=CPU),
+    ]
+    executor = StageExecutor()
+    print(f"{'run':>4}{'sequential s':>14}{'concurrent s':>14}{'speedup':>10}")
+    for run in range(args.repeat):
+        start = time.perf_counter()
+        for stage in stages:
+            stage.fn(*stage.args)
+        sequential = time.perf_counter() - start
+        result = executor.run(stages)
+        assert result.ok, result.errors
+        print(f"{run + 1:>4}{sequential:>14.3f}{result.wall_sec:>14.3f}{sequential / result.wall_sec:>9.1f}x")
+    executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""서버 시작 시간과 메모리(RSS) 벤치마크.
+
+각 설정마다 새 프로세스에서 `import app` 시간과 lifespan 시작(모델 warmup 포함) 시간,
+시작 직후 RSS를 잽니다. 기본값은 아무 모델도 미리 로드하지 않는 경우와 모두 로드하는 경우를 비교합니다.
+
+    python benchmarks/bench_startup.py --warmup "" "sentiment,stt,embedding,summary"
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행할 코드: 결과를 JSON 한 줄로 출력
+CHILD = """
+import asyncio, json, sys, time
+import psutil
+start = time.perf_counter()
+import app
+import_sec = time.perf_counter() - start
+
+async def startup():
+    async with app.lifespan(app.app):
+        return time.perf_counter() - start, psutil.Process().memory_info().rss
+
+ready_sec, rss = asyncio.run(startup())
+print(json.dumps({'import_sec': import_sec, 'ready_sec': ready_sec, 'rss_mb': rss / 2**20}))
+"""
+
+
+def measure(warmup: str):
+    env = dict(os.environ, MODEL_WARMUP=warmup)
+    result = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'unknown error')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--warmup', nargs='+', default=['', 'sentiment,stt,embedding,summary'],
+                        help='비교할 MODEL_WARMUP 값들')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'MODEL_WARMUP':<36}{'import s':>10}{'ready s':>10}{'RSS MB':>10}")
+    for warmup in args.warmup:
+        runs = [measure(warmup) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run['ready_sec'])
+        print(f"{warmup or '(none)':<36}{best['import_sec']:>10.2f}{best['ready_sec']:>10.2f}{best['rss_mb']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
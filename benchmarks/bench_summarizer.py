@@ -0,0 +1,58 @@
+"""회의 요약 벤치마크 (가짜 채팅 모델 사용, API 키 불필요).
+
+LLM 호출 하나를 --latency초 대기로 흉내 내어, 전체 스크립트를 한 번에 요약하는 이전 방식(단일 호출, 입력 크기)과
+MapReduceSummarizer의 처음 요약 / 다시 요약 / 질문 하나만 바뀐 뒤 요약의 소요 시간과 LLM 호출 수를 비교합니다.
+
+    python benchmarks/bench_summarizer.py --questions 10 --answers 50 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AnalyzeMeeting.summarizer import MapReduceSummarizer, SummaryCache, estimate_tokens  # noqa: E402
+
+
+class FakeChatModel():
+    """LLMModel.exec와 같은 형태로 호출되는 가짜 모델. 입력이 가장 컸던 호출의 토큰 수를 기록합니다."""
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.max_tokens = 0
+        self._lock = threading.Lock()
+
+    def exec(self, text, user_prompt_template=None):
+        with self._lock:
+            self.max_tokens = max(self.max_tokens, estimate_tokens(text))
+        time.sleep(self.latency)
+        return f"1. 요약: {text[:50]}\n2. 주요 포인트:\n    - 포인트 1"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--questions', type=int, default=10)
+    parser.add_argument('--answers', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args()
+
+    script = [{'question': f'질문 {q}', 'answer': [f'{q}번 질문에 대한 {i}번째 답변입니다. ' * 5 for i in range(args.answers)]}
+              for q in range(args.questions)]
+    print(f"single call input: {estimate_tokens(str(script))} tokens (about {args.latency:.1f}s + context overflow)")
+
+    model = FakeChatModel(args.latency)
+    summarizer = MapReduceSummarizer(model, '{text}', cache=SummaryCache())
+    for label in ('cold', 'warm', 'one question changed'):
+        if label == 'one question changed':
+            script[0]['answer'].append('새로 들어온 답변입니다.')
+        calls = summarizer.llm_calls
+        start = time.perf_counter()
+        summarizer.summarize(script)
+        print(f"{label:>22}: {time.perf_counter() - start:.2f}s, {summarizer.llm_calls - calls} llm calls")
+    print(f"largest single call input: {model.max_tokens} tokens")
+    summarizer.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""TopicModel 모델 선택 시간 벤치마크.
+
+이전 GridSearchCV(n_components=[3,4,5], cv=3) 방식과 현재 TopicModel(병렬 후보 학습, 검증 perplexity,
+조기 종료)을 같은 합성 회의 토큰으로 비교합니다. 토큰은 몇 개의 주제 어휘에서 Zipf 분포로 뽑습니다.
+
+    python benchmarks/bench_topic_model.py --tokens 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.model_selection import GridSearchCV
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AnalyzeMeeting.topic_model import TopicModel  # noqa: E402
+
+
+def make_tokens(n, topics=4, vocab_per_topic=None, seed=42):
+    # 토큰 수가 많아도 max_df=10을 넘지 않는 단어가 남도록 어휘 크기를 토큰 수에 맞춰 늘림
+    vocab_per_topic = vocab_per_topic or max(100, n // (topics * 4))
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, vocab_per_topic + 1)
+    weights /= weights.sum()
+    topic_ids = rng.integers(topics, size=n)
+    word_ids = rng.choice(vocab_per_topic, size=n, p=weights)
+    return [f'주제{t}_단어{w}' for t, w in zip(topic_ids, word_ids)]
+
+
+def legacy_grid_search(tokens):
+    count_vec = CountVectorizer(max_df=10, max_features=1000, min_df=1, ngram_range=(1,2))
+    feat_vec = count_vec.fit_transform(tokens)
+    search = GridSearchCV(LatentDirichletAllocation(random_state=42), {'n_components': [3, 4, 5]}, cv=3)
+    search.fit(feat_vec)
+    return search.best_estimator_.n_components
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tokens', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--selection', default='perplexity', choices=['perplexity', 'coherence'])
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args()
+
+    print(f"{'tokens':>8}{'grid s':>10}{'grid k':>8}{'new s':>10}{'new k':>8}{'speedup':>10}")
+    for n in args.tokens:
+        tokens = make_tokens(n)
+        legacy_sec, legacy_k = timed(legacy_grid_search, tokens)
+        new_sec, model = timed(lambda: TopicModel(tokens, selection=args.selection, n_jobs=args.n_jobs))
+        print(f"{n:>8}{legacy_sec:>10.2f}{legacy_k:>8}{new_sec:>10.2f}{model.best_n_components:>8}{legacy_sec / new_sec:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
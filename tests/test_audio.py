@@ -0,0 +1,161 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from AnalyzeMeeting import audio
+from AnalyzeMeeting.audio import (SAMPLE_RATE, VAD_FRAME_SEC, StreamSegmenter, decode_audio, frame_energy_db, parse_wav_header,
+                                  preprocess_for_stt, speech_mask)
+
+
+def tone(seconds: float, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def test_speech_mask_keeps_length_for_clip_shorter_than_kernel():
+    # 0.3초 = 10프레임, 패딩 커널(2 * 7 + 1 = 15프레임)보다 짧음
+    samples = tone(0.3)
+    frame = int(SAMPLE_RATE * VAD_FRAME_SEC)
+    mask = speech_mask(samples)
+    assert len(mask) == len(frame_energy_db(samples, frame)) == 10
+    assert mask.all()
+
+
+def test_preprocess_short_clip_keeps_all_speech():
+    samples = tone(0.3)
+    kept, stats = preprocess_for_stt(samples)
+    assert len(kept) == len(samples)
+    assert stats['trimmed_sec'] == 0.0
+    assert stats['lead_sec'] == 0.0
+
+
+def test_speech_mask_pads_short_clip_with_leading_silence():
+    samples = np.concatenate([np.zeros(int(SAMPLE_RATE * 0.15), dtype=np.float32), tone(0.15)])
+    mask = speech_mask(samples)
+    assert len(mask) == 10
+    # 발화 앞 5프레임은 pad(0.2초 = 7프레임) 안에 들어가므로 모두 발화로 표시
+    assert mask.all()
+
+
+def test_preprocess_shortens_long_pause():
+    silence = np.zeros(int(SAMPLE_RATE * 3.0), dtype=np.float32)
+    kept, stats = preprocess_for_stt(np.concatenate([tone(1.0), silence, tone(1.0)]))
+    # 3초 침묵은 잘려 나가지 않고 VAD_KEEP_PAUSE_SEC 길이로 줄어듦
+    assert stats['pauses_shortened'] == 1
+    assert 2.0 < stats['kept_sec'] < 3.0
+
+
+def wav_bytes(frames: bytes, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+
+def no_ffmpeg(*args, **kwargs):
+    raise AssertionError("WAV는 ffmpeg를 거치지 않아야 합니다.")
+
+
+def test_decode_audio_reads_wav_in_memory(monkeypatch):
+    monkeypatch.setattr(audio, 'decode_with_ffmpeg', no_ffmpeg)
+    pcm = (tone(0.5) * 32767).astype('<i2')
+    samples = decode_audio(wav_bytes(pcm.tobytes(), SAMPLE_RATE))
+    assert samples.dtype == np.float32
+    assert len(samples) == len(pcm)
+    assert np.allclose(samples, pcm / 32768.0)
+
+
+def test_decode_audio_downmixes_and_resamples():
+    # 8kHz 스테레오, 왼쪽 0.5 / 오른쪽 -0.1 → 평균 0.2
+    left = np.full(8000, 16384, dtype='<i2')
+    right = np.full(8000, -3277, dtype='<i2')
+    stereo = np.stack([left, right], axis=1).reshape(-1)
+    samples = decode_audio(wav_bytes(stereo.tobytes(), 8000, channels=2))
+    assert len(samples) == SAMPLE_RATE
+    # 리샘플링 필터 가장자리를 제외하면 평균값 유지
+    assert np.allclose(samples[1000:-1000], 0.2, atol=1e-3)
+
+
+def test_decode_audio_supports_8bit_and_24bit_pcm():
+    unsigned = np.array([0, 128, 255], dtype=np.uint8)
+    assert np.allclose(decode_audio(wav_bytes(unsigned.tobytes(), SAMPLE_RATE, sample_width=1)), [-1.0, 0.0, 127 / 128])
+    # 24bit little-endian: -1, 0x400000(0.5)
+    packed = bytes([0xff, 0xff, 0xff, 0x00, 0x00, 0x40])
+    decoded = decode_audio(wav_bytes(packed, SAMPLE_RATE, sample_width=3))
+    assert np.allclose(decoded, [-1 / 8388608.0, 0.5])
+
+
+def test_decode_audio_sends_other_formats_to_ffmpeg(monkeypatch):
+    calls = []
+
+    def fake_ffmpeg(audio_bytes, target_sr):
+        calls.append((audio_bytes, target_sr))
+        return np.zeros(3, dtype=np.float32)
+
+    monkeypatch.setattr(audio, 'decode_with_ffmpeg', fake_ffmpeg)
+    assert len(decode_audio(b'\x1aE\xdf\xa3webm')) == 3
+    assert calls == [(b'\x1aE\xdf\xa3webm', SAMPLE_RATE)]
+
+
+def pcm16(samples: np.ndarray) -> bytes:
+    return (samples * 32767).astype('<i2').tobytes()
+
+
+def feed_in_chunks(segmenter: StreamSegmenter, data: bytes, size: int = 1001) -> list:
+    # 샘플 경계에 맞지 않는 크기로 잘라서 넣음
+    segments = []
+    for start in range(0, len(data), size):
+        segments.extend(segmenter.feed(data[start:start + size]))
+    return segments
+
+
+def test_parse_wav_header_waits_for_data_chunk():
+    header = wav_bytes(b'', 8000, channels=2)[:44]
+    assert parse_wav_header(header[:7]) is None
+    assert parse_wav_header(header[:30]) is None
+    assert parse_wav_header(header) == (8000, 2, 2, 44)
+    with pytest.raises(ValueError):
+        parse_wav_header(b'OggS' + bytes(40))
+
+
+def test_segmenter_cuts_on_silence_after_min_length():
+    segmenter = StreamSegmenter(min_segment_sec=1.0, max_segment_sec=10.0, min_silence_sec=0.3)
+    silence = np.zeros(int(SAMPLE_RATE * 0.5), dtype=np.float32)
+    stream = np.concatenate([tone(1.2), silence, tone(0.6), silence, tone(0.5)])
+    segments = feed_in_chunks(segmenter, pcm16(stream))
+    # 1.2초 발화 + 0.3초 침묵에서 한 번, 남은 침묵 + 0.6초 발화가 1초를 넘긴 뒤 다시 침묵에서 한 번 자름
+    assert [round(len(s) / SAMPLE_RATE, 1) for s in segments] == [1.5, 1.1]
+    rest = segmenter.flush()
+    assert len(rest) == 1
+    assert segmenter.flush() == []
+    assert sum(len(s) for s in segments + rest) == len(stream)
+    assert segmenter.duration_sec == pytest.approx(len(stream) / SAMPLE_RATE)
+
+
+def test_segmenter_forces_cut_at_max_length_and_drops_silence():
+    segmenter = StreamSegmenter(min_segment_sec=1.0, max_segment_sec=2.0, min_silence_sec=0.3)
+    segments = feed_in_chunks(segmenter, pcm16(tone(5.0)))
+    assert [round(len(s) / SAMPLE_RATE, 1) for s in segments] == [2.0, 2.0]
+    assert sum(len(s) for s in segments + segmenter.flush()) == SAMPLE_RATE * 5
+
+    quiet = StreamSegmenter(min_segment_sec=1.0, max_segment_sec=2.0, min_silence_sec=0.3)
+    assert feed_in_chunks(quiet, pcm16(np.zeros(SAMPLE_RATE * 3, dtype=np.float32))) == []
+    assert quiet.flush() == []
+
+
+def test_segmenter_reads_wav_header_and_resamples():
+    # 8kHz 스테레오 WAV 스트림, 헤더가 여러 청크에 나뉘어 들어옴
+    mono = tone(1.0)[::2]
+    stereo = np.stack([mono, mono], axis=1).reshape(-1)
+    data = wav_bytes(pcm16(stereo), 8000, channels=2)
+    segmenter = StreamSegmenter(wav_header=True, min_segment_sec=0.5, max_segment_sec=10.0)
+    assert feed_in_chunks(segmenter, data, size=7) == []
+    assert (segmenter.sample_rate, segmenter.channels) == (8000, 2)
+    segments = segmenter.flush()
+    assert len(segments) == 1
+    assert len(segments[0]) == SAMPLE_RATE
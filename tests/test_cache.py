@@ -0,0 +1,77 @@
+import struct
+import threading
+
+from utils.cache import TieredCache
+from utils.result_cache import ResultCache
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    path = str(tmp_path / 'cache' / 'tiered.db')
+    cache = TieredCache(1024 * 1024, path, table='scores',
+                        encode=lambda score: struct.pack('<d', score), decode=lambda value: struct.unpack('<d', value)[0])
+    cache.set_many({'a': 0.5, 'b': 0.25})
+    cache.close()
+
+    cache = TieredCache(1024 * 1024, path, table='scores',
+                        encode=lambda score: struct.pack('<d', score), decode=lambda value: struct.unpack('<d', value)[0])
+    assert cache.get_many(['a', 'b', 'c']) == {'a': 0.5, 'b': 0.25}
+    assert cache.stats()['disk_hits'] == 2
+    # 디스크에서 읽은 값은 메모리 계층으로 올라가므로 다시 디스크를 읽지 않음
+    assert cache.get('a') == 0.5
+    assert cache.stats()['disk_hits'] == 2
+    cache.close()
+
+
+def test_tiered_cache_memory_only():
+    cache = TieredCache(1024 * 1024)
+    cache.set('key', {'value': [1, 2]})
+    assert cache.get('key') == {'value': [1, 2]}
+    assert cache.get('missing') is None
+    cache.close()
+
+
+def test_result_cache_coalesces_concurrent_requests():
+    cache = ResultCache(path=None)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'value': len(calls)}
+
+    owner = threading.Thread(target=cache.get_or_compute, args=('key', compute))
+    owner.start()
+    started.wait(5)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_compute('key', compute)))
+    waiter.start()
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+    assert results == [{'value': 1}]
+    assert len(calls) == 1
+    assert cache.stats()['coalesced'] == 1
+
+
+def test_result_cache_refresh_does_not_join_stale_computation():
+    cache = ResultCache(path=None)
+    started, release = threading.Event(), threading.Event()
+
+    def stale():
+        started.set()
+        release.wait(5)
+        return 'stale'
+
+    owner = threading.Thread(target=cache.get_or_compute, args=('key', stale))
+    owner.start()
+    started.wait(5)
+    # 이전 계산이 끝나지 않았어도 refresh 요청은 새로 계산한 결과를 받음
+    assert cache.get_or_compute('key', lambda: 'fresh', refresh=True) == 'fresh'
+    release.set()
+    owner.join(5)
+    # 늦게 끝난 이전 계산이 새 결과를 덮어쓰지 않음
+    assert cache.get('key') == 'fresh'
+    assert cache.stats()['coalesced'] == 0
+    assert cache.stats()['inflight'] == 0
@@ -0,0 +1,77 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from AnalyzeMeeting.embedding_backend import SentenceTransformerEmbeddings, make_embedding_model
+from utils.embedding_cache import model_name_of
+
+
+class FakeSentenceTransformer():
+    """텍스트 길이를 첫 번째 값으로 갖는 정규화 벡터를 돌려주는 가짜 모델입니다."""
+    def __init__(self, model_name, device=None):
+        self.device = device or 'cpu'
+        self.encoded = []
+        self.pools = []
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, batch_size, convert_to_numpy, normalize_embeddings, show_progress_bar):
+        self.encoded.append(list(texts))
+        vectors = np.array([[len(text), 1.0] for text in texts], dtype=np.float64)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def start_multi_process_pool(self, target_devices=None):
+        pool = {'devices': target_devices, 'stopped': False}
+        self.pools.append(pool)
+        return pool
+
+    def encode_multi_process(self, texts, pool, batch_size, normalize_embeddings):
+        pool['texts'] = list(texts)
+        return self.encode(texts, batch_size, True, normalize_embeddings, False)
+
+    def stop_multi_process_pool(self, pool):
+        pool['stopped'] = True
+
+
+@pytest.fixture
+def fake_st(monkeypatch):
+    module = types.ModuleType('sentence_transformers')
+    module.SentenceTransformer = FakeSentenceTransformer
+    monkeypatch.setitem(sys.modules, 'sentence_transformers', module)
+
+
+def test_embed_documents_sorts_by_length_and_restores_order(fake_st):
+    embeddings = SentenceTransformerEmbeddings('fake-model', device='cpu')
+    texts = ['회의록 요약', '네', '다음 안건으로 넘어가겠습니다']
+    vectors = embeddings.embed_documents(texts)
+    # 길이순으로 인코딩
+    assert embeddings.st_model.encoded == [['네', '회의록 요약', '다음 안건으로 넘어가겠습니다']]
+    assert vectors.dtype == np.float32
+    expected = np.array([[len(text), 1.0] for text in texts])
+    assert np.allclose(vectors, expected / np.linalg.norm(expected, axis=1, keepdims=True))
+    assert np.allclose(embeddings.embed_query('네'), vectors[1])
+    assert embeddings.embed_documents([]).shape == (0, 2)
+
+
+def test_large_batches_use_one_process_pool(fake_st):
+    embeddings = SentenceTransformerEmbeddings('fake-model', device='cpu', processes=2, process_min_texts=3)
+    embeddings.embed_documents(['가', '나'])
+    assert embeddings.st_model.pools == []
+    embeddings.embed_documents(['가나다', '가', '가나'])
+    embeddings.embed_documents(['가', '나', '다'])
+    pools = embeddings.st_model.pools
+    assert len(pools) == 1
+    assert pools[0]['devices'] == ['cpu', 'cpu']
+    embeddings.close()
+    assert pools[0]['stopped']
+
+
+def test_cache_key_and_unknown_backend(fake_st):
+    embeddings = make_embedding_model('sentence-transformers', 'fake-model')
+    # 같은 이름의 다른 백엔드 모델과 캐시가 섞이지 않도록 접두사를 붙임
+    assert model_name_of(embeddings) == 'st:fake-model'
+    with pytest.raises(ValueError):
+        make_embedding_model('unknown')
@@ -0,0 +1,86 @@
+import multiprocessing
+
+import numpy as np
+
+from utils.embedding_cache import EmbeddingCache, embed_texts, text_key
+
+
+def vectors_for(ids, dim=4):
+    # 행마다 id가 들어 있어 어긋난 행을 읽으면 바로 드러남
+    return np.repeat(np.asarray(ids, dtype=np.float32)[:, None], dim, axis=1)
+
+
+class FakeEmbeddings():
+    model = 'fake-embedding'
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return vectors_for([len(text) for text in texts])
+
+
+def test_reopen_keeps_rows(tmp_path):
+    cache = EmbeddingCache('m', root=str(tmp_path))
+    cache.add(['a', 'b', 'c'], vectors_for([1, 2, 3]))
+
+    reopened = EmbeddingCache('m', root=str(tmp_path))
+    rows = reopened.lookup(['c', 'x', 'a'])
+    assert rows.tolist() == [2, -1, 0]
+    assert reopened.vectors(rows[[0, 2]])[:, 0].tolist() == [3.0, 1.0]
+
+
+def test_partial_row_and_index_line_are_truncated(tmp_path):
+    cache = EmbeddingCache('m', root=str(tmp_path))
+    cache.add(['a', 'b'], vectors_for([1, 2]))
+    # 기록 도중 종료된 상황: 벡터 반 행, 줄바꿈 없는 인덱스 줄
+    with open(cache.vectors_path, 'ab') as f:
+        f.write(b'\0' * 6)
+    with open(cache.index_path, 'a') as f:
+        f.write('zz\t')
+
+    reopened = EmbeddingCache('m', root=str(tmp_path))
+    rows = reopened.add(['c'], vectors_for([3]))
+    assert rows.tolist() == [2]
+
+    again = EmbeddingCache('m', root=str(tmp_path))
+    rows = again.lookup(['a', 'b', 'c'])
+    assert again.vectors(rows)[:, 0].tolist() == [1.0, 2.0, 3.0]
+    assert 'zz' not in again.index
+
+
+def _add_many(root, offset):
+    cache = EmbeddingCache('m', root=root)
+    for i in range(offset, offset + 40, 2):
+        cache.add([f'k{i}', f'k{i + 1}'], vectors_for([i, i + 1]))
+
+
+def test_processes_sharing_a_directory_keep_rows_aligned(tmp_path):
+    ctx = multiprocessing.get_context('fork')
+    workers = [ctx.Process(target=_add_many, args=(str(tmp_path), offset)) for offset in (0, 1000, 2000)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    cache = EmbeddingCache('m', root=str(tmp_path))
+    ids = [i for offset in (0, 1000, 2000) for i in range(offset, offset + 40)]
+    rows = cache.lookup([f'k{i}' for i in ids])
+    assert (rows >= 0).all()
+    assert len(set(rows.tolist())) == len(ids)
+    assert cache.vectors(rows)[:, 0].tolist() == [float(i) for i in ids]
+
+
+def test_embed_texts_only_sends_unseen_texts(tmp_path):
+    cache = EmbeddingCache('fake-embedding', root=str(tmp_path))
+    model = FakeEmbeddings()
+    first = embed_texts(model, ['aa', 'b', 'aa'], cache=cache)
+    assert first[:, 0].tolist() == [2.0, 1.0, 2.0]
+    assert sorted(model.calls[0]) == ['aa', 'b']
+
+    second = embed_texts(model, ['b', 'ccc'], cache=cache)
+    assert second[:, 0].tolist() == [1.0, 3.0]
+    assert model.calls[1] == ['ccc']
+    assert cache.lookup([text_key('ccc')]).tolist() == [2]
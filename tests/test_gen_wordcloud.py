@@ -0,0 +1,63 @@
+from AnalyzeMeeting.gen_wordcloud import WordcloudCache, render_wordcloud, top_frequencies
+
+TOKENS = ['회의'] * 40 + ['일정'] * 20 + ['예산'] * 10 + ['보고'] * 5
+
+
+class CountingRun():
+    """프로세스 풀 대신 바로 실행하면서 그린 횟수를 셉니다."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, fn, frequencies, *args):
+        self.calls.append(frequencies)
+        return f"image-{len(self.calls)}".encode()
+
+
+def key_of(cache: WordcloudCache, tokens, width=800, height=400, mask_image_path=None, image_format='png') -> str:
+    return cache.make_key(top_frequencies(tokens, cache.top_n), width, height, mask_image_path, image_format)
+
+
+def test_make_key_ignores_tail_beyond_top_n():
+    cache = WordcloudCache(top_n=3)
+    # 상위 3개 밖의 꼬리 단어는 그림에 들어가지 않으므로 키도 같음
+    assert key_of(cache, TOKENS) == key_of(cache, TOKENS + ['출시', '광고'])
+    assert key_of(cache, TOKENS) != key_of(cache, TOKENS + ['출시'] * 30)
+
+
+def test_make_key_reuses_scaled_frequencies():
+    cache = WordcloudCache(top_n=10, precision=2)
+    # 모든 빈도가 같은 비율로 늘면 상대 빈도가 같아 같은 이미지를 재사용
+    assert key_of(cache, TOKENS) == key_of(cache, TOKENS * 3)
+    assert key_of(cache, TOKENS) == key_of(cache, list(reversed(TOKENS)))
+    # 반올림 자릿수 아래의 차이는 무시하고, 그 이상은 구분
+    assert key_of(cache, TOKENS * 100) == key_of(cache, TOKENS * 100 + ['예산'])
+    assert key_of(cache, TOKENS) != key_of(cache, TOKENS + ['보고'] * 10)
+
+
+def test_make_key_separates_size_mask_and_format():
+    cache = WordcloudCache()
+    keys = {
+        key_of(cache, TOKENS),
+        key_of(cache, TOKENS, width=400),
+        key_of(cache, TOKENS, mask_image_path='circle.png'),
+        key_of(cache, TOKENS, image_format='webp'),
+    }
+    assert len(keys) == 4
+
+
+def test_render_reuses_cached_image():
+    cache = WordcloudCache(top_n=3)
+    run = CountingRun()
+    first = cache.render(TOKENS, run=run)
+    assert cache.render(TOKENS * 2 + ['출시'], run=run) == first
+    assert len(run.calls) == 1
+    # 그릴 때는 상위 top_n개 빈도표만 넘김
+    assert run.calls[0] == [('회의', 40), ('일정', 20), ('예산', 10)]
+    assert cache.render(TOKENS, width=400, run=run) != first
+    assert len(run.calls) == 2
+
+
+def test_render_wordcloud_returns_image_bytes():
+    # 기본 폰트(wordcloud 내장)로 영문 단어를 그림
+    image = render_wordcloud([('meeting', 4), ('budget', 2)], width=120, height=60, image_format='png', font_path=None)
+    assert image.startswith(b'\x89PNG')
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+
+from AnalyzeMeeting.lda_vis import js_pcoa, prepare_lda_vis
+from AnalyzeMeeting.topic_model import make_lda
+
+WORDS = ['회의', '일정', '예산', '보고', '자료', '발표', '디자인', '색상', '고객', '출시', '광고', '매출']
+
+
+def fitted(n_components: int = 3, n_empty: int = 5):
+    rng = np.random.default_rng(0)
+    groups = [WORDS[0:4], WORDS[4:8], WORDS[8:12]]
+    docs = [' '.join(rng.choice(groups[i % 3], size=5)) for i in range(60)] + [''] * n_empty
+    count_vec = CountVectorizer()
+    feat_vec = count_vec.fit_transform(docs)
+    return make_lda(n_components).fit(feat_vec), feat_vec, count_vec
+
+
+def assert_same_up_to_sign(ours, ref):
+    # PCoA 축은 부호가 정해지지 않음
+    ours, ref = np.asarray(ours), np.asarray(ref)
+    assert np.allclose(ours, ref, atol=1e-6) or np.allclose(ours, -ref, atol=1e-6)
+
+
+def test_prepare_lda_vis_structure():
+    lda, feat_vec, count_vec = fitted()
+    vis = prepare_lda_vis(lda, feat_vec, count_vec.get_feature_names_out(), R=5)
+    mds = vis['mdsDat']
+    assert mds['topics'] == [1, 2, 3]
+    assert sum(mds['Freq']) == pytest.approx(100)
+    # 토픽은 비중 순으로 정렬
+    assert mds['Freq'] == sorted(mds['Freq'], reverse=True)
+    assert sorted(vis['topic.order']) == [1, 2, 3]
+
+    tinfo = vis['tinfo']
+    assert tinfo['Category'][:5] == ['Default'] * 5
+    assert len(set(len(column) for column in tinfo.values())) == 1
+    # 빈 문서는 건너뛰므로 결과에 영향이 없음
+    rows = np.flatnonzero(feat_vec.getnnz(axis=1))
+    assert prepare_lda_vis(lda, feat_vec[rows], count_vec.get_feature_names_out(), R=5) == vis
+    assert set(vis['token.table']['Term']) <= set(tinfo['Term'])
+    assert vis['R'] == 5
+
+
+def test_js_pcoa_single_topic_has_two_axes():
+    coords = js_pcoa(np.array([[0.5, 0.5]]))
+    assert coords.shape == (1, 2)
+    assert np.allclose(coords, 0)
+
+
+@pytest.mark.filterwarnings('ignore')
+def test_prepare_lda_vis_matches_pyldavis():
+    pytest.importorskip('pyLDAvis.lda_model')
+    import pyLDAvis.lda_model
+
+    lda, feat_vec, count_vec = fitted()
+    ours = prepare_lda_vis(lda, feat_vec, count_vec.get_feature_names_out(), R=10)
+    ref = pyLDAvis.lda_model.prepare(lda, feat_vec, count_vec, R=10, mds='pcoa').to_dict()
+
+    assert ours['topic.order'] == list(ref['topic.order'])
+    assert_same_up_to_sign(ours['mdsDat']['x'], ref['mdsDat']['x'])
+    assert_same_up_to_sign(ours['mdsDat']['y'], ref['mdsDat']['y'])
+    assert np.allclose(ours['mdsDat']['Freq'], ref['mdsDat']['Freq'])
+    for table in ('tinfo', 'token.table'):
+        for column, values in ours[table].items():
+            if isinstance(values[0], str):
+                assert values == list(ref[table][column]), (table, column)
+            else:
+                assert np.allclose(values, ref[table][column]), (table, column)
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip('konlpy')
+
+from AnalyzeMeeting.make_script import MeetingScript  # noqa: E402
+
+
+@pytest.fixture
+def meeting_script():
+    meeting_script = MeetingScript(1, 2)
+    meeting_script.add_question('q1', '색상은 어떤가요?')
+    meeting_script.add_question('q2', '가격은 어떤가요?')
+    # tokens를 넘겨 형태소 분석 없이 추가
+    meeting_script.add_answer('q1', '분홍색이 좋아요', 10, tokens=['분홍색', '좋아요'])
+    meeting_script.add_answer('q2', '비싸요', 10, tokens=['비싸요'])
+    meeting_script.add_answer('q1', '초록색이 좋아요', 11, tokens=['초록색', '좋아요'])
+    return meeting_script
+
+
+def test_answers_are_indexed_by_question(meeting_script):
+    assert len(meeting_script) == 3
+    assert meeting_script.question_rows == {'q1': [0, 2], 'q2': [1]}
+    assert meeting_script.get_answer_list('q1') == ['분홍색이 좋아요', '초록색이 좋아요']
+    answers = meeting_script.get_answers('q1')
+    assert answers.index.tolist() == [0, 2]
+    assert answers['user_id'].tolist() == [10, 11]
+    assert meeting_script.get_tokens('q2')['tokens'].tolist() == [['비싸요']]
+    assert meeting_script.get_answer_list('missing') == []
+
+
+def test_version_counts_questions_and_answers(meeting_script):
+    assert meeting_script.version == 5
+    # 이미 있는 질문은 다시 추가하지 않음
+    meeting_script.add_question('q1', '다른 질문')
+    assert meeting_script.version == 5
+    assert meeting_script.get_question_text('q1') == '색상은 어떤가요?'
+
+
+def test_listeners_receive_each_answer(meeting_script):
+    seen = []
+    meeting_script.add_listener(lambda script, question_id, tokens: seen.append((question_id, tokens)))
+    meeting_script.add_answer('q2', '적당해요', 12, tokens=['적당해요'])
+    assert seen == [('q2', ['적당해요'])]
+
+
+def test_script_and_dataframe_views(meeting_script):
+    assert meeting_script.to_script_format() == [
+        {'question': '색상은 어떤가요?', 'answer': ['분홍색이 좋아요', '초록색이 좋아요']},
+        {'question': '가격은 어떤가요?', 'answer': ['비싸요']},
+    ]
+    assert meeting_script.get_all_tokens() == ['분홍색', '좋아요', '비싸요', '초록색', '좋아요']
+    all_data = meeting_script.get_all_data()
+    assert all_data['question_text'].tolist() == ['색상은 어떤가요?', '가격은 어떤가요?', '색상은 어떤가요?']
+    assert set(all_data['corp_id']) == {1} and set(all_data['meeting_id']) == {2}
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+pytest.importorskip('konlpy')
+
+import utils.meeting_store as meeting_store  # noqa: E402
+from utils.meeting_store import MeetingRegistry, MeetingStore  # noqa: E402
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    # 형태소 분석기 대신 공백 분리 사용
+    monkeypatch.setattr(meeting_store, 'tokenize_answers', lambda answers: [answer.split() for answer in answers])
+    store = MeetingStore(str(tmp_path / 'meetings.db'))
+    yield MeetingRegistry(store)
+    store.close()
+
+
+def test_concurrent_add_answer_keeps_columns_aligned(registry):
+    registry.add_question(1, 1, 'q1', '질문 1')
+    registry.add_question(1, 1, 'q2', '질문 2')
+    seen = []
+    registry.get(1, 1).add_listener(lambda meeting_script, question_id, tokens: seen.append(question_id))
+
+    def write(worker):
+        for i in range(200):
+            question_id = 'q1' if (worker + i) % 2 else 'q2'
+            registry.add_answer(1, 1, question_id, f'{question_id} 답변 {worker} {i}', worker)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    meeting_script = registry.get(1, 1)
+    assert len(meeting_script) == 1600
+    assert len(seen) == 1600
+    assert meeting_script.version == 2 + 1600
+    for column in meeting_script.columns.values():
+        assert len(column) == 1600
+    for question_id, rows in meeting_script.question_rows.items():
+        assert all(meeting_script.columns['question_id'][row] == question_id for row in rows)
+        assert all(meeting_script.columns['answer'][row].startswith(question_id) for row in rows)
+
+
+def test_restored_meeting_matches_memory(registry, tmp_path):
+    registry.add_question(1, 2, 'q1', '질문 1')
+    for i in range(5):
+        registry.add_answer(1, 2, 'q1', f'답변 {i}', i)
+    restored = registry.store.load_meeting(1, 2)
+    assert restored.columns == registry.get(1, 2).columns
+
+
+def test_loading_one_meeting_does_not_block_others(registry, tmp_path):
+    for meeting_id in (1, 2):
+        registry.add_question(1, meeting_id, 'q1', '질문 1')
+        registry.add_answer(1, meeting_id, 'q1', f'{meeting_id}번 회의 답변', 1)
+    # 새로 시작한 서버처럼 저장소에서 다시 불러오게 함
+    fresh = MeetingRegistry(registry.store)
+    load_meeting = fresh.store.load_meeting
+    loading, release, loads = threading.Event(), threading.Event(), []
+
+    def slow_load(corp_id, meeting_id):
+        loads.append(meeting_id)
+        if meeting_id == 1:
+            loading.set()
+            release.wait(5)
+        return load_meeting(corp_id, meeting_id)
+
+    fresh.store.load_meeting = slow_load
+    loaded = []
+    loaders = [threading.Thread(target=lambda: loaded.append(fresh.get(1, 1))) for _ in range(2)]
+    for loader in loaders:
+        loader.start()
+    assert loading.wait(5)
+    other = []
+    reader = threading.Thread(target=lambda: other.append(fresh.get(1, 2)))
+    reader.start()
+    reader.join(1)
+    assert len(other) == 1
+    release.set()
+    for loader in loaders:
+        loader.join(5)
+    # 같은 회의는 한 번만 불러와 같은 객체를 공유
+    assert loads.count(1) == 1
+    assert loaded[0] is loaded[1]
+    with pytest.raises(KeyError):
+        fresh.get(1, 3)
+    assert not fresh._loading
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from utils.model_registry import ModelRegistry
+
+
+class CountingLoader():
+    """호출될 때마다 새 객체를 만드는 로더. release가 설정될 때까지 로드가 끝나지 않습니다."""
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        self.unloaded = []
+
+    def load(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return object()
+
+    def unload(self, instance):
+        self.unloaded.append(instance)
+
+
+def test_concurrent_get_loads_once():
+    registry = ModelRegistry()
+    loader = CountingLoader()
+    loader.release.clear()
+    registry.register('sentiment', loader.load)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('sentiment'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    assert loader.started.wait(5)
+    loader.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert loader.calls == 1
+    assert len(results) == 8 and all(result is results[0] for result in results)
+    assert registry.stats()['sentiment']['loads'] == 1
+
+
+def test_unload_idle_skips_models_in_use_and_reloads_on_demand():
+    registry = ModelRegistry(idle_timeout=0.05)
+    loader = CountingLoader()
+    registry.register('stt', loader.load, loader.unload)
+    registry.register('pinned', CountingLoader().load, idle_timeout=0)
+    first = registry.get('stt')
+    registry.get('pinned')
+    time.sleep(0.1)
+
+    # 사용 중인 모델은 유휴 시간이 지나도 내리지 않음
+    with registry.use('stt') as model:
+        assert model is first
+        time.sleep(0.1)
+        registry.unload_idle()
+        assert registry.is_loaded('stt')
+
+    registry.unload_idle()
+    # 방금 사용이 끝났으므로 아직 유휴 상태가 아님
+    assert registry.is_loaded('stt')
+    time.sleep(0.1)
+    registry.unload_idle()
+    assert not registry.is_loaded('stt')
+    assert loader.unloaded == [first]
+    # idle_timeout=0인 모델은 언로드하지 않음
+    assert registry.is_loaded('pinned')
+
+    assert registry.get('stt') is not first
+    assert loader.calls == 2
+
+
+def test_reaper_unloads_idle_models_in_background():
+    registry = ModelRegistry(idle_timeout=0.02)
+    loader = CountingLoader()
+    registry.register('stt', loader.load, loader.unload)
+    registry.get('stt')
+    registry.start_reaper(interval=0.01)
+    try:
+        deadline = time.time() + 5
+        while registry.is_loaded('stt') and time.time() < deadline:
+            time.sleep(0.01)
+        assert not registry.is_loaded('stt')
+        assert len(loader.unloaded) == 1
+    finally:
+        registry.shutdown()
+    assert registry._reaper is None
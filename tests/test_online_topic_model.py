@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from AnalyzeMeeting.online_topic_model import ONLINE_TOPIC_MIN_DOCS, OnlineTopicRegistry
+from AnalyzeMeeting.topic_model import TOPIC_CANDIDATES
+
+WORDS = ['회의', '일정', '진행', '방식', '개선', '의견', '예산', '보고', '자료', '준비', '발표', '시간']
+
+
+class FakeMeeting():
+    def __init__(self, corp_id, meeting_id):
+        self.corp_id = corp_id
+        self.meeting_id = meeting_id
+        self.columns = {'tokens': []}
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.columns['tokens'])
+
+    def get_all_tokens(self):
+        return [token for tokens in self.columns['tokens'] for token in tokens]
+
+
+class FakeMeetings():
+    def __init__(self):
+        self.meetings = {}
+
+    def add_listener(self, listener):
+        pass
+
+    def add(self, corp_id, meeting_id, n_answers):
+        meeting = self.meetings.setdefault((corp_id, meeting_id), FakeMeeting(corp_id, meeting_id))
+        for i in range(n_answers):
+            meeting.columns['tokens'].append([WORDS[(i + j) % len(WORDS)] for j in range(6)])
+
+    def get(self, corp_id, meeting_id):
+        return self.meetings[(corp_id, meeting_id)]
+
+
+def test_small_meeting_fits_on_request():
+    meetings = FakeMeetings()
+    meetings.add(1, 1, 8)
+    registry = OnlineTopicRegistry(meetings)
+    result = registry.topic_json(1, 1)
+    model = registry.models[(1, 1)]
+    assert model.fitted
+    # 토픽 수는 고정값이 아니라 후보 선택으로 정함
+    assert model.n_components in TOPIC_CANDIDATES
+    assert len(result['mdsDat']['topics']) == model.n_components
+
+    # 학습 전 경로에서도 refit 요청을 무시하지 않음
+    registry.topic_json(1, 1, refit=True)
+    assert model.stats()['refits'] == 2
+
+
+def test_topics_keep_meaning_when_meeting_reaches_min_docs():
+    meetings = FakeMeetings()
+    meetings.add(1, 1, ONLINE_TOPIC_MIN_DOCS - 2)
+    registry = OnlineTopicRegistry(meetings)
+    before = registry.topic_json(1, 1)
+    model = registry.models[(1, 1)]
+    n_components, terms = model.n_components, set(before['tinfo']['Term'])
+
+    meetings.add(1, 1, 4)
+    after = registry.topic_json(1, 1)
+    # 임계값을 넘어도 다시 학습하지 않고 같은 모델에 새 답변만 반영
+    stats = model.stats()
+    assert (stats['docs'], stats['refits'], stats['updates']) == (ONLINE_TOPIC_MIN_DOCS + 2, 1, 1)
+    assert len(after['mdsDat']['topics']) == n_components
+    assert terms <= set(model.terms)
+
+
+def test_background_sync_fits_once_enough_answers():
+    meetings = FakeMeetings()
+    meetings.add(1, 1, ONLINE_TOPIC_MIN_DOCS - 1)
+    registry = OnlineTopicRegistry(meetings)
+    # 답변이 추가될 때 백그라운드 작업이 하는 반영
+    assert not registry._sync(1, 1).fitted
+    meetings.add(1, 1, 1)
+    assert registry._sync(1, 1).fitted
+
+
+def test_registry_evicts_least_recently_used_and_idle_models():
+    meetings = FakeMeetings()
+    for meeting_id in range(3):
+        meetings.add(1, meeting_id, 12)
+    registry = OnlineTopicRegistry(meetings, max_meetings=2, idle_ttl=3600)
+    for meeting_id in range(3):
+        registry.topic_json(1, meeting_id)
+    assert list(registry.models) == [(1, 1), (1, 2)]
+
+    registry.idle_ttl = 0
+    registry.evict_expired()
+    assert not registry.models
+    assert registry.stats()['evictions'] == 3
+    # 내린 회의도 다시 요청하면 처음부터 학습
+    assert registry.topic_json(1, 0)['mdsDat']['topics']
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from utils.pipeline import CPU, FAILED, IO, OK, PROCESS, SKIPPED, TIMEOUT, Stage, StageExecutor
+
+
+class FakeContext():
+    def __init__(self):
+        self.progress = []
+
+    def set_progress(self, value):
+        self.progress.append(value)
+
+
+@pytest.fixture
+def executor():
+    executor = StageExecutor(io_workers=4, cpu_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_independent_stages_run_concurrently_and_pass_results(executor):
+    # 두 단계가 동시에 실행되어야만 barrier를 통과함
+    barrier = threading.Barrier(2, timeout=5)
+
+    def tokens():
+        barrier.wait()
+        return ['회의', '일정']
+
+    def summary():
+        barrier.wait()
+        return '요약'
+
+    def report(prefix, tokens, summary):
+        return f"{prefix}:{summary}:{len(tokens)}"
+
+    ctx = FakeContext()
+    result = executor.run([
+        Stage('report', report, args=('결과',), deps=('tokens', 'summary'), kind=CPU),
+        Stage('tokens', tokens, kind=CPU),
+        Stage('summary', summary),
+    ], ctx)
+    assert result.ok
+    assert result.results['report'] == '결과:요약:2'
+    assert {name: timing['status'] for name, timing in result.timings.items()} == {'tokens': OK, 'summary': OK, 'report': OK}
+    assert ctx.progress[-1] == 1.0
+
+
+def test_timeout_and_failure_skip_only_dependents(executor):
+    release = threading.Event()
+
+    def fail():
+        raise RuntimeError("요약 서버 오류")
+
+    try:
+        result = executor.run([
+            Stage('slow', lambda: release.wait(5), timeout=0.1),
+            Stage('after_slow', lambda slow: slow, deps=('slow',)),
+            Stage('broken', fail),
+            Stage('after_broken', lambda broken: broken, deps=('broken',)),
+            Stage('after_after', lambda after_broken: after_broken, deps=('after_broken',)),
+            Stage('wordcloud', lambda: 'png'),
+        ])
+    finally:
+        release.set()
+
+    # 실패와 무관한 단계의 결과는 그대로 반환
+    assert not result.ok
+    assert result.results == {'wordcloud': 'png'}
+    statuses = {name: timing['status'] for name, timing in result.timings.items()}
+    assert statuses == {'slow': TIMEOUT, 'after_slow': SKIPPED, 'broken': FAILED, 'after_broken': SKIPPED,
+                        'after_after': SKIPPED, 'wordcloud': OK}
+    assert result.errors['broken'] == "RuntimeError: 요약 서버 오류"
+    assert 'slow' in result.errors['after_slow']
+    assert result.wall_sec < 2
+
+
+def test_missing_and_cyclic_dependencies(executor):
+    with pytest.raises(ValueError):
+        executor.run([Stage('a', lambda b: b, deps=('b',))])
+
+    result = executor.run([
+        Stage('a', lambda b: b, deps=('b',)),
+        Stage('b', lambda a: a, deps=('a',)),
+        Stage('c', lambda: 1),
+    ])
+    assert result.results == {'c': 1}
+    assert result.timings['a']['status'] == result.timings['b']['status'] == SKIPPED
+
+
+def test_process_stage_falls_back_to_cpu_pool(executor):
+    result = executor.run([Stage('name', lambda: threading.current_thread().name, kind=PROCESS)])
+    assert result.results['name'].startswith('stage-cpu')
+
+    borrowed = StageExecutor(io_workers=1, cpu_workers=1, process_executor=lambda: executor.executors[IO])
+    try:
+        result = borrowed.run([Stage('name', lambda: threading.current_thread().name, kind=PROCESS)])
+        assert result.results['name'].startswith('stage-io')
+    finally:
+        borrowed.shutdown()
@@ -0,0 +1,73 @@
+import glob
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from AnalyzeMeeting.projector import _masked_crc32c, export_projector
+
+
+def unmask(masked: int) -> int:
+    value = (masked - 0xA282EAD8) & 0xFFFFFFFF
+    return ((value << 15) | (value >> 17)) & 0xFFFFFFFF
+
+
+def read_records(path: str) -> list:
+    """TFRecord 파일을 읽으며 길이/본문 CRC를 검증합니다."""
+    records = []
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        length_bytes = data[offset:offset + 8]
+        (length,) = struct.unpack('<Q', length_bytes)
+        assert struct.unpack('<I', data[offset + 8:offset + 12])[0] == _masked_crc32c(length_bytes)
+        body = data[offset + 12:offset + 12 + length]
+        assert struct.unpack('<I', data[offset + 12 + length:offset + 16 + length])[0] == _masked_crc32c(body)
+        records.append(body)
+        offset += 16 + length
+    assert offset == len(data)
+    return records
+
+
+def test_crc32c_matches_reference_value():
+    # CRC-32C(Castagnoli) 표준 검사값
+    assert unmask(_masked_crc32c(b'123456789')) == 0xE3069283
+
+
+def test_export_projector_round_trip(tmp_path):
+    log_dir = str(tmp_path / 'run')
+    vectors = np.arange(15, dtype=np.float64).reshape(5, 3) / 7
+    labels = ['회의', '요약\t결과', '다음\n안건', '', '끝']
+    export_projector(log_dir, vectors, labels, tensor_name='answers', chunk_rows=2)
+
+    tensor = np.fromfile(os.path.join(log_dir, 'tensors.bytes'), dtype='<f4').reshape(5, 3)
+    assert np.allclose(tensor, vectors.astype(np.float32))
+    with open(os.path.join(log_dir, 'metadata.tsv'), encoding='utf-8') as f:
+        assert f.read().split('\n') == ['회의', '요약 결과', '다음 안건', ' ', '끝', '']
+    with open(os.path.join(log_dir, 'projector_config.pbtxt'), encoding='utf-8') as f:
+        config = f.read()
+    assert 'tensor_name: "answers"' in config
+    assert 'tensor_path: "tensors.bytes"' in config
+    assert 'tensor_shape: 5\n  tensor_shape: 3' in config
+
+    events = glob.glob(os.path.join(log_dir, 'events.out.tfevents.*'))
+    assert len(events) == 1
+    (event,) = read_records(events[0])
+    # Event proto: wall_time(1, double), file_version(3, string)
+    assert event[0] == 0x09 and event[9] == 0x1a
+    assert struct.unpack('<d', event[1:9])[0] > 0
+    assert event[11:11 + event[10]] == b'brain.Event:2'
+
+    # 다시 내보내도 이벤트 파일은 하나만 유지
+    export_projector(log_dir, vectors, labels, tensor_format='tsv', chunk_rows=2)
+    assert glob.glob(os.path.join(log_dir, 'events.out.tfevents.*')) == events
+    assert np.allclose(np.loadtxt(os.path.join(log_dir, 'tensors.tsv'), delimiter='\t'), vectors, atol=1e-5)
+
+
+def test_export_projector_rejects_mismatched_input(tmp_path):
+    with pytest.raises(ValueError):
+        export_projector(str(tmp_path), np.zeros((2, 3)), ['하나'])
+    with pytest.raises(ValueError):
+        export_projector(str(tmp_path), np.zeros((1, 3)), ['하나'], tensor_format='npy')
@@ -0,0 +1,100 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import AnalyzeMeeting.sentiment_backend as sentiment_backend
+from AnalyzeMeeting.sentiment_backend import OnnxParityError, _atomic_output, check_parity, ensure_onnx_model
+
+
+class FakeTokenizer():
+    def __call__(self, sentences, **kwargs):
+        return {'input_ids': np.arange(len(sentences))[:, None]}
+
+
+class FakeBackend():
+    """문장 번호마다 정해진 확률을 돌려주는 가짜 백엔드"""
+    def __init__(self, name, probabilities):
+        self.name = name
+        self.probabilities = np.asarray(probabilities, dtype=np.float32)
+
+    def predict_proba(self, encoded):
+        return self.probabilities[encoded['input_ids'][:, 0]]
+
+
+REFERENCE = [[0.9, 0.1], [0.2, 0.8], [0.6, 0.4]]
+
+
+def test_atomic_output_replaces_target(tmp_path):
+    path = str(tmp_path / 'model.onnx')
+    with _atomic_output(path) as first, _atomic_output(path) as second:
+        # 동시에 변환하는 워커마다 다른 임시 파일을 사용
+        assert first != second
+        assert os.path.dirname(first) == str(tmp_path)
+        for tmp, content in ((first, 'first'), (second, 'second')):
+            with open(tmp, 'w') as f:
+                f.write(content)
+    with open(path) as f:
+        assert f.read() == 'first'
+    assert os.listdir(tmp_path) == ['model.onnx']
+
+
+def test_atomic_output_removes_tmp_on_failure(tmp_path):
+    path = str(tmp_path / 'model.onnx')
+    with pytest.raises(RuntimeError):
+        with _atomic_output(path) as tmp:
+            with open(tmp, 'w') as f:
+                f.write('partial')
+            raise RuntimeError('export failed')
+    assert os.listdir(tmp_path) == []
+
+
+def test_check_parity_passes_within_tolerance():
+    candidate = np.asarray(REFERENCE) + [[0.0005, -0.0005], [0, 0], [-0.0002, 0.0002]]
+    parity = check_parity(FakeBackend('torch', REFERENCE), FakeBackend('onnx', candidate), FakeTokenizer(),
+                          sentences=['a', 'b', 'c'], atol=1e-3)
+    assert parity['passed']
+    assert parity['backend'] == 'onnx'
+    assert parity['label_agreement'] == 1.0
+    assert parity['max_abs_diff'] == pytest.approx(5e-4, abs=1e-6)
+
+
+def test_check_parity_fails_and_reports_label_flips():
+    candidate = [[0.9, 0.1], [0.2, 0.8], [0.45, 0.55]]
+    parity = check_parity(FakeBackend('torch', REFERENCE), FakeBackend('onnx-int8', candidate), FakeTokenizer(),
+                          sentences=['a', 'b', 'c'], atol=5e-2)
+    assert not parity['passed']
+    assert parity['label_agreement'] == pytest.approx(2 / 3)
+    assert parity['max_abs_diff'] == pytest.approx(0.15, abs=1e-6)
+
+
+@pytest.mark.parametrize('passed', [True, False])
+def test_ensure_onnx_model_uses_stored_parity(tmp_path, passed):
+    model_dir = tmp_path / 'org--model-abc'
+    model_dir.mkdir()
+    (model_dir / 'model.int8.onnx').write_bytes(b'onnx')
+    (model_dir / 'parity.onnx-int8.json').write_text(json.dumps({'backend': 'onnx-int8', 'passed': passed}))
+    if passed:
+        assert ensure_onnx_model('org/model', 'abc', FakeTokenizer(), quantize=True, export_dir=str(tmp_path)) == str(model_dir / 'model.int8.onnx')
+    else:
+        # 이미 변환해 둔 모델이라도 비교에 실패한 기록이 있으면 사용하지 않음
+        with pytest.raises(OnnxParityError):
+            ensure_onnx_model('org/model', 'abc', FakeTokenizer(), quantize=True, export_dir=str(tmp_path))
+
+
+def test_backend_falls_back_to_torch_when_parity_fails(monkeypatch):
+    def failed_parity(*args, **kwargs):
+        raise OnnxParityError('max_abs_diff 0.2')
+
+    class FakeTorchBackend():
+        name = 'torch'
+
+        def __init__(self, model_name, revision, device=None):
+            self.device = device or 'cpu'
+
+    monkeypatch.setattr(sentiment_backend, 'ensure_onnx_model', failed_parity)
+    monkeypatch.setattr(sentiment_backend, 'TorchSentimentBackend', FakeTorchBackend)
+    backend = sentiment_backend.make_sentiment_backend('onnx-int8', 'org/model', 'abc', FakeTokenizer())
+    # 캐시 키가 /torch가 되어 ONNX 점수가 캐시에 남지 않음
+    assert backend.name == 'torch'
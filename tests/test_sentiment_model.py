@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('konlpy')
+
+from AnalyzeMeeting.sentiment_model import SentimentAnalyzer, SentimentScoreCache  # noqa: E402
+
+
+class FakeTokenizer():
+    """문자 하나를 토큰 하나로 보고 배치에서 가장 긴 문장에 맞춰 패딩합니다."""
+    def __call__(self, texts, padding, truncation, return_tensors):
+        assert padding == 'longest'
+        width = max(len(text) for text in texts)
+        return {'input_ids': np.array([[len(text)] * width for text in texts])}
+
+
+class FakeBackend():
+    """문장 길이에 비례하는 긍정 확률을 돌려주고 배치 모양을 기록하는 가짜 백엔드"""
+    name = 'fake'
+    device = 'cpu'
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_proba(self, encoded):
+        input_ids = encoded['input_ids']
+        self.batches.append(input_ids.shape)
+        positive = np.minimum(input_ids[:, 0] / 10.0, 1.0)
+        return np.stack([1.0 - positive, positive], axis=1)
+
+
+def make_analyzer(batch_size, score_cache=None):
+    # 모델을 내려받지 않도록 토크나이저와 백엔드만 바꿔 끼움
+    analyzer = SentimentAnalyzer.__new__(SentimentAnalyzer)
+    analyzer.batch_size = batch_size
+    analyzer.tokenizer = FakeTokenizer()
+    analyzer.backend = FakeBackend()
+    analyzer.score_cache = score_cache
+    return analyzer
+
+
+def test_predict_scores_keeps_input_order():
+    analyzer = make_analyzer(batch_size=2)
+    texts = ['가나다라마바사아', '가', '가나다', '가', '가나']
+    scores = analyzer.predict_scores(texts)
+    assert scores == pytest.approx([0.8, 0.9, 0.7, 0.9, 0.8])
+
+
+def test_predict_scores_batches_unique_texts_by_length():
+    analyzer = make_analyzer(batch_size=2)
+    analyzer.predict_scores(['가나다라마바사아', '가', '가나다', '가', '가나'])
+    # 중복을 뺀 4문장을 길이순으로 2개씩 묶어, 배치마다 가장 긴 문장 길이까지만 패딩
+    assert analyzer.backend.batches == [(2, 2), (2, 8)]
+
+
+def test_token_scores_persist_across_restarts(tmp_path):
+    path = str(tmp_path / 'sentiment.db')
+    analyzer = make_analyzer(32, SentimentScoreCache('model@rev/fake', path=path))
+    first = analyzer.analyze_token_sentiment(['분홍색', '좋다', '분홍색'])
+    assert first['분홍색']['freq'] == 2
+    assert analyzer.score_cache.stats()['model_calls'] == 2
+    analyzer.score_cache.close()
+
+    restarted = make_analyzer(32, SentimentScoreCache('model@rev/fake', path=path))
+    assert restarted.analyze_token_sentiment(['분홍색', '좋다']) == {
+        '분홍색': first['분홍색'] | {'freq': 1}, '좋다': first['좋다']}
+    # 디스크에서 읽었으므로 모델을 다시 호출하지 않음
+    assert restarted.backend.batches == []
+    assert restarted.score_cache.stats()['disk_hits'] == 2
+    restarted.score_cache.close()
+
+
+def test_token_scores_are_separated_by_model(tmp_path):
+    path = str(tmp_path / 'sentiment.db')
+    cache = SentimentScoreCache('model@rev/onnx', path=path)
+    cache.set_many({'분홍색': 0.5})
+    cache.close()
+    # 모델/리비전/백엔드가 다르면 같은 파일이라도 점수를 공유하지 않음
+    other = SentimentScoreCache('model@rev/torch', path=path)
+    assert other.get_many(['분홍색']) == {}
+    other.close()
@@ -0,0 +1,39 @@
+import threading
+
+from AnalyzeMeeting.stt import STTWhisper
+
+
+class SlowLoadSTT(STTWhisper):
+    """모델 로드를 흉내 내는 STTWhisper. 'small'은 release가 설정될 때까지 로드가 끝나지 않습니다."""
+    def __init__(self, **kwargs):
+        self.loading = threading.Event()
+        self.release = threading.Event()
+        self.loads = []
+        super().__init__(backend='whisper', device='cpu', **kwargs)
+
+    def _load_model(self, model_name):
+        self.loads.append(model_name)
+        if model_name == 'small':
+            self.loading.set()
+            self.release.wait(5)
+        return object()
+
+
+def test_loading_short_model_does_not_block_loaded_model():
+    stt = SlowLoadSTT(model_name='large-v3', short_model_name='small')
+    large = stt.model
+    loaders = [threading.Thread(target=stt._get_model, args=('small',)) for _ in range(2)]
+    for loader in loaders:
+        loader.start()
+    assert stt.loading.wait(5)
+    # 작은 모델을 로드하는 동안에도 큰 모델은 바로 반환
+    result = []
+    reader = threading.Thread(target=lambda: result.append(stt._get_model('large-v3')))
+    reader.start()
+    reader.join(1)
+    assert result == [large]
+    stt.release.set()
+    for loader in loaders:
+        loader.join(5)
+    # 같은 모델을 동시에 요청해도 한 번만 로드
+    assert stt.loads == ['large-v3', 'small']
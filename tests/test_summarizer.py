@@ -0,0 +1,96 @@
+import threading
+
+from AnalyzeMeeting.summarizer import (MapReduceSummarizer, SummaryCache, chunk_answers, estimate_tokens,
+                                       format_question)
+
+
+class FakeChatModel():
+    """LLMModel.exec와 같은 형태로 호출되는 가짜 모델. 호출 입력을 기록합니다."""
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def exec(self, text, user_prompt_template=None):
+        with self._lock:
+            self.calls.append((text, user_prompt_template))
+        kind = 'merge' if user_prompt_template else 'map'
+        return f"{kind}[{text.splitlines()[0][:20]}]"
+
+    def map_calls(self):
+        return [text for text, template in self.calls if template is None]
+
+    def merge_calls(self):
+        return [text for text, template in self.calls if template is not None]
+
+
+def make_summarizer(model, **kwargs):
+    return MapReduceSummarizer(model, 'MERGE {text}', cache=SummaryCache(), workers=4, **kwargs)
+
+
+def test_chunk_answers_respects_budget_and_keeps_order():
+    answers = [f'답변 {i} ' + '내용' * 30 for i in range(20)]
+    chunks = chunk_answers('질문', answers, budget=200)
+    assert len(chunks) > 1
+    assert [answer for chunk in chunks for answer in chunk] == answers
+    for chunk in chunks:
+        assert estimate_tokens(format_question('질문', chunk)) <= 200
+
+
+def test_chunk_answers_truncates_single_answer_longer_than_budget():
+    chunks = chunk_answers('질문', ['가' * 10000], budget=100)
+    assert len(chunks) == 1
+    assert estimate_tokens(format_question('질문', chunks[0])) <= 100
+
+
+def test_merge_is_hierarchical_with_fanin():
+    model = FakeChatModel()
+    summarizer = make_summarizer(model, merge_fanin=3)
+    result = summarizer._merge([f'요약 {i}' for i in range(9)])
+    # 9개 -> 3개 -> 1개
+    assert len(model.merge_calls()) == 4
+    assert result.startswith('merge[')
+    assert all(text.count('\n\n') <= 2 for text in model.merge_calls())
+
+
+def test_merge_single_summary_makes_no_call():
+    model = FakeChatModel()
+    assert make_summarizer(model)._merge(['하나']) == '하나'
+    assert model.calls == []
+
+
+def test_long_question_is_split_into_parallel_map_calls():
+    model = FakeChatModel()
+    summarizer = make_summarizer(model, token_budget=200)
+    answers = [f'답변 {i} ' + '내용' * 30 for i in range(20)]
+    summarizer.summarize([{'question': '질문', 'answer': answers}])
+    assert len(model.map_calls()) == len(chunk_answers('질문', answers, 200))
+    assert all(estimate_tokens(text) <= 200 for text in model.map_calls())
+
+
+def test_only_changed_question_is_summarized_again():
+    model = FakeChatModel()
+    summarizer = make_summarizer(model)
+    script = [{'question': f'질문 {q}', 'answer': [f'{q}-{i}' for i in range(3)]} for q in range(4)]
+    first = summarizer.summarize(script)
+    assert len(model.map_calls()) == 4
+
+    model.calls.clear()
+    assert summarizer.summarize(script) == first
+    assert model.map_calls() == []
+
+    model.calls.clear()
+    script[2]['answer'].append('새 답변')
+    summarizer.summarize(script)
+    assert len(model.map_calls()) == 1
+    assert model.map_calls()[0].startswith('질문: 질문 2')
+
+
+def test_answer_order_does_not_change_cache_key():
+    assert SummaryCache.make_key('ns', '질문', ['a', 'b']) == SummaryCache.make_key('ns', '질문', ['b', 'a'])
+    assert SummaryCache.make_key('ns', '질문', ['a']) != SummaryCache.make_key('other', '질문', ['a'])
+
+
+def test_empty_script_makes_no_calls():
+    model = FakeChatModel()
+    assert make_summarizer(model).summarize([{'question': '질문', 'answer': []}]) == ''
+    assert model.calls == []
@@ -0,0 +1,34 @@
+import os
+import time
+
+from utils.tensorboard_server import TensorBoardServer
+
+
+def make_run(logdir, *parts):
+    run_dir = os.path.join(logdir, *parts)
+    os.makedirs(run_dir)
+    with open(os.path.join(run_dir, 'projector_config.pbtxt'), 'w') as f:
+        f.write('')
+    return run_dir
+
+
+def test_register_run_returns_url_selecting_the_run(tmp_path, monkeypatch):
+    server = TensorBoardServer(logdir=str(tmp_path), port=6006, public_url='http://tb.example')
+    monkeypatch.setattr(server, 'ensure_running', lambda: None)
+    url = server.register_run(make_run(str(tmp_path), '1', '2', '3'))
+    assert url == 'http://tb.example/#projector&run=1%2F2%2F3'
+
+
+def test_reaper_evicts_idle_runs_without_new_registrations(tmp_path, monkeypatch):
+    server = TensorBoardServer(logdir=str(tmp_path), port=6006, run_ttl=0)
+    monkeypatch.setattr(server, 'ensure_running', lambda: None)
+    run_dir = make_run(str(tmp_path), '1', '1')
+    server.runs['1/1'] = time.time() - 10
+    server.start_reaper(interval=0.01)
+    deadline = time.time() + 2
+    while server.runs and time.time() < deadline:
+        time.sleep(0.01)
+    server.shutdown()
+    assert not server.runs
+    assert not os.path.exists(run_dir)
+    assert server.stats()['evictions'] == 1
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+pytest.importorskip('konlpy')
+
+import AnalyzeMeeting.text_organize as text_organize  # noqa: E402
+from AnalyzeMeeting.text_organize import OktPool, TokenCache, tokenize_answers, tokenize_many  # noqa: E402
+
+
+class FakeOkt():
+    """공백으로 나눈 단어를 명사로, '~다'로 끝나는 단어를 동사로 돌려주는 가짜 형태소 분석기"""
+    created = 0
+
+    def __init__(self):
+        FakeOkt.created += 1
+        self.calls = []
+
+    def pos(self, text):
+        self.calls.append(text)
+        return [(word, 'Verb' if word.endswith('다') else 'Noun') for word in text.split()]
+
+
+@pytest.fixture
+def fake_okt(monkeypatch):
+    FakeOkt.created = 0
+    monkeypatch.setattr(text_organize, 'Okt', FakeOkt)
+    pool = OktPool(size=2)
+    monkeypatch.setattr(text_organize, 'okt_pool', pool)
+    return pool
+
+
+def test_okt_pool_reuses_at_most_size_instances(fake_okt):
+    with fake_okt.acquire() as first:
+        with fake_okt.acquire() as second:
+            assert first is not second
+            waiting = []
+            # 두 인스턴스가 모두 사용 중이면 새로 만들지 않고 반납을 기다림
+            waiter = threading.Thread(target=lambda: waiting.append(fake_okt._get()))
+            waiter.start()
+            waiter.join(0.2)
+            assert waiter.is_alive()
+        waiter.join(5)
+        assert waiting == [second]
+        fake_okt._idle.put(waiting[0])
+    assert FakeOkt.created == 2
+
+
+def test_tokenize_many_keeps_order_and_analyzes_duplicates_once(fake_okt):
+    texts = ['분홍색 패키지 좋다', '초록색 a 패키지!', '분홍색 패키지 좋다']
+    assert tokenize_many(texts, processes=0) == [['분홍색', '패키지'], ['초록색', '패키지'], ['분홍색', '패키지']]
+    with fake_okt.acquire() as okt:
+        # 중복 문장은 한 번만 분석하고, 한글이 아닌 문자는 분석 전에 제거
+        assert okt.calls == ['분홍색 패키지 좋다', '초록색  패키지']
+
+
+def test_tokenize_many_filters_short_tokens(fake_okt):
+    assert tokenize_many(['색 분홍색'], token_len=2, processes=0) == [['분홍색']]
+    assert tokenize_many(['색 분홍색'], token_len=1, processes=0) == [['색', '분홍색']]
+
+
+@pytest.fixture
+def counting_tokenizer(monkeypatch):
+    """tokenize_answers가 형태소 분석기에 넘긴 문장을 기록합니다."""
+    analyzed = []
+
+    def fake_tokenize_many(texts, token_len=2):
+        analyzed.extend(texts)
+        return [[word for word in text.split() if len(word) >= token_len] for text in texts]
+
+    monkeypatch.setattr(text_organize, 'tokenize_many', fake_tokenize_many)
+    monkeypatch.setattr(text_organize, 'token_cache', TokenCache(path=None))
+    return analyzed
+
+
+def test_tokenize_answers_analyzes_each_text_once(counting_tokenizer):
+    assert tokenize_answers(['분홍색 그냥 좋아요', '초록색 좋아요']) == [['분홍색', '좋아요'], ['초록색', '좋아요']]
+    # 공백/유니코드 정규화 후 같은 문장은 캐시에서 읽음
+    assert tokenize_answers(['분홍색  그냥 좋아요 ', '새 답변입니다', '새 답변입니다']) == [
+        ['분홍색', '좋아요'], ['답변입니다'], ['답변입니다']]
+    assert counting_tokenizer == ['분홍색 그냥 좋아요', '초록색 좋아요', '새 답변입니다']
+    # token_len이 다르면 다른 키
+    tokenize_answers(['초록색 좋아요'], token_len=3)
+    assert counting_tokenizer[-1] == '초록색 좋아요'
+
+
+def test_tokenize_answers_reads_disk_tier_after_restart(counting_tokenizer, tmp_path, monkeypatch):
+    path = str(tmp_path / 'tokens.db')
+    monkeypatch.setattr(text_organize, 'token_cache', TokenCache(path=path))
+    tokenize_answers(['분홍색 패키지'])
+    text_organize.token_cache.close()
+
+    monkeypatch.setattr(text_organize, 'token_cache', TokenCache(path=path))
+    assert tokenize_answers(['분홍색 패키지']) == [['분홍색', '패키지']]
+    assert counting_tokenizer == ['분홍색 패키지']
+    assert text_organize.token_cache.stats()['disk_hits'] == 1
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+
+from AnalyzeMeeting.topic_model import (TopicModel, fit_best_lda, select_n_components, split_holdout,
+                                        umass_coherence)
+
+WORDS = ['회의', '일정', '예산', '보고', '자료', '발표', '디자인', '색상', '고객', '출시', '광고', '매출']
+
+
+def make_docs(n_docs: int, seed: int = 0) -> list:
+    # 서로 다른 단어 묶음 세 개에서 뽑은 문서
+    rng = np.random.default_rng(seed)
+    groups = [WORDS[0:4], WORDS[4:8], WORDS[8:12]]
+    return [' '.join(rng.choice(groups[i % 3], size=5)) for i in range(n_docs)]
+
+
+def count_matrix(docs: list) -> csr_matrix:
+    return CountVectorizer().fit_transform(docs)
+
+
+def test_split_holdout_drops_empty_docs():
+    feat_vec = csr_matrix(np.array([[1, 0], [0, 0], [0, 2], [0, 0]]))
+    train_vec, holdout_vec = split_holdout(feat_vec, ratio=0.5, min_docs=5)
+    # 검증 데이터가 min_docs보다 적으면 빈 문서만 빼고 전부 학습에 사용
+    assert holdout_vec is None
+    assert train_vec.toarray().tolist() == [[1, 0], [0, 2]]
+
+    feat_vec = count_matrix(make_docs(100) + [''] * 50)
+    train_vec, holdout_vec = split_holdout(feat_vec, ratio=0.2, min_docs=10)
+    assert (train_vec.shape[0], holdout_vec.shape[0]) == (80, 20)
+    assert train_vec.getnnz(axis=1).all() and holdout_vec.getnnz(axis=1).all()
+
+
+def test_umass_coherence_matches_hand_computation():
+    # 단어 0, 1은 항상 함께 나오고 단어 2는 따로 나옴
+    doc_freq = np.array([2, 2, 1])
+    co_doc_freq = np.array([[2, 2, 0], [2, 2, 0], [0, 0, 1]])
+    together = np.array([[5.0, 4.0, 0.1]])
+    apart = np.array([[5.0, 0.1, 4.0]])
+    assert umass_coherence(together, doc_freq, co_doc_freq, top_n=2) == pytest.approx(np.log(3 / 2))
+    assert umass_coherence(apart, doc_freq, co_doc_freq, top_n=2) == pytest.approx(np.log(1 / 2))
+
+
+def test_select_n_components_direction():
+    scores = {3: 10.0, 4: 8.0, 5: 12.0}
+    assert select_n_components(scores, 'perplexity') == 4
+    assert select_n_components(scores, 'coherence') == 5
+
+
+@pytest.mark.parametrize('selection', ['perplexity', 'coherence'])
+def test_fit_best_lda_returns_selected_candidate(selection):
+    feat_vec = count_matrix(make_docs(30))
+    model, n_components, scores = fit_best_lda(feat_vec, [2, 3, 4], selection=selection, n_jobs=1)
+    assert sorted(scores) == [2, 3, 4]
+    assert n_components == select_n_components(scores, selection)
+    assert model.n_components == n_components
+    assert model.components_.shape == (n_components, feat_vec.shape[1])
+
+
+def test_fit_best_lda_refits_on_all_docs_after_holdout():
+    feat_vec = count_matrix(make_docs(150))
+    model, n_components, scores = fit_best_lda(feat_vec, [2, 3], n_jobs=1)
+    assert model.n_components == n_components
+    # 검증 데이터를 뗀 뒤에는 전체 문서로 다시 학습하므로 단어 총량이 전체 문서와 같음
+    assert model.components_.sum() == pytest.approx(feat_vec.sum() + model.topic_word_prior_ * model.components_.size,
+                                                    rel=1e-3)
+
+
+def test_topic_model_uses_given_candidates():
+    topic_model = TopicModel(make_docs(30), candidates=[2, 3], n_jobs=1)
+    assert topic_model.candidates == [2, 3]
+    assert topic_model.best_n_components in (2, 3)
+    assert topic_model.best_model.n_components == topic_model.best_n_components
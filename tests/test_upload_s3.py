@@ -0,0 +1,129 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import utils.upload_s3 as upload_s3
+from utils.upload_s3 import OutboundClient
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # 백오프 대기 시간만 기록하고 실제로는 기다리지 않음
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr(upload_s3.asyncio, 'sleep', fake_sleep)
+    return delays
+
+
+def run_with_client(handler, call, **kwargs):
+    async def main():
+        client = OutboundClient(base_url='http://report.test', transport=httpx.MockTransport(handler), **kwargs)
+        try:
+            return await call(client), client
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def status_sequence(*codes):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(codes[min(len(calls), len(codes)) - 1], text='ok')
+    return handler, calls
+
+
+def test_post_wordcloud_retries_503_with_exponential_backoff(sleeps):
+    handler, calls = status_sequence(503, 503, 200)
+    result, client = run_with_client(handler, lambda client: client.post_wordcloud(b'png', 'w.png', 7), backoff=0.5)
+    assert result == 'ok'
+    assert len(calls) == 3
+    assert sleeps == [0.5, 1.0]
+    assert client.stats() == {'requests': 3, 'retried': 2, 'failures': 0, 's3_uploads': 0}
+    assert calls[-1].url.path == upload_s3.REPORT_WORDCLOUD_PATH
+    assert b'name="meetingId"' in calls[-1].content
+
+
+def test_client_error_is_not_retried_and_maps_to_http_exception(sleeps):
+    handler, calls = status_sequence(400)
+    with pytest.raises(HTTPException) as exc_info:
+        run_with_client(handler, lambda client: client.post_wordcloud(b'png', 'w.png', 7))
+    assert exc_info.value.status_code == 400
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_gives_up_after_retries(sleeps):
+    handler, calls = status_sequence(503)
+    with pytest.raises(HTTPException) as exc_info:
+        run_with_client(handler, lambda client: client.post_wordcloud(b'png', 'w.png', 7), retries=2)
+    assert exc_info.value.status_code == 503
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize('error', [httpx.ReadTimeout, httpx.RemoteProtocolError])
+def test_post_is_not_resent_after_request_may_have_reached_server(sleeps, error):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise error('응답 없음', request=request)
+    with pytest.raises(error):
+        run_with_client(handler, lambda client: client.post_wordcloud(b'png', 'w.png', 7))
+    assert len(calls) == 1
+
+
+def test_post_500_is_not_retried_but_get_500_is(sleeps):
+    handler, calls = status_sequence(500, 200)
+    with pytest.raises(HTTPException):
+        run_with_client(handler, lambda client: client.request('POST', '/upload'))
+    assert len(calls) == 1
+
+    handler, calls = status_sequence(500, 200)
+    response, _ = run_with_client(handler, lambda client: client.request('GET', '/status'))
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+def test_connect_error_is_retried_for_post(sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError('연결 실패', request=request)
+        return httpx.Response(200, text='ok')
+    result, _ = run_with_client(handler, lambda client: client.post_wordcloud(b'png', 'w.png', 7))
+    assert result == 'ok'
+    assert len(calls) == 2
+
+
+def test_upload_to_s3_with_moto(monkeypatch):
+    boto3 = pytest.importorskip('boto3')
+    moto = pytest.importorskip('moto')
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    # 멀티파트 경로도 지나가도록 임계값(8MB)보다 큰 객체 사용
+    data = bytes(range(256)) * (9 * 1024 * 1024 // 256)
+
+    with moto.mock_aws():
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket='test-bucket')
+
+        async def main():
+            client = OutboundClient(bucket='test-bucket')
+            try:
+                key = await client.upload_to_s3(data, 'wordcloud/w.png', content_type='image/png')
+                return key, client.stats()
+            finally:
+                await client.aclose()
+        key, stats = asyncio.run(main())
+        stored = boto3.client('s3', region_name='us-east-1').get_object(Bucket='test-bucket', Key=key)
+        assert stored['Body'].read() == data
+        assert stored['ContentType'] == 'image/png'
+        assert stats['s3_uploads'] == 1
@@ -0,0 +1,105 @@
+import threading
+
+import numpy as np
+import pytest
+
+vector_index = pytest.importorskip('AnalyzeMeeting.vector_index')
+
+
+def brute_force_pairs(vectors, threshold):
+    scores = vectors @ vectors.T
+    i, j = np.nonzero(np.triu(scores >= threshold, k=1))
+    return set(zip(i.tolist(), j.tolist()))
+
+
+@pytest.mark.parametrize('n, tile', [(5, 1024), (50, 7), (64, 16)])
+def test_pairs_above_matches_dense_upper_triangle(n, tile):
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=(n // 2 + 1, 8))
+    # 거의 같은 벡터 쌍이 타일 경계를 넘어 나타나도록 섞음
+    vectors = vector_index.normalize(np.concatenate([base, base + rng.normal(scale=0.01, size=base.shape)])[:n])
+    vectors = vectors[rng.permutation(n)]
+    i, j = vector_index.pairs_above(vectors, 0.95, tile=tile)
+    assert (i < j).all()
+    assert set(zip(i.tolist(), j.tolist())) == brute_force_pairs(vectors, 0.95)
+
+
+def test_near_duplicates_groups_exact_mode():
+    index = vector_index.VectorIndex(mode='exact')
+    vectors = np.eye(4, dtype=np.float32)
+    vectors = np.concatenate([vectors, vectors + 0.001])
+    index.add(vectors, [{'row': row} for row in range(len(vectors))])
+    groups = index.near_duplicates(threshold=0.99)
+    assert sorted(sorted(group.tolist()) for group in groups) == [[0, 4], [1, 5], [2, 6], [3, 7]]
+
+
+class FakeMeeting():
+    def __init__(self):
+        self.columns = {'question_id': [], 'user_id': [], 'answer': []}
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.columns['answer'])
+
+    def add(self, answers):
+        for answer in answers:
+            self.columns['question_id'].append(1)
+            self.columns['user_id'].append(len(self))
+            self.columns['answer'].append(answer)
+
+
+class FakeMeetings():
+    def __init__(self, meeting):
+        self.meeting = meeting
+
+    def get(self, corp_id, meeting_id):
+        return self.meeting
+
+
+class BlockingEmbeddings():
+    """embed_documents가 block이 설정된 동안 release를 기다리는 가짜 임베딩 모델"""
+    model = 'blocking-embedding'
+
+    def __init__(self):
+        self.block = False
+        self.embedding = threading.Event()
+        self.release = threading.Event()
+
+    def embed_documents(self, texts):
+        if self.block:
+            self.embedding.set()
+            self.release.wait(5)
+        return [[float(len(text)), 1.0, float(sum(map(ord, text)) % 7)] for text in texts]
+
+
+def test_registry_embeds_outside_index_lock(tmp_path, monkeypatch):
+    from utils import embedding_cache
+
+    model = BlockingEmbeddings()
+    monkeypatch.setitem(embedding_cache._caches, model.model, embedding_cache.EmbeddingCache(model.model, root=str(tmp_path)))
+    meeting = FakeMeeting()
+    meeting.add(['가', '나나', '다다다'])
+    registry = vector_index.VectorIndexRegistry(FakeMeetings(meeting), get_embedding_model=lambda: model)
+    index = registry._get_index(('meeting', 1, 1))
+    registry._sync(index, 1, 1)
+    assert len(index) == 3
+
+    meeting.add(['라라라라', '마마마마마'])
+    model.block = True
+    syncs = [threading.Thread(target=registry._sync, args=(index, 1, 1)) for _ in range(2)]
+    for sync in syncs:
+        sync.start()
+    assert model.embedding.wait(5)
+    # 새 답변을 임베딩하는 동안에도 기존 벡터 검색은 막히지 않음
+    result = []
+    reader = threading.Thread(target=lambda: result.append(index.search(np.ones(3, dtype=np.float32), k=2)))
+    reader.start()
+    reader.join(1)
+    assert len(result) == 1
+    model.release.set()
+    for sync in syncs:
+        sync.join(5)
+    # 같은 구간을 동시에 동기화해도 한 번만 추가
+    assert len(index) == 5
+    assert [item['answer'] for item in index.items] == ['가', '나나', '다다다', '라라라라', '마마마마마']
+    assert index.source_rows[(1, 1)] == 5
@@ -0,0 +1,203 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def estimate_size(value: Any) -> int:
+    """캐시 항목의 대략적인 메모리 크기(byte)를 계산합니다."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return size
+
+
+class LRUCache():
+    """메모리 사용량(byte) 기준으로 오래된 항목부터 제거하는 스레드 안전 LRU 캐시입니다."""
+    def __init__(self, max_bytes: int, max_items: Optional[int] = None, sizeof: Callable[[Any], int] = estimate_size):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.sizeof = sizeof
+        self._data: "OrderedDict[Any, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        size = self.sizeof(key) + self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self.current_bytes -= self._data.pop(key)[1]
+            # 한 항목이 전체 한도보다 크면 저장하지 않음
+            if size > self.max_bytes:
+                return
+            self._data[key] = (value, size)
+            self.current_bytes += size
+            self._evict()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return default
+            self.current_bytes -= item[1]
+            return item[0]
+
+    def _evict(self):
+        while self._data and (self.current_bytes > self.max_bytes or (self.max_items and len(self._data) > self.max_items)):
+            _, (_, size) = self._data.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "items": len(self._data),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class SQLiteStore():
+    """key -> bytes 형태의 영구 저장소입니다. (WAL 모드 SQLite, 캐시의 디스크 계층으로 사용)"""
+    def __init__(self, path: str, table: str = 'cache'):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(f'SELECT value FROM {self.table} WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        keys = list(keys)
+        found = {}
+        # SQLite 변수 개수 제한(999)을 넘지 않도록 나눠서 조회
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(f'SELECT key, value FROM {self.table} WHERE key IN ({placeholders})', chunk)
+                found.update(rows.fetchall())
+        return found
+
+    def set(self, key: str, value: bytes):
+        self.set_many([(key, value)])
+
+    def set_many(self, items: List[Tuple[str, bytes]]):
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(f'INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)', items)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _json_dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class TieredCache():
+    """메모리 LRU(바이트 한도)를 우선 조회하고, path가 있으면 SQLite 디스크 계층을 함께 쓰는 캐시입니다.
+
+    디스크에는 encode(value) 결과를 저장하고, 디스크에서 찾은 값은 decode한 뒤 메모리 계층으로 올립니다.
+    """
+    def __init__(self, max_bytes: int, path: Optional[str] = None, table: str = 'cache',
+                 encode: Callable[[Any], Any] = _json_dumps, decode: Callable[[Any], Any] = json.loads,
+                 max_items: Optional[int] = None):
+        self.memory = LRUCache(max_bytes, max_items=max_items)
+        self.disk = None
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.disk = SQLiteStore(path, table=table)
+        self.encode = encode
+        self.decode = decode
+        self.disk_hits = 0
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            stored = self.disk.get(key)
+            if stored is not None:
+                value = self.decode(stored)
+                self.memory.set(key, value)
+                self.disk_hits += 1
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        if self.disk is not None and missing:
+            for key, stored in self.disk.get_many(missing).items():
+                value = self.decode(stored)
+                self.memory.set(key, value)
+                found[key] = value
+                self.disk_hits += 1
+        return found
+
+    def set(self, key: str, value):
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, Any]):
+        for key, value in items.items():
+            self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set_many([(key, self.encode(value)) for key, value in items.items()])
+
+    def stats(self) -> Dict[str, float]:
+        stats = self.memory.stats()
+        stats['disk_hits'] = self.disk_hits
+        return stats
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,204 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 임베딩 캐시 저장 위치 (모델별 하위 폴더)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./data/embedding_cache")
+# 캐시에 없는 텍스트를 한 번에 보낼 개수
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def model_name_of(embedding_model) -> str:
+    """캐시 키에 쓸 임베딩 모델 이름 (OpenAIEmbeddings.model, SentenceTransformer 이름 등)"""
+    for attr in ('model', 'model_name'):
+        name = getattr(embedding_model, attr, None)
+        if isinstance(name, str) and name:
+            return name
+    return type(embedding_model).__name__
+
+
+class EmbeddingCache():
+    """텍스트 해시 -> 임베딩 벡터 영구 캐시입니다.
+
+    벡터는 모델별 폴더의 vectors.f32 (행 단위 float32, memmap으로 읽음)에 이어 붙이고,
+    index.tsv에 "sha1<TAB>행 번호"를 append-only로 기록합니다.
+    벡터를 먼저 쓰고 인덱스를 나중에 쓰므로, 중간에 종료되어도 인덱스가 없는 행만 버려집니다.
+    기록 도중 종료되어 남은 불완전한 행/줄은 다음 기록 전에 잘라내어 이후 행이 어긋나지 않게 합니다.
+    같은 폴더를 쓰는 여러 프로세스(uvicorn 워커)는 .lock 파일의 flock으로 기록 구간을 직렬화합니다.
+    """
+    def __init__(self, model_name: str, root: str = EMBEDDING_CACHE_DIR):
+        self.model_name = model_name
+        slug = re.sub(r'[^0-9A-Za-z._-]+', '_', model_name)
+        self.dir = os.path.join(root, slug)
+        os.makedirs(self.dir, exist_ok=True)
+        self.meta_path = os.path.join(self.dir, 'meta.json')
+        self.vectors_path = os.path.join(self.dir, 'vectors.f32')
+        self.index_path = os.path.join(self.dir, 'index.tsv')
+        self.lock_path = os.path.join(self.dir, '.lock')
+        self._lock = threading.Lock()
+        self.index: Dict[str, int] = {}
+        self.dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+        self.provider_calls = 0
+        self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        """같은 캐시 폴더를 쓰는 다른 프로세스와 메타/벡터/인덱스 기록을 직렬화합니다."""
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_dim(self):
+        if self.dim is None and os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding='utf-8') as f:
+                self.dim = json.load(f)['dim']
+
+    def _repair(self) -> int:
+        """기록 도중 종료되어 남은 불완전한 벡터 행과 인덱스 줄을 잘라내고 온전한 행 수를 반환합니다. (_file_lock 안에서 호출)"""
+        rows = self._stored_rows()
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) != rows * self.dim * 4:
+            os.truncate(self.vectors_path, rows * self.dim * 4)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb+') as f:
+                # 마지막 줄이 줄바꿈 없이 끊겼으면 다음 기록이 그 줄에 이어 붙지 않도록 잘라냄
+                tail = max(0, f.seek(0, os.SEEK_END) - 4096)
+                f.seek(tail)
+                data = f.read()
+                if data and not data.endswith(b'\n'):
+                    f.truncate(tail + data.rfind(b'\n') + 1)
+        return rows
+
+    def _load(self):
+        with self._file_lock():
+            self._read_dim()
+            if self.dim is None or not os.path.exists(self.index_path):
+                return
+            rows = self._repair()
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                key, _, row = line.rstrip('\n').partition('\t')
+                # 벡터 파일보다 앞서 기록된(잘린) 인덱스 줄은 무시
+                if row.isdigit() and int(row) < rows:
+                    self.index[key] = int(row)
+
+    def _stored_rows(self) -> int:
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    def _get_matrix(self, min_rows: int) -> np.memmap:
+        # 새 행이 추가되었으면 memmap을 다시 연다
+        if self._matrix is None or len(self._matrix) < min_rows:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(self._stored_rows(), self.dim))
+        return self._matrix
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup(self, keys: List[str]) -> np.ndarray:
+        """키별 행 번호 배열을 반환합니다. 없는 키는 -1"""
+        with self._lock:
+            rows = np.fromiter((self.index.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+        found = int((rows >= 0).sum())
+        self.hits += found
+        self.misses += len(keys) - found
+        return rows
+
+    def add(self, keys: List[str], vectors: np.ndarray) -> np.ndarray:
+        """새 벡터를 기록하고 각 키의 행 번호를 반환합니다."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            with self._file_lock():
+                # 다른 프로세스가 먼저 차원을 기록했을 수 있으므로 잠금 안에서 다시 확인
+                self._read_dim()
+                if self.dim is None:
+                    self.dim = int(vectors.shape[1])
+                    with open(self.meta_path, 'w', encoding='utf-8') as f:
+                        json.dump({'model': self.model_name, 'dim': self.dim}, f)
+                elif vectors.shape[1] != self.dim:
+                    raise ValueError(f"임베딩 차원이 다릅니다: {vectors.shape[1]} != {self.dim}")
+
+                start = self._repair()
+                with open(self.vectors_path, 'ab') as f:
+                    f.write(vectors.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                rows = np.arange(start, start + len(keys), dtype=np.int64)
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.writelines(f"{key}\t{row}\n" for key, row in zip(keys, rows))
+            for key, row in zip(keys, rows):
+                self.index[key] = int(row)
+        return rows
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        """행 번호 순서대로 벡터를 모아 (len(rows), dim) 배열로 반환합니다."""
+        if len(rows) == 0:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        with self._lock:
+            matrix = self._get_matrix(int(rows.max()) + 1)
+        return matrix[rows]
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'model': self.model_name,
+            'items': len(self.index),
+            'dim': self.dim or 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'provider_calls': self.provider_calls,
+        }
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
+
+
+def embedding_cache_stats() -> List[Dict[str, float]]:
+    with _caches_lock:
+        return [cache.stats() for cache in _caches.values()]
+
+
+def embed_texts(embedding_model, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE,
+                cache: Optional[EmbeddingCache] = None) -> np.ndarray:
+    """중복을 제거하고 캐시에 없는 텍스트만 batch_size씩 모델에 보낸 뒤, 입력 순서대로 (N, dim) 배열을 반환합니다."""
+    if cache is None:
+        cache = get_embedding_cache(model_name_of(embedding_model))
+    unique_texts, inverse = np.unique(np.asarray(texts, dtype=object), return_inverse=True)
+    keys = [text_key(text) for text in unique_texts]
+    rows = cache.lookup(keys)
+
+    missing = np.flatnonzero(rows < 0)
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        vectors = np.asarray(embedding_model.embed_documents([unique_texts[i] for i in batch]), dtype=np.float32)
+        cache.provider_calls += 1
+        rows[batch] = cache.add([keys[i] for i in batch], vectors)
+
+    # 고유 텍스트 행 번호를 원래 순서로 펼친 뒤 memmap에서 한 번에 모음
+    return cache.vectors(rows[inverse.reshape(-1)])
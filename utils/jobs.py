@@ -0,0 +1,233 @@
+import asyncio
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+# 작업 실행 풀 / 결과 보관 설정
+JOB_THREAD_WORKERS = int(os.getenv("JOB_THREAD_WORKERS", "4"))
+JOB_PROCESS_WORKERS = int(os.getenv("JOB_PROCESS_WORKERS", "2"))
+# 대기 + 실행 중인 작업 수 상한 (초과하면 JobQueueFull)
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "32"))
+# 끝난 작업의 결과를 보관하는 시간(초)
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """취소 요청을 받은 작업이 중단 지점에서 던지는 예외입니다."""
+
+
+class JobQueueFull(Exception):
+    """대기 중인 작업이 JOB_MAX_PENDING을 넘었을 때 발생합니다."""
+
+
+class Job():
+    def __init__(self, kind: str):
+        self.id = uuid4().hex
+        self.kind = kind
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'message': self.message,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'elapsed_sec': elapsed,
+        }
+
+
+class JobContext():
+    """작업 함수에 전달되는 핸들. 진행률 보고, 취소 확인, 프로세스 풀/이벤트 루프 접근을 제공합니다."""
+    def __init__(self, manager: 'JobManager', job: Job):
+        self.manager = manager
+        self.job = job
+
+    @property
+    def cancelled(self) -> bool:
+        return self.job.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(self.job.id)
+
+    def set_progress(self, progress: float, message: str = ''):
+        # 단계 경계에서 호출되므로 취소 여부도 함께 확인
+        self.check_cancelled()
+        self.job.progress = min(max(progress, 0.0), 1.0)
+        if message:
+            self.job.message = message
+
+    def run_in_process(self, fn: Callable, *args, **kwargs):
+        """CPU 위주 작업을 공용 프로세스 풀에서 실행하고 결과를 기다립니다. (fn은 모듈 수준 함수여야 함)"""
+        self.check_cancelled()
+        result = self.manager.run_in_process(fn, *args, **kwargs)
+        self.check_cancelled()
+        return result
+
+    def run_async(self, coro):
+        """작업 스레드에서 서버 이벤트 루프의 코루틴(비동기 업로드 등)을 실행하고 결과를 기다립니다."""
+        if self.manager.loop is None:
+            return asyncio.run(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self.manager.loop).result()
+
+
+class JobManager():
+    """무거운 분석을 제한된 스레드/프로세스 풀에서 실행하고 상태와 결과를 TTL 동안 보관합니다.
+
+    작업 함수는 fn(ctx, *args) 형태이며, 이벤트 루프 밖(스레드 풀)에서 실행됩니다.
+    CPU 위주 단계는 ctx.run_in_process로 프로세스 풀에 넘깁니다.
+    """
+    def __init__(self, thread_workers: int = JOB_THREAD_WORKERS, process_workers: int = JOB_PROCESS_WORKERS,
+                 max_pending: int = JOB_MAX_PENDING, result_ttl: int = JOB_RESULT_TTL):
+        self.thread_executor = ThreadPoolExecutor(max_workers=max(1, thread_workers), thread_name_prefix='job')
+        self.process_workers = process_workers
+        self._process_executor: Optional[ProcessPoolExecutor] = None
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.jobs: Dict[str, Job] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def get_process_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers <= 0:
+            return None
+        with self._lock:
+            if self._process_executor is None:
+                # 모델/JVM이 올라간 프로세스를 fork하지 않도록 spawn 사용
+                self._process_executor = ProcessPoolExecutor(max_workers=self.process_workers, mp_context=get_context('spawn'))
+            return self._process_executor
+
+    def run_in_process(self, fn: Callable, *args, **kwargs):
+        executor = self.get_process_executor()
+        if executor is None:
+            return fn(*args, **kwargs)
+        return executor.submit(fn, *args, **kwargs).result()
+
+    def _active_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if not job.finished)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, job in self.jobs.items()
+                       if job.finished and now - job.finished_at > self.result_ttl]
+            for job_id in expired:
+                del self.jobs[job_id]
+
+    def submit(self, kind: str, fn: Callable, *args, **kwargs) -> Job:
+        self.purge_expired()
+        job = Job(kind)
+        with self._lock:
+            if self._active_count() >= self.max_pending:
+                raise JobQueueFull(f"대기 중인 작업이 너무 많습니다. (최대 {self.max_pending}개)")
+            self.jobs[job.id] = job
+        job.future = self.thread_executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable, args, kwargs):
+        if job.cancel_event.is_set():
+            self._finish(job, CANCELLED)
+            raise JobCancelled(job.id)
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            result = fn(JobContext(self, job), *args, **kwargs)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+            raise
+        except Exception as e:
+            job.error = str(getattr(e, 'detail', e))
+            job.status_code = getattr(e, 'status_code', None)
+            print(f"job {job.kind}/{job.id} 실패: {e}\n{traceback.format_exc()}")
+            self._finish(job, FAILED)
+            raise
+        job.result = result
+        job.progress = 1.0
+        self._finish(job, SUCCEEDED)
+        return result
+
+    def _finish(self, job: Job, status: str):
+        job.status = status
+        job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Job:
+        self.purge_expired()
+        return self.jobs[job_id]
+
+    def cancel(self, job_id: str) -> Job:
+        job = self.get(job_id)
+        if job.finished:
+            return job
+        job.cancel_event.set()
+        # 아직 시작 전이면 바로 취소, 실행 중이면 다음 중단 지점에서 멈춤
+        if job.future is not None and job.future.cancel():
+            job.message = '시작 전에 취소되었습니다.'
+            self._finish(job, CANCELLED)
+        else:
+            job.message = '취소 요청됨'
+        return job
+
+    async def wait(self, job: Job):
+        """이벤트 루프를 막지 않고 작업 결과를 기다립니다. 작업의 예외는 그대로 다시 발생합니다."""
+        return await asyncio.wrap_future(job.future)
+
+    async def run(self, kind: str, fn: Callable, *args, **kwargs):
+        return await self.wait(self.submit(kind, fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in list(self.jobs.values()):
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            'jobs': counts,
+            'thread_workers': self.thread_executor._max_workers,
+            'process_workers': self.process_workers,
+            'max_pending': self.max_pending,
+            'result_ttl': self.result_ttl,
+        }
+
+    def shutdown(self):
+        for job in list(self.jobs.values()):
+            if not job.finished:
+                job.cancel_event.set()
+        self.thread_executor.shutdown(wait=False, cancel_futures=True)
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=False, cancel_futures=True)
+            self._process_executor = None
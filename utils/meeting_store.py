@@ -0,0 +1,198 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from AnalyzeMeeting.make_script import MeetingScript
+from AnalyzeMeeting.text_organize import tokenize_answers
+
+MEETING_DB_PATH = os.getenv("MEETING_DB_PATH", "./data/meetings.db")
+# WAL 체크포인트(압축) 주기(초)
+MEETING_DB_CHECKPOINT_INTERVAL = float(os.getenv("MEETING_DB_CHECKPOINT_INTERVAL", "60"))
+
+
+class MeetingStore():
+    """좌담회 질문/답변을 SQLite(WAL)에 append-only로 기록하는 저장소입니다.
+
+    답변 한 건은 INSERT 한 번으로 기록되고(O(1)), 회의 데이터는 처음 접근할 때
+    (corp_id, meeting_id) 인덱스로 해당 회의만 읽어 옵니다.
+    WAL 파일은 백그라운드 스레드가 주기적으로 체크포인트하여 본 DB에 합칩니다.
+    """
+    def __init__(self, path: str = MEETING_DB_PATH, checkpoint_interval: float = MEETING_DB_CHECKPOINT_INTERVAL):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS questions (
+                corp_id INTEGER NOT NULL,
+                meeting_id INTEGER NOT NULL,
+                question_id NOT NULL,
+                question_text TEXT,
+                PRIMARY KEY (corp_id, meeting_id, question_id)
+            );
+            CREATE TABLE IF NOT EXISTS answers (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                corp_id INTEGER NOT NULL,
+                meeting_id INTEGER NOT NULL,
+                question_id NOT NULL,
+                user_id INTEGER,
+                answer TEXT,
+                tokens TEXT
+            );
+            CREATE INDEX IF NOT EXISTS answers_meeting ON answers (corp_id, meeting_id, seq);
+        ''')
+        self._conn.commit()
+        self._stop = threading.Event()
+        self._compactor = None
+
+    def append_question(self, corp_id, meeting_id, question_id, question_text):
+        with self._lock:
+            self._conn.execute('INSERT OR IGNORE INTO questions VALUES (?, ?, ?, ?)', (corp_id, meeting_id, question_id, question_text))
+            self._conn.commit()
+
+    def append_answer(self, corp_id, meeting_id, question_id, user_id, answer, tokens):
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO answers (corp_id, meeting_id, question_id, user_id, answer, tokens) VALUES (?, ?, ?, ?, ?, ?)',
+                (corp_id, meeting_id, question_id, user_id, answer, json.dumps(tokens, ensure_ascii=False)),
+            )
+            self._conn.commit()
+
+    def has_corp(self, corp_id) -> bool:
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM questions WHERE corp_id = ? LIMIT 1', (corp_id,)).fetchone()
+        return row is not None
+
+    def list_meetings(self, corp_id) -> List[int]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT meeting_id FROM questions WHERE corp_id = ? UNION SELECT meeting_id FROM answers WHERE corp_id = ?',
+                (corp_id, corp_id)).fetchall()
+        return [row[0] for row in rows]
+
+    def load_meeting(self, corp_id, meeting_id) -> Optional[MeetingScript]:
+        """저장된 회의를 MeetingScript로 복원합니다. 저장된 데이터가 없으면 None"""
+        with self._lock:
+            questions = self._conn.execute(
+                'SELECT question_id, question_text FROM questions WHERE corp_id = ? AND meeting_id = ? ORDER BY rowid',
+                (corp_id, meeting_id)).fetchall()
+            answers = self._conn.execute(
+                'SELECT question_id, user_id, answer, tokens FROM answers WHERE corp_id = ? AND meeting_id = ? ORDER BY seq',
+                (corp_id, meeting_id)).fetchall()
+        if not questions and not answers:
+            return None
+
+        meeting_script = MeetingScript(corp_id, meeting_id)
+        for question_id, question_text in questions:
+            meeting_script.add_question(question_id, question_text)
+        for question_id, user_id, answer, tokens in answers:
+            # 저장된 토큰을 그대로 사용하므로 형태소 분석을 다시 하지 않음
+            meeting_script.add_answer(question_id, answer, user_id, tokens=json.loads(tokens))
+        return meeting_script
+
+    def checkpoint(self):
+        with self._lock:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def _compaction_loop(self):
+        while not self._stop.wait(self.checkpoint_interval):
+            try:
+                self.checkpoint()
+            except sqlite3.Error as e:
+                print(f"WAL 체크포인트 중 오류가 발생했습니다: {e}")
+
+    def start_compaction(self):
+        if self._compactor is None:
+            self._compactor = threading.Thread(target=self._compaction_loop, name='meeting-store-compaction', daemon=True)
+            self._compactor.start()
+
+    def close(self):
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        self.checkpoint()
+        with self._lock:
+            self._conn.close()
+
+
+class MeetingRegistry():
+    """메모리 상의 MeetingScript 모음. 없는 회의는 처음 접근할 때 MeetingStore에서 불러옵니다.
+
+    불러오기는 회의별 잠금 안에서 하므로, 큰 회의를 불러오는 동안에도 다른 회의 접근은 막히지 않습니다.
+    """
+    def __init__(self, store: MeetingStore):
+        self.store = store
+        self.meetings: Dict[Tuple[int, int], MeetingScript] = {}
+        # 불러온/새로 만든 모든 MeetingScript에 붙일 답변 추가 listener
+        self.listeners: List[Callable] = []
+        # 불러오는 중인 회의별 잠금
+        self._loading: Dict[Tuple[int, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, corp_id, meeting_id, create: bool) -> Optional[MeetingScript]:
+        key = (corp_id, meeting_id)
+        meeting_script = self.meetings.get(key)
+        if meeting_script is not None:
+            return meeting_script
+        with self._lock:
+            load_lock = self._loading.setdefault(key, threading.Lock())
+        with load_lock:
+            meeting_script = self.meetings.get(key)
+            if meeting_script is not None:
+                return meeting_script
+            # 저장된 답변 재생은 전체 잠금 밖에서 실행
+            meeting_script = self.store.load_meeting(corp_id, meeting_id)
+            if meeting_script is None and create:
+                meeting_script = MeetingScript(corp_id, meeting_id)
+            with self._lock:
+                self._loading.pop(key, None)
+                if meeting_script is None:
+                    return None
+                if key not in self.meetings:
+                    for listener in self.listeners:
+                        meeting_script.add_listener(listener)
+                    self.meetings[key] = meeting_script
+                return self.meetings[key]
+
+    def add_listener(self, listener: Callable):
+        with self._lock:
+            self.listeners.append(listener)
+            for meeting_script in self.meetings.values():
+                meeting_script.add_listener(listener)
+
+    def get(self, corp_id, meeting_id) -> MeetingScript:
+        meeting_script = self._load(corp_id, meeting_id, create=False)
+        if meeting_script is None:
+            raise KeyError((corp_id, meeting_id))
+        return meeting_script
+
+    def get_or_create(self, corp_id, meeting_id) -> MeetingScript:
+        return self._load(corp_id, meeting_id, create=True)
+
+    def has_corp(self, corp_id) -> bool:
+        return any(key[0] == corp_id for key in list(self.meetings)) or self.store.has_corp(corp_id)
+
+    def list_meetings(self, corp_id) -> List[int]:
+        meeting_ids = {key[1] for key in list(self.meetings) if key[0] == corp_id}
+        return sorted(meeting_ids.union(self.store.list_meetings(corp_id)))
+
+    def add_question(self, corp_id, meeting_id, question_id, question_text):
+        meeting_script = self.get_or_create(corp_id, meeting_id)
+        with meeting_script.lock:
+            if question_id not in meeting_script.questions:
+                self.store.append_question(corp_id, meeting_id, question_id, question_text)
+            meeting_script.add_question(question_id, question_text)
+
+    def add_answer(self, corp_id, meeting_id, question_id, answer, user_id):
+        meeting_script = self.get_or_create(corp_id, meeting_id)
+        # 형태소 분석은 잠금 밖에서, 저장소 기록과 메모리 반영은 회의별 잠금 안에서 같은 순서로 처리
+        tokens = tokenize_answers([answer])[0]
+        with meeting_script.lock:
+            self.store.append_answer(corp_id, meeting_id, question_id, user_id, answer, tokens)
+            meeting_script.add_answer(question_id, answer, user_id, tokens=tokens)
@@ -0,0 +1,172 @@
+import gc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import psutil
+
+# 서버 시작 시 미리 로드할 모델 이름 (쉼표로 구분, 예: "sentiment,stt")
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "")
+# 마지막 사용 후 이 시간(초)이 지나면 언로드 (0이면 언로드하지 않음)
+MODEL_IDLE_TIMEOUT = float(os.getenv("MODEL_IDLE_TIMEOUT", "0"))
+MODEL_REAPER_INTERVAL = float(os.getenv("MODEL_REAPER_INTERVAL", "60"))
+
+
+def _cuda_allocated() -> int:
+    # torch를 이미 불러온 경우에만 확인 (여기서 torch를 import하지 않음)
+    torch = sys.modules.get('torch')
+    if torch is None or not torch.cuda.is_available():
+        return 0
+    return torch.cuda.memory_allocated()
+
+
+def _release_cuda_cache():
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class ModelEntry():
+    def __init__(self, name: str, loader: Callable[[], Any], unloader: Optional[Callable[[Any], None]] = None,
+                 idle_timeout: Optional[float] = None):
+        self.name = name
+        self.loader = loader
+        self.unloader = unloader
+        self.idle_timeout = idle_timeout
+        self.instance = None
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.loads = 0
+        self.last_used = 0.0
+        self.load_sec = 0.0
+        self.rss_bytes = 0
+        self.cuda_bytes = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.instance is not None
+
+
+class ModelRegistry():
+    """모델을 처음 사용할 때 로드하고, 오래 쓰지 않으면 내려 메모리를 돌려주는 레지스트리입니다.
+
+    모델별 락으로 동시에 요청이 와도 한 번만 로드하며, 로드 전후의 RSS/CUDA 메모리 차이를
+    모델의 대략적인 메모리 사용량으로 기록합니다. (동시에 여러 모델을 로드하면 값이 섞일 수 있음)
+    """
+    def __init__(self, idle_timeout: float = MODEL_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.entries: Dict[str, ModelEntry] = {}
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any], unloader: Optional[Callable[[Any], None]] = None,
+                 idle_timeout: Optional[float] = None):
+        self.entries[name] = ModelEntry(name, loader, unloader, idle_timeout)
+
+    def _load(self, entry: ModelEntry):
+        with entry.lock:
+            if entry.instance is not None:
+                return entry.instance
+            rss_before = self._process.memory_info().rss
+            cuda_before = _cuda_allocated()
+            start = time.perf_counter()
+            instance = entry.loader()
+            entry.load_sec = time.perf_counter() - start
+            entry.rss_bytes = max(0, self._process.memory_info().rss - rss_before)
+            entry.cuda_bytes = max(0, _cuda_allocated() - cuda_before)
+            entry.loads += 1
+            entry.last_used = time.time()
+            entry.instance = instance
+            print(f"모델 로드: {entry.name} ({entry.load_sec:.2f}s, RSS +{entry.rss_bytes / 2**20:.0f}MB)")
+            return instance
+
+    def get(self, name: str):
+        """모델을 반환합니다. 아직 로드되지 않았으면 지금 로드합니다."""
+        entry = self.entries[name]
+        instance = entry.instance
+        if instance is None:
+            instance = self._load(entry)
+        entry.last_used = time.time()
+        return instance
+
+    @contextmanager
+    def use(self, name: str):
+        """사용하는 동안에는 유휴 언로드 대상에서 제외됩니다."""
+        entry = self.entries[name]
+        with entry.lock:
+            entry.in_use += 1
+        try:
+            yield self.get(name)
+        finally:
+            with entry.lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self.entries.get(name)
+        return entry is not None and entry.loaded
+
+    def unload(self, name: str) -> bool:
+        entry = self.entries[name]
+        with entry.lock:
+            if entry.instance is None or entry.in_use:
+                return False
+            instance, entry.instance = entry.instance, None
+        if entry.unloader is not None:
+            entry.unloader(instance)
+        del instance
+        gc.collect()
+        _release_cuda_cache()
+        print(f"모델 언로드: {name}")
+        return True
+
+    def warmup(self, names: Iterable[str]):
+        for name in names:
+            name = name.strip()
+            if name:
+                self.get(name)
+
+    def unload_idle(self):
+        now = time.time()
+        for entry in list(self.entries.values()):
+            timeout = self.idle_timeout if entry.idle_timeout is None else entry.idle_timeout
+            if timeout and entry.loaded and not entry.in_use and now - entry.last_used > timeout:
+                self.unload(entry.name)
+
+    def _reaper_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.unload_idle()
+            except Exception as e:
+                print(f"유휴 모델 언로드 중 오류가 발생했습니다: {e}")
+
+    def start_reaper(self, interval: float = MODEL_REAPER_INTERVAL):
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reaper_loop, args=(interval,), name='model-reaper', daemon=True)
+            self._reaper.start()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                'loaded': entry.loaded,
+                'in_use': entry.in_use,
+                'loads': entry.loads,
+                'load_sec': round(entry.load_sec, 3),
+                'rss_mb': round(entry.rss_bytes / 2**20, 1),
+                'cuda_mb': round(entry.cuda_bytes / 2**20, 1),
+                'idle_sec': round(time.time() - entry.last_used, 1) if entry.loaded else None,
+            }
+            for name, entry in self.entries.items()
+        }
+
+    def shutdown(self):
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+        for name in list(self.entries):
+            self.unload(name)
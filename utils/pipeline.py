@@ -0,0 +1,149 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# 단계 종류별 풀 크기: io(업로드, 원격 API), cpu(GIL을 놓는 numpy/sklearn/torch 연산)
+STAGE_IO_WORKERS = int(os.getenv("STAGE_IO_WORKERS", "8"))
+STAGE_CPU_WORKERS = int(os.getenv("STAGE_CPU_WORKERS", str(os.cpu_count() or 2)))
+# 단계별 기본 제한 시간(초)
+STAGE_TIMEOUT = float(os.getenv("STAGE_TIMEOUT", "300"))
+
+IO = 'io'
+CPU = 'cpu'
+# 순수 파이썬 CPU 작업(GIL을 잡는 작업)은 프로세스 풀에서 실행
+PROCESS = 'process'
+
+OK = 'ok'
+FAILED = 'failed'
+TIMEOUT = 'timeout'
+SKIPPED = 'skipped'
+
+
+class Stage():
+    """파이프라인의 한 단계. fn(*args, **kwargs, **{의존 단계 이름: 결과})로 호출됩니다.
+
+    kind가 process이면 fn과 인자, 의존 단계 결과가 pickle 가능해야 합니다.
+    """
+    def __init__(self, name: str, fn: Callable, args: Sequence = (), kwargs: Optional[Dict[str, Any]] = None,
+                 deps: Sequence[str] = (), kind: str = IO, timeout: float = STAGE_TIMEOUT):
+        self.name = name
+        self.fn = fn
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.deps = tuple(deps)
+        self.kind = kind
+        self.timeout = timeout
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: Dict[str, Any], process: bool):
+    # 실행한 스레드(또는 프로세스)의 CPU 시간을 함께 반환
+    clock = time.process_time if process else time.thread_time
+    wall_start, cpu_start = time.perf_counter(), clock()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - wall_start, clock() - cpu_start
+
+
+class StageResult():
+    def __init__(self, results: Dict[str, Any], errors: Dict[str, str], timings: Dict[str, Dict[str, Any]], wall_sec: float):
+        self.results = results
+        self.errors = errors
+        self.timings = timings
+        self.wall_sec = wall_sec
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class StageExecutor():
+    """의존 관계가 없는 단계들을 종류별 풀에서 동시에 실행하는 작은 DAG 실행기입니다.
+
+    실패하거나 제한 시간을 넘긴 단계는 errors에 기록하고 그 단계에 의존하는 단계만 건너뛰며,
+    나머지 단계의 결과는 그대로 반환합니다. (시간 초과된 스레드 작업은 중단할 수 없어 결과만 버림)
+    """
+    def __init__(self, io_workers: int = STAGE_IO_WORKERS, cpu_workers: int = STAGE_CPU_WORKERS,
+                 process_executor: Optional[Callable[[], Optional[Executor]]] = None):
+        self.executors: Dict[str, Executor] = {
+            IO: ThreadPoolExecutor(max_workers=max(1, io_workers), thread_name_prefix='stage-io'),
+            CPU: ThreadPoolExecutor(max_workers=max(1, cpu_workers), thread_name_prefix='stage-cpu'),
+        }
+        # 프로세스 풀은 JobManager의 것을 빌려 씀 (없으면 cpu 풀에서 실행)
+        self.process_executor = process_executor
+
+    def _submit(self, stage: Stage, dep_results: Dict[str, Any]) -> Future:
+        kwargs = dict(stage.kwargs, **dep_results)
+        if stage.kind == PROCESS:
+            executor = self.process_executor() if self.process_executor else None
+            if executor is not None:
+                return executor.submit(_timed_call, stage.fn, stage.args, kwargs, True)
+        executor = self.executors[IO if stage.kind == IO else CPU]
+        return executor.submit(_timed_call, stage.fn, stage.args, kwargs, False)
+
+    def run(self, stages: List[Stage], ctx=None) -> StageResult:
+        """모든 단계를 실행하고 결과/오류/단계별 시간(wall, cpu)을 반환합니다. ctx가 있으면 진행률과 취소를 반영합니다."""
+        by_name = {stage.name: stage for stage in stages}
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in by_name]
+            if missing:
+                raise ValueError(f"{stage.name} 단계의 의존 단계가 없습니다: {missing}")
+
+        start = time.perf_counter()
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        waiting = list(stages)
+        running: Dict[Future, Stage] = {}
+        submitted: Dict[Future, float] = {}
+
+        def finish(stage: Stage, status: str, error: Optional[str] = None, wall_sec: float = 0.0, cpu_sec: float = 0.0):
+            timings[stage.name] = {'status': status, 'wall_sec': round(wall_sec, 4), 'cpu_sec': round(cpu_sec, 4)}
+            if error is not None:
+                errors[stage.name] = error
+
+        try:
+            while waiting or running:
+                for stage in list(waiting):
+                    if any(dep in errors for dep in stage.deps):
+                        waiting.remove(stage)
+                        finish(stage, SKIPPED, f"의존 단계 실패: {[dep for dep in stage.deps if dep in errors]}")
+                    elif all(dep in results for dep in stage.deps):
+                        waiting.remove(stage)
+                        future = self._submit(stage, {dep: results[dep] for dep in stage.deps})
+                        running[future] = stage
+                        submitted[future] = time.perf_counter()
+                if not running:
+                    # 남은 단계가 있는데 실행할 수 있는 단계가 없으면 순환 의존
+                    for stage in waiting:
+                        finish(stage, SKIPPED, "순환 의존")
+                    break
+
+                next_deadline = min(submitted[future] + running[future].timeout for future in running)
+                done, _ = wait(list(running), timeout=max(0.0, min(next_deadline - time.perf_counter(), 0.5)),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    submitted_at = submitted.pop(future)
+                    try:
+                        results[stage.name], wall_sec, cpu_sec = future.result()
+                        finish(stage, OK, wall_sec=wall_sec, cpu_sec=cpu_sec)
+                    except Exception as e:
+                        finish(stage, FAILED, f"{type(e).__name__}: {e}", wall_sec=time.perf_counter() - submitted_at)
+                now = time.perf_counter()
+                for future in [future for future, stage in running.items() if submitted[future] + stage.timeout <= now]:
+                    stage = running.pop(future)
+                    submitted.pop(future)
+                    future.cancel()
+                    finish(stage, TIMEOUT, f"{stage.timeout}초 제한 시간 초과", wall_sec=stage.timeout)
+                if ctx is not None:
+                    ctx.set_progress(len(timings) / len(stages))
+        except BaseException:
+            # 취소 등으로 중단되면 아직 시작하지 않은 단계는 실행하지 않음
+            for future in running:
+                future.cancel()
+            raise
+        return StageResult(results, errors, timings, time.perf_counter() - start)
+
+    def shutdown(self):
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from utils.cache import TieredCache
+from utils.jobs import JobCancelled
+
+# 분석 결과 캐시 설정 (RESULT_CACHE_PATH를 지정하면 디스크 계층 사용)
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH")
+
+
+class ResultCache(TieredCache):
+    """(엔드포인트, 기업, 회의, 질문, 회의 버전, 요청 파라미터) 해시를 키로 하는 분석 결과 캐시입니다.
+
+    회의 내용이 바뀌면 MeetingScript.version이 올라가 키가 달라지므로 따로 무효화하지 않습니다.
+    같은 키의 요청이 동시에 들어오면 한 번만 계산하고 나머지는 그 결과를 기다립니다.
+    결과는 JSON으로 저장할 수 있어야 합니다. (디스크 계층)
+    """
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES, path: Optional[str] = RESULT_CACHE_PATH):
+        super().__init__(max_bytes, path, table='results')
+        self.coalesced = 0
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, corp_id=None, meeting_id=None, question_id=None, version=None, params: Optional[Dict] = None) -> str:
+        raw = json.dumps([endpoint, corp_id, meeting_id, question_id, version, params or {}],
+                         sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], refresh: bool = False,
+                       should_cache: Optional[Callable[[Any], bool]] = None):
+        """캐시된 결과를 반환하고, 없으면 compute()로 계산해 저장합니다. refresh면 캐시를 읽지 않고 다시 계산합니다.
+
+        should_cache가 주어지면 True를 반환한 결과만 저장합니다. (일부 단계가 실패한 결과 등은 제외)
+        """
+        if not refresh:
+            result = self.get(key)
+            if result is not None:
+                return result
+        with self._lock:
+            # refresh는 이전 상태로 계산 중인 요청에 합류하지 않고 새로 계산하며, 이후 요청은 이 계산을 기다림
+            future = None if refresh else self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            try:
+                return future.result()
+            except JobCancelled:
+                # 먼저 계산하던 작업만 취소된 것이므로 다시 시도
+                return self.get_or_compute(key, compute, should_cache=should_cache)
+        try:
+            result = compute()
+            with self._lock:
+                # 계산 도중 refresh 요청이 자리를 넘겨받았으면 이전 결과로 캐시를 덮어쓰지 않음
+                latest = self._inflight.get(key) is future
+            if latest and (should_cache is None or should_cache(result)):
+                self.set(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            # 예외는 캐시하지 않고 기다리던 요청에도 그대로 전달
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def stats(self) -> Dict[str, float]:
+        stats = super().stats()
+        stats['coalesced'] = self.coalesced
+        with self._lock:
+            stats['inflight'] = len(self._inflight)
+        return stats
@@ -0,0 +1,159 @@
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import quote
+
+# 모든 run을 하위 폴더로 두는 공용 logdir (logs/{corp}/{meeting}/{question})
+TENSORBOARD_LOGDIR = os.getenv("TENSORBOARD_LOGDIR", "logs")
+TENSORBOARD_HOST = os.getenv("TENSORBOARD_HOST", "127.0.0.1")
+# 0이면 빈 포트를 골라 사용
+TENSORBOARD_PORT = int(os.getenv("TENSORBOARD_PORT", "6006"))
+# 외부에 알려줄 주소 (비우면 http://host:port)
+TENSORBOARD_PUBLIC_URL = os.getenv("TENSORBOARD_PUBLIC_URL", "")
+# 마지막 사용 후 이 시간(초)이 지난 run과, 최대 개수를 넘는 오래된 run은 삭제
+TENSORBOARD_RUN_TTL = int(os.getenv("TENSORBOARD_RUN_TTL", str(24 * 60 * 60)))
+TENSORBOARD_MAX_RUNS = int(os.getenv("TENSORBOARD_MAX_RUNS", "200"))
+TENSORBOARD_RELOAD_INTERVAL = int(os.getenv("TENSORBOARD_RELOAD_INTERVAL", "5"))
+# 사용하지 않는 run을 정리하는 주기(초)
+TENSORBOARD_REAPER_INTERVAL = float(os.getenv("TENSORBOARD_REAPER_INTERVAL", "300"))
+
+
+def _free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class TensorBoardServer():
+    """logdir 하나를 서빙하는 TensorBoard 프로세스 하나를 관리합니다.
+
+    요청마다 프로세스를 띄우지 않고, 각 분석 결과 폴더를 run으로 등록해 같은 서버에서 보여줍니다.
+    run은 마지막 사용 시각 기준 LRU로 관리하며 TTL이 지나거나 최대 개수를 넘으면 폴더를 지웁니다.
+    """
+    def __init__(self, logdir: str = TENSORBOARD_LOGDIR, host: str = TENSORBOARD_HOST, port: int = TENSORBOARD_PORT,
+                 public_url: str = TENSORBOARD_PUBLIC_URL, run_ttl: int = TENSORBOARD_RUN_TTL,
+                 max_runs: int = TENSORBOARD_MAX_RUNS, reload_interval: int = TENSORBOARD_RELOAD_INTERVAL):
+        self.logdir = os.path.abspath(logdir)
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self.run_ttl = run_ttl
+        self.max_runs = max_runs
+        self.reload_interval = reload_interval
+        self.process: Optional[subprocess.Popen] = None
+        # run 이름(logdir 기준 상대 경로) -> 마지막 사용 시각
+        self.runs: "OrderedDict[str, float]" = OrderedDict()
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        os.makedirs(self.logdir, exist_ok=True)
+        self._scan_existing_runs()
+
+    def _scan_existing_runs(self):
+        # 서버 재시작 전에 만들어진 run도 수정 시각 순으로 관리 대상에 포함
+        found = []
+        for root, _, files in os.walk(self.logdir):
+            if 'projector_config.pbtxt' in files:
+                found.append((os.path.getmtime(os.path.join(root, 'projector_config.pbtxt')), self._run_name(root)))
+        for mtime, run in sorted(found):
+            self.runs[run] = mtime
+
+    def _run_name(self, run_dir: str) -> str:
+        return os.path.relpath(os.path.abspath(run_dir), self.logdir).replace(os.sep, '/')
+
+    @property
+    def url(self) -> str:
+        return self.public_url or f"http://{self.host}:{self.port}"
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def ensure_running(self):
+        with self._lock:
+            if self.running:
+                return
+            if self.process is not None:
+                print(f"TensorBoard가 종료되어 다시 시작합니다. (exit code {self.process.returncode})")
+            if not self.port:
+                self.port = _free_port(self.host)
+            self.process = subprocess.Popen([
+                'tensorboard', '--logdir', self.logdir, '--host', self.host, '--port', str(self.port),
+                '--reload_interval', str(self.reload_interval),
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            print(f"TensorBoard가 {self.logdir}에서 실행 중입니다. {self.url} 에서 확인하세요.")
+
+    def run_url(self, run: str) -> str:
+        # projector 탭에서 해당 run이 선택된 상태로 열리는 주소
+        return f"{self.url}/#projector&run={quote(run, safe='')}"
+
+    def register_run(self, run_dir: str) -> str:
+        """run 폴더를 사용 중으로 표시하고 (필요하면 서버를 띄운 뒤) 그 run의 projector 주소를 반환합니다."""
+        run = self._run_name(run_dir)
+        if run.startswith('..'):
+            raise ValueError(f"{run_dir}는 {self.logdir} 아래에 있어야 합니다.")
+        with self._lock:
+            self.runs[run] = time.time()
+            self.runs.move_to_end(run)
+            self._evict()
+        self.ensure_running()
+        return self.run_url(run)
+
+    def _evict(self):
+        now = time.time()
+        while self.runs:
+            run, last_used = next(iter(self.runs.items()))
+            if len(self.runs) <= self.max_runs and now - last_used <= self.run_ttl:
+                break
+            del self.runs[run]
+            shutil.rmtree(os.path.join(self.logdir, run), ignore_errors=True)
+            self.evictions += 1
+
+    def evict_expired(self):
+        with self._lock:
+            self._evict()
+
+    def _reaper_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.evict_expired()
+            except Exception as e:
+                print(f"오래된 TensorBoard run 정리 중 오류가 발생했습니다: {e}")
+
+    def start_reaper(self, interval: float = TENSORBOARD_REAPER_INTERVAL):
+        """새 run 등록이 없어도 TTL이 지난 run을 주기적으로 지우는 스레드를 시작합니다."""
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reaper_loop, args=(interval,), name='tensorboard-reaper', daemon=True)
+            self._reaper.start()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                'running': self.running,
+                'url': self.url,
+                'runs': len(self.runs),
+                'max_runs': self.max_runs,
+                'run_ttl': self.run_ttl,
+                'evictions': self.evictions,
+            }
+
+    def shutdown(self):
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+        with self._lock:
+            if self.process is None:
+                return
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
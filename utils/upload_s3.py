@@ -1,8 +1,10 @@
-import boto3
-from botocore.exceptions import NoCredentialsError
-from dotenv import load_dotenv
+import asyncio
+import io
 import os
+from typing import Callable, Dict, Optional
+
 import httpx
+from dotenv import load_dotenv
 from fastapi import HTTPException
 
 # .env 파일 로드
@@ -12,45 +14,149 @@ load_dotenv()
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_DEFAULT_REGION = os.getenv("AWS_DEFAULT_REGION")
+S3_BUCKET = os.getenv("S3_BUCKET", "jurassic-park")
+# minio / moto 서버 등 S3 호환 저장소를 쓸 때 지정
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+# 이 크기(byte)를 넘는 객체는 S3_MAX_CONCURRENCY개 파트로 나눠 동시에 업로드
+S3_MULTIPART_THRESHOLD = int(os.getenv("S3_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+S3_MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", "4"))
 
-client = boto3.client('s3',
-                      aws_access_key_id=AWS_ACCESS_KEY_ID,
-                      aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                      region_name=AWS_DEFAULT_REGION
-                      )
-
-async def upload_file_to_s3(file_path, key):
-    bucket = 'jurassic-park'
-    
-    try:
-        # 파일 업로드
-        client.upload_file(file_path, bucket, key)
-
-    except FileNotFoundError:
-        print("The file was not found")
-        
-    except NoCredentialsError:
-        print("Credentials not available")
-
-
-if __name__ == '__main__':
-    file_path = 'ComfyUI/output/AnimateDiff_00009.mp4'
-    bucket = 'jurassic-park'
-    key = 'comfy_result.wav' 
-
-async def post_wordcloud(file_path, key, meeting_id):   
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        try:
-            file = {
-                "wordcloudFile": (key, open(file_path, "rb"))
-            }
-            data = {
-                "meetingId": meeting_id
-            }
-            response = await client.post("http://125.132.216.190:319/api/v1/report/whole/wordcloud", files=file, data=data)
+# 리포트 서버 설정
+REPORT_API_URL = os.getenv("REPORT_API_URL", "http://125.132.216.190:319")
+REPORT_WORDCLOUD_PATH = os.getenv("REPORT_WORDCLOUD_PATH", "/api/v1/report/whole/wordcloud")
+
+# 외부 요청 공통 설정
+OUTBOUND_TIMEOUT = float(os.getenv("OUTBOUND_TIMEOUT", "5.0"))
+OUTBOUND_MAX_CONNECTIONS = int(os.getenv("OUTBOUND_MAX_CONNECTIONS", "20"))
+# 동시에 보내는 외부 요청(HTTP + S3) 수 상한
+OUTBOUND_MAX_CONCURRENCY = int(os.getenv("OUTBOUND_MAX_CONCURRENCY", "8"))
+OUTBOUND_RETRIES = int(os.getenv("OUTBOUND_RETRIES", "3"))
+# 재시도 대기 시간(초)은 OUTBOUND_BACKOFF * 2^시도 횟수
+OUTBOUND_BACKOFF = float(os.getenv("OUTBOUND_BACKOFF", "0.5"))
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# POST 등 멱등이 아닌 요청은 서버가 처리하지 않았다고 확신할 수 있는 경우만 재시도 (중복 업로드 방지)
+UNSAFE_RETRY_STATUS_CODES = (429, 503)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+
+class OutboundClient():
+    """리포트 서버 전송과 S3 업로드를 담당하는 공용 외부 I/O 계층입니다. lifespan에서 하나만 만들어 사용합니다.
+
+    HTTP는 keep-alive 연결 풀을 공유하고, 연결 오류나 429/5xx 응답은 지수 백오프로 재시도합니다.
+    POST는 요청이 서버에 닿기 전의 오류(연결 실패, 풀 대기 초과)와 429/503만 재시도합니다.
+    boto3 업로드는 블로킹이므로 스레드에서 실행하며, 큰 객체는 멀티파트로 나눠 동시에 올립니다.
+    """
+    def __init__(self, base_url: str = REPORT_API_URL, timeout: float = OUTBOUND_TIMEOUT,
+                 max_connections: int = OUTBOUND_MAX_CONNECTIONS, max_concurrency: int = OUTBOUND_MAX_CONCURRENCY,
+                 retries: int = OUTBOUND_RETRIES, backoff: float = OUTBOUND_BACKOFF,
+                 bucket: str = S3_BUCKET, s3_endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.bucket = bucket
+        self.s3_endpoint_url = s3_endpoint_url
+        self._s3 = None
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.s3_uploads = 0
+
+    @property
+    def s3(self):
+        # boto3는 S3를 실제로 쓸 때만 import / 클라이언트 생성
+        if self._s3 is None:
+            import boto3
+            self._s3 = boto3.client('s3',
+                                    aws_access_key_id=AWS_ACCESS_KEY_ID,
+                                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+                                    region_name=AWS_DEFAULT_REGION,
+                                    endpoint_url=self.s3_endpoint_url,
+                                    )
+        return self._s3
+
+    async def _retry(self, send, retryable: Callable[[Exception], bool]):
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    return await send()
+            except Exception as e:
+                if attempt >= self.retries or not retryable(e):
+                    self.failures += 1
+                    raise
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    @staticmethod
+    def _http_retryable(method: str) -> Callable[[Exception], bool]:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        def retryable(e: Exception) -> bool:
+            if isinstance(e, httpx.HTTPStatusError):
+                return e.response.status_code in (RETRY_STATUS_CODES if idempotent else UNSAFE_RETRY_STATUS_CODES)
+            if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+                return True
+            # 응답을 받지 못한 읽기/쓰기 오류는 서버가 이미 처리했을 수 있음
+            return idempotent and isinstance(e, httpx.TransportError)
+        return retryable
+
+    @staticmethod
+    def _s3_retryable(e: Exception) -> bool:
+        # botocore 연결/제한 오류 (같은 key로 다시 올리므로 중복 객체가 생기지 않음)
+        return type(e).__name__ in ('EndpointConnectionError', 'ConnectionClosedError', 'ReadTimeoutError',
+                                    'ConnectTimeoutError')
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """공용 연결 풀로 요청을 보내고, 재시도해도 실패한 상태 코드는 HTTPException으로 바꿔 던집니다."""
+        async def send():
+            self.requests += 1
+            response = await self.http.request(method, url, **kwargs)
             response.raise_for_status()
-            
-            return response.text
-        
+            return response
+
+        try:
+            return await self._retry(send, self._http_retryable(method))
         except httpx.HTTPStatusError as exc:
             raise HTTPException(status_code=exc.response.status_code, detail=str(exc))
+
+    async def post_wordcloud(self, image: bytes, key, meeting_id, content_type: Optional[str] = None) -> str:
+        # 메모리에서 그린 이미지 bytes를 그대로 전송 (재시도할 때마다 본문을 다시 만듦)
+        content_type = content_type or f"image/{os.path.splitext(key)[1].lstrip('.') or 'png'}"
+        response = await self.request("POST", REPORT_WORDCLOUD_PATH,
+                                      files={"wordcloudFile": (key, image, content_type)},
+                                      data={"meetingId": meeting_id})
+        return response.text
+
+    async def upload_to_s3(self, data: bytes, key: str, content_type: Optional[str] = None) -> str:
+        """메모리의 bytes를 S3에 업로드하고 key를 반환합니다. 이벤트 루프를 막지 않도록 스레드에서 실행합니다."""
+        from boto3.s3.transfer import TransferConfig
+
+        config = TransferConfig(multipart_threshold=S3_MULTIPART_THRESHOLD, multipart_chunksize=S3_MULTIPART_THRESHOLD,
+                                max_concurrency=S3_MAX_CONCURRENCY)
+        extra_args = {'ContentType': content_type} if content_type else None
+
+        async def send():
+            await asyncio.to_thread(self.s3.upload_fileobj, io.BytesIO(data), self.bucket, key,
+                                    ExtraArgs=extra_args, Config=config)
+
+        await self._retry(send, self._s3_retryable)
+        self.s3_uploads += 1
+        return key
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'requests': self.requests,
+            'retried': self.retried,
+            'failures': self.failures,
+            's3_uploads': self.s3_uploads,
+        }
+
+    async def aclose(self):
+        await self.http.aclose()